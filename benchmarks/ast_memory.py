@@ -0,0 +1,92 @@
+"""
+Compares the memory retained by the JavaScript AST of a large schema made of slotted `Node`s
+with the same AST made of dicts, and the time to serialize both to JSON.
+
+Both copies share the strings and the identical subtrees of the generated AST, so only the
+containers are measured.
+
+Usage: python -m benchmarks.ast_memory [definitions] [properties]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_schema_text
+from json_codegen.astlib.javascript import Node
+from json_codegen.core import load_schema
+from json_codegen.generators.flow import FlowGenerator
+
+
+def copy_ast(node, dicts: bool, memo: dict):
+    if id(node) in memo:
+        return memo[id(node)]
+
+    if isinstance(node, Node):
+        if dicts:
+            result = {k: copy_ast(v, dicts, memo) for k, v in node.items()}
+        else:
+            result = type(node).__new__(type(node))
+
+            for k, v in node.items():
+                if k != "type":
+                    result[k] = copy_ast(v, dicts, memo)
+    elif isinstance(node, list):
+        result = [copy_ast(v, dicts, memo) for v in node]
+    else:
+        return node
+
+    memo[id(node)] = result
+
+    return result
+
+
+def measure(tree: Node, dicts: bool):
+    gc.collect()
+    tracemalloc.start()
+
+    memo: dict = {}
+    copy = copy_ast(tree, dicts, memo)
+    del memo
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    json.dumps(copy, default=Node.as_dict)
+    elapsed = time.perf_counter() - start
+
+    del copy
+
+    return current, elapsed
+
+
+def main():
+    definitions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    properties = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    generator = FlowGenerator(load_schema(make_schema_text(definitions, properties)))
+    tree = generator.generate().as_ast()
+
+    print(f"Schema: {definitions} definitions x {properties} properties")
+    print(f"{'nodes':<8} {'retained MB':>12} {'json.dumps s':>13}")
+
+    results = {}
+
+    for name, dicts in (("dict", True), ("Node", False)):
+        current, elapsed = measure(tree, dicts)
+        results[name] = current, elapsed
+
+        print(f"{name:<8} {current / 1e6:>12.1f} {elapsed:>13.2f}")
+
+    reduction = 1 - results["Node"][0] / results["dict"][0]
+    slowdown = results["Node"][1] / results["dict"][1]
+
+    print(f"Retained memory reduction: {reduction:.0%}, json.dumps time: {slowdown:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
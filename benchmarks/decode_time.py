@@ -0,0 +1,55 @@
+"""
+Compares the time to decode the fixture schemas and a large synthetic schema with the JSON
+backends installed, including the former `OrderedDict` hook of the standard library.
+
+Usage: python -m benchmarks.decode_time [definitions] [properties]
+"""
+
+import json
+import sys
+import timeit
+from collections import OrderedDict
+from pathlib import Path
+
+from benchmarks.synthetic import make_schema_text
+from json_codegen.decoders import BACKENDS, get_decoder, is_available
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "schemas"
+
+
+def ordered_dict_loads(text):
+    return json.loads(text, object_pairs_hook=OrderedDict)
+
+
+def best_time(decoder, texts, number):
+    timer = timeit.Timer(lambda: [decoder(text) for text in texts])
+
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main():
+    definitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    properties = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    fixtures = [f.read_text() for f in sorted(FIXTURES_DIR.glob("*.schema.json"))]
+    synthetic = [make_schema_text(definitions, properties)]
+
+    decoders = [("json+OrderedDict", ordered_dict_loads)]
+    decoders.extend((name, get_decoder(name)) for name in reversed(BACKENDS) if is_available(name))
+
+    print(f"Fixtures: {len(fixtures)} schemas")
+    print(
+        f"Synthetic: {definitions} definitions x {properties} properties, "
+        f"{len(synthetic[0]) / 1e6:.1f}MB"
+    )
+    print(f"{'backend':<18} {'fixtures ms':>12} {'synthetic ms':>13}")
+
+    for name, decoder in decoders:
+        fixtures_time = best_time(decoder, fixtures, 100)
+        synthetic_time = best_time(decoder, synthetic, 1)
+
+        print(f"{name:<18} {fixtures_time * 1e3:>12.3f} {synthetic_time * 1e3:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
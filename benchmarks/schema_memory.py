@@ -0,0 +1,77 @@
+"""
+Compares the peak memory and the time used to load and parse a large schema with the former
+`OrderedDict` nodes, with the default `dict` nodes and with frozen `SchemaNode`s.
+
+Usage: python -m benchmarks.schema_memory [definitions] [properties]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from benchmarks.synthetic import make_schema_text
+from json_codegen.core import SchemaParser, load_schema
+
+
+def ordered_dict_loads(text):
+    return json.loads(text, object_pairs_hook=OrderedDict)
+
+
+def dict_loads(text):
+    return load_schema(text)
+
+
+def frozen_loads(text):
+    return load_schema(text, frozen=True)
+
+
+def measure(text: str, loads):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    parser = SchemaParser(loads(text))
+    klasses = list(parser.get_klass_records())
+
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del parser, klasses
+
+    return current, peak, elapsed
+
+
+def main():
+    definitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    properties = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    text = make_schema_text(definitions, properties)
+
+    print(f"Schema: {definitions} definitions x {properties} properties, {len(text) / 1e6:.1f}MB")
+    print(f"{'nodes':<12} {'retained MB':>12} {'peak MB':>10} {'time s':>8}")
+
+    results = {}
+
+    for name, loads in (
+        ("OrderedDict", ordered_dict_loads),
+        ("dict", dict_loads),
+        ("SchemaNode", frozen_loads),
+    ):
+        current, peak, elapsed = measure(text, loads)
+        results[name] = peak, elapsed
+
+        print(f"{name:<12} {current / 1e6:>12.1f} {peak / 1e6:>10.1f} {elapsed:>8.2f}")
+
+    for baseline in ("OrderedDict", "dict"):
+        reduction = 1 - results["SchemaNode"][0] / results[baseline][0]
+        slowdown = results["SchemaNode"][1] / results[baseline][1]
+
+        print(f"vs {baseline}: peak memory reduction {reduction:.0%}, time {slowdown:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
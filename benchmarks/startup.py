@@ -0,0 +1,93 @@
+"""
+Measures the cold-start import time of the command line with `python -X importtime` and fails
+when it exceeds the budget.
+
+Usage: python -m benchmarks.startup [budget ms]
+
+The budget can also be set with the JSON_CODEGEN_IMPORT_BUDGET_MS environment variable.
+"""
+
+import os
+import subprocess  # nosec B404
+import sys
+from typing import Dict, List, Tuple
+
+# Cumulative import time of `json_codegen.cli`, best of `RUNS`
+IMPORT_BUDGET_MS = 150
+BUDGET_ENV = "JSON_CODEGEN_IMPORT_BUDGET_MS"
+
+RUNS = 5
+
+# Modules only needed once a generator or a mode is selected
+LAZY_MODULES = (
+    "astor",
+    "marshmallow",
+    "multiprocessing",
+    "json_codegen.generators.flow",
+    "json_codegen.generators.javascript_flow",
+    "json_codegen.generators.python3",
+    "json_codegen.generators.python3_marshmallow",
+    "json_codegen.batch",
+    "json_codegen.server",
+    "json_codegen.watch",
+)
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """
+    Returns the (module, self µs, cumulative µs) tuples of the `-X importtime` output
+    """
+    prefix = "import time:"
+    modules = []
+
+    for line in output.splitlines():
+        if not line.startswith(prefix) or "[us]" in line:
+            continue
+
+        self_time, cumulative, name = line.replace(prefix, "", 1).split("|")
+        modules.append((name.strip(), int(self_time), int(cumulative)))
+
+    return modules
+
+
+def measure_imports(module: str = "json_codegen.cli") -> Dict[str, int]:
+    """
+    Imports `module` in a fresh interpreter and returns the cumulative import time of every
+    module imported
+    """
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return {name: cumulative for name, _, cumulative in parse_importtime(result.stderr)}
+
+
+def main():
+    budget_ms = float(sys.argv[1] if len(sys.argv) > 1 else os.environ.get(BUDGET_ENV, 0))
+    budget_ms = budget_ms or IMPORT_BUDGET_MS
+
+    runs = [measure_imports() for _ in range(RUNS)]
+    best = min(runs, key=lambda r: r["json_codegen.cli"])
+    total_ms = best["json_codegen.cli"] / 1000
+
+    print(f"{'module':<40} {'cumulative ms':>14}")
+
+    for name, cumulative in sorted(best.items(), key=lambda i: -i[1])[:15]:
+        print(f"{name:<40} {cumulative / 1000:>14.1f}")
+
+    eager = [m for m in LAZY_MODULES if m in best]
+
+    print(f"Import time: {total_ms:.1f}ms, budget {budget_ms:.0f}ms")
+
+    if eager:
+        print(f"Imported eagerly: {', '.join(eager)}")
+
+    if total_ms > budget_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import json
+from typing import Dict
+
+
+def make_schema(definitions: int = 5000, properties: int = 10) -> Dict:
+    """
+    Builds a schema with `definitions` object definitions, each one with `properties` scalar,
+    array and reference properties
+    """
+    schema_definitions = {}
+
+    for i in range(definitions):
+        schema_properties = {}
+
+        for j in range(properties):
+            if j % 4 == 0:
+                property_ = {"type": "string", "default": f"value_{j}"}
+            elif j % 4 == 1:
+                property_ = {"type": "integer", "default": j}
+            elif j % 4 == 2 and i > 0:
+                property_ = {"type": "object", "oneOf": [{"$ref": f"#/definitions/Type{i - 1}"}]}
+            else:
+                property_ = {"type": "array", "items": {"type": "number"}}
+
+            schema_properties[f"property_{j}"] = property_
+
+        schema_definitions[f"Type{i}"] = {
+            "type": "object",
+            "properties": schema_properties,
+            "required": [f"property_{j}" for j in range(0, properties, 3)],
+        }
+
+    return {
+        "$schema": "http://json-schema.org/draft-04/schema#",
+        "title": "Root",
+        "type": "object",
+        "properties": {"root": {"type": "object", "oneOf": [{"$ref": "#/definitions/Type0"}]}},
+        "definitions": schema_definitions,
+    }
+
+
+def make_schema_text(definitions: int = 5000, properties: int = 10) -> str:
+    return json.dumps(make_schema(definitions, properties), indent=2)
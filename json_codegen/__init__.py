@@ -1,5 +1,8 @@
 from json_codegen.core import (  # noqa: F401
     GeneratorNotFoundException,
+    UnsupportedSchemaException,
     load_external_generator,
     load_schema,
 )
+
+__version__ = "0.6.0"
@@ -1,351 +1,598 @@
 import json
-from typing import Dict, NewType
+from collections.abc import MutableMapping
+from typing import IO, Any, Dict, Iterator, Tuple
 
-AST = NewType("AST", Dict)
+# Characters written at once by dump()
+DUMP_CHUNK_SIZE = 64 * 1024
 
 
-def File(program=None, comments=None):
-    return {"type": "File", "program": program, "comments": comments or []}
+class Node(MutableMapping):
+    """
+    Node of a Babel AST, a mapping with the same keys as the Babel JSON of the node.
 
+    The fields of the node are stored in `__slots__` and its type is the name of its class, so
+    nodes don't carry a dictionary each. A field left unset isn't a key of the node, keys which
+    aren't fields, like `leadingComments`, are stored in a dictionary created on first use.
+    Nodes are serialized with `json.dumps(node, default=Node.as_dict)`.
+    """
 
-def Program(source_type="module", body=None, directives=None):
-    return {
-        "type": "Program",
-        "sourceType": source_type,
-        "body": body or [],
-        "directives": directives or [],
-    }
+    __slots__ = ("_extra",)
 
+    # Keys of the node after `type`, in the order of the Babel JSON
+    fields: Tuple[str, ...] = ()
 
-def ExportNamedDeclaration(specifiers=None, source=None, declaration=None, export_kind="value"):
-    return {
-        "type": "ExportNamedDeclaration",
-        "specifiers": specifiers or [],
-        "source": source,
-        "declaration": declaration,
-        "exportKind": export_kind,
-    }
+    def __init_subclass__(cls, **kwds):
+        super().__init_subclass__(**kwds)
+        cls.fields = cls.__dict__.get("__slots__", ())
 
+    def __getitem__(self, key: str) -> Any:
+        if key == "type":
+            return type(self).__name__
 
-def ClassDeclaration(id_=None, super_class=None, body=None):
-    return {"type": "ClassDeclaration", "id": id_, "superClass": super_class, "body": body}
+        try:
+            if key in self.fields:
+                return getattr(self, key)
 
+            return self._extra[key]
+        except (AttributeError, KeyError):
+            raise KeyError(key) from None
 
-def Identifier(name, type_annotation=None):
-    node = {"type": "Identifier", "name": name}
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "type":
+            raise KeyError("The type of a node can't be changed")
 
-    if type_annotation is not None:
-        node["typeAnnotation"] = type_annotation
+        if key in self.fields:
+            setattr(self, key, value)
+            return
 
-    return node
+        try:
+            self._extra[key] = value
+        except AttributeError:
+            self._extra = {key: value}
 
+    def __delitem__(self, key: str) -> None:
+        try:
+            if key in self.fields:
+                delattr(self, key)
+            else:
+                del self._extra[key]
+        except (AttributeError, KeyError):
+            raise KeyError(key) from None
 
-def ClassBody(body=None):
-    return {"type": "ClassBody", "body": body or []}
+    def __iter__(self) -> Iterator[str]:
+        yield "type"
 
+        for field in self.fields:
+            if hasattr(self, field):
+                yield field
 
-def BlockStatement(body=None, directives=None):
-    return {"type": "BlockStatement", "body": body or [], "directives": directives or []}
+        yield from getattr(self, "_extra", ())
 
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
 
-def ClassMethod(
-    static=False,
-    key=None,
-    computed=False,
-    kind="method",
-    id_=None,
-    generator=False,
-    async_=False,
-    params=None,
-    body=None,
-):
-    return {
-        "type": "ClassMethod",
-        "static": static,
-        "key": key,
-        "computed": computed,
-        "kind": kind,
-        "id": id_,
-        "generator": generator,
-        "async": async_,
-        "params": params or [],
-        "body": body or [],
-    }
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns the keys of the node as a dictionary, faster than `dict(node)`
+        """
+        result = {"type": type(self).__name__}
 
+        for field in self.fields:
+            try:
+                result[field] = getattr(self, field)
+            except AttributeError:
+                pass
 
-def ClassProperty(
-    static=False, key=None, computed=False, variance=None, typeAnnotation=None, value=None
-):
-    return {
-        "type": "ClassProperty",
-        "static": static,
-        "key": key,
-        "computed": computed,
-        "variance": variance,
-        "typeAnnotation": typeAnnotation,
-        "value": value,
-    }
+        result.update(getattr(self, "_extra", ()))
 
+        return result
 
-def TypeAnnotation(type_annotation):
-    return {"type": "TypeAnnotation", "typeAnnotation": type_annotation}
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
 
 
-def NumberTypeAnnotation():
-    return {"type": "NumberTypeAnnotation"}
+AST = Node
 
 
-def AnyTypeAnnotation():
-    return {"type": "AnyTypeAnnotation"}
+def dump(node: Any, fp: IO[str], compact: bool = False) -> None:
+    """
+    Writes `node` as JSON into the text file `fp` while it's serialized, in chunks of about
+    `DUMP_CHUNK_SIZE` characters, indented by 2 spaces unless `compact`
+    """
+    encoder = json.JSONEncoder(
+        indent=None if compact else 2,
+        separators=(",", ":") if compact else None,
+        default=Node.as_dict,
+    )
+    chunks = []
+    size = 0
 
+    for chunk in encoder.iterencode(node):
+        chunks.append(chunk)
+        size += len(chunk)
 
-def StringTypeAnnotation():
-    return {"type": "StringTypeAnnotation"}
+        if size >= DUMP_CHUNK_SIZE:
+            fp.write("".join(chunks))
+            chunks.clear()
+            size = 0
 
+    fp.write("".join(chunks))
 
-def NullableTypeAnnotation(type_annotation):
-    return {"type": "NullableTypeAnnotation", "typeAnnotation": type_annotation}
 
+class File(Node):
+    __slots__ = ("program", "comments")
 
-def GenericTypeAnnotation(id_, type_parameters=None):
-    return {"type": "GenericTypeAnnotation", "id": id_, "typeParameters": type_parameters}
+    def __init__(self, program=None, comments=None):
+        self.program = program
+        self.comments = comments or []
 
 
-def AssignmentPattern(left, right):
-    return {"type": "AssignmentPattern", "left": left, "right": right}
+class Program(Node):
+    __slots__ = ("sourceType", "body", "directives")
+
+    def __init__(self, source_type="module", body=None, directives=None):
+        self.sourceType = source_type
+        self.body = body or []
+        self.directives = directives or []
+
 
+class ExportNamedDeclaration(Node):
+    __slots__ = ("specifiers", "source", "declaration", "exportKind")
 
-def ObjectExpression(properties=None):
-    return {"type": "ObjectExpression", "properties": properties or []}
+    def __init__(self, specifiers=None, source=None, declaration=None, export_kind="value"):
+        self.specifiers = specifiers or []
+        self.source = source
+        self.declaration = declaration
+        self.exportKind = export_kind
 
 
-def ExpressionStatement(expression):
-    return {"type": "ExpressionStatement", "expression": expression}
+class ClassDeclaration(Node):
+    __slots__ = ("id", "superClass", "body")
 
+    def __init__(self, id_=None, super_class=None, body=None):
+        self.id = id_
+        self.superClass = super_class
+        self.body = body
 
-def AssignmentExpression(left, right, operator="="):
-    return {"type": "AssignmentExpression", "operator": operator, "left": left, "right": right}
 
+class Identifier(Node):
+    __slots__ = ("name", "typeAnnotation")
 
-def MemberExpression(object_, property_, computed=False):
-    return {
-        "type": "MemberExpression",
-        "object": object_,
-        "property": property_,
-        "computed": computed,
-    }
+    def __init__(self, name, type_annotation=None):
+        self.name = name
 
+        if type_annotation is not None:
+            self.typeAnnotation = type_annotation
 
-def ThisExpression():
-    return {"type": "ThisExpression"}
 
+class ClassBody(Node):
+    __slots__ = ("body",)
 
-def ConditionalExpression(test, consequent, alternate):
-    return {
-        "type": "ConditionalExpression",
-        "test": test,
-        "consequent": consequent,
-        "alternate": alternate,
-    }
+    def __init__(self, body=None):
+        self.body = body or []
 
 
-def NumericLiteral(value):
-    return {
-        "type": "NumericLiteral",
-        "value": value,
-        "extra": {"rawValue": value, "raw": json.dumps(value)},
-    }
+class BlockStatement(Node):
+    __slots__ = ("body", "directives")
 
+    def __init__(self, body=None, directives=None):
+        self.body = body or []
+        self.directives = directives or []
 
-def CallExpression(callee, arguments):
-    return {"type": "CallExpression", "callee": callee, "arguments": arguments}
 
+class ClassMethod(Node):
+    __slots__ = (
+        "static",
+        "key",
+        "computed",
+        "kind",
+        "id",
+        "generator",
+        "async",
+        "params",
+        "body",
+    )
 
-def TypeParameterInstantiation(params):
-    return {"type": "TypeParameterInstantiation", "params": params}
+    def __init__(
+        self,
+        static=False,
+        key=None,
+        computed=False,
+        kind="method",
+        id_=None,
+        generator=False,
+        async_=False,
+        params=None,
+        body=None,
+    ):
+        self.static = static
+        self.key = key
+        self.computed = computed
+        self.kind = kind
+        self.id = id_
+        self.generator = generator
+        setattr(self, "async", async_)
+        self.params = params or []
+        self.body = body or []
 
 
-def ExistsTypeAnnotation():
-    return {"type": "ExistsTypeAnnotation"}
+class ClassProperty(Node):
+    __slots__ = ("static", "key", "computed", "variance", "typeAnnotation", "value")
 
+    def __init__(
+        self,
+        static=False,
+        key=None,
+        computed=False,
+        variance=None,
+        typeAnnotation=None,
+        value=None,
+    ):
+        self.static = static
+        self.key = key
+        self.computed = computed
+        self.variance = variance
+        self.typeAnnotation = typeAnnotation
+        self.value = value
 
-def BooleanTypeAnnotation():
-    return {"type": "BooleanTypeAnnotation"}
 
+class TypeAnnotation(Node):
+    __slots__ = ("typeAnnotation",)
 
-def ArrayExpression(elements=None):
-    return {"type": "ArrayExpression", "elements": elements or []}
+    def __init__(self, type_annotation):
+        self.typeAnnotation = type_annotation
 
 
-def BinaryExpression(left, right, operator="==="):
-    return {"type": "BinaryExpression", "left": left, "right": right, "operator": operator}
+class NumberTypeAnnotation(Node):
+    __slots__ = ()
 
 
-def UnaryExpression(operator=None, prefix=True, argument=None, extra=None):
-    return {
-        "type": "UnaryExpression",
-        "operator": operator,
-        "prefix": prefix,
-        "argument": argument,
-        "extra": dict({"parenthesizedArgument": False}, **(extra or {})),
-    }
+class AnyTypeAnnotation(Node):
+    __slots__ = ()
 
 
-def StringLiteral(value):
-    return {
-        "type": "StringLiteral",
-        "value": value,
-        "extra": {"rawValue": value, "raw": json.dumps(value)},
-    }
+class StringTypeAnnotation(Node):
+    __slots__ = ()
 
 
-def BooleanLiteral(value):
-    return {"type": "BooleanLiteral", "value": value}
+class NullableTypeAnnotation(Node):
+    __slots__ = ("typeAnnotation",)
 
+    def __init__(self, type_annotation):
+        self.typeAnnotation = type_annotation
 
-def LogicalExpression(left, right, operator="&&"):
-    return {"type": "LogicalExpression", "left": left, "right": right, "operator": operator}
 
+class GenericTypeAnnotation(Node):
+    __slots__ = ("id", "typeParameters")
 
-def NullLiteral():
-    return {"type": "NullLiteral"}
+    def __init__(self, id_, type_parameters=None):
+        self.id = id_
+        self.typeParameters = type_parameters
 
 
-def ObjectProperty(key, value, method=False, computed=False, shorthand=False):
-    return {
-        "type": "ObjectProperty",
-        "key": key,
-        "value": value,
-        "method": method,
-        "computed": computed,
-        "shorthand": shorthand,
-    }
+class AssignmentPattern(Node):
+    __slots__ = ("left", "right")
 
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
 
-def ArrowFunctionExpression(params=None, body=None, id=None, generator=False, async_=False):
-    return {
-        "type": "ArrowFunctionExpression",
-        "params": params or [],
-        "body": body or [],
-        "id": id,
-        "generator": generator,
-        "async": async_,
-    }
 
+class ObjectExpression(Node):
+    __slots__ = ("properties",)
 
-def DeclareTypeAlias(id_, right, type_parameters=None):
-    return {
-        "type": "DeclareTypeAlias",
-        "id": id_,
-        "right": right,
-        "typeParameters": type_parameters,
-    }
+    def __init__(self, properties=None):
+        self.properties = properties or []
 
 
-def ObjectTypeAnnotation(properties, call_properties=None, indexers=None, exact=False):
-    return {
-        "type": "ObjectTypeAnnotation",
-        "properties": properties,
-        "callProperties": call_properties or [],
-        "indexers": indexers or [],
-        "exact": exact,
-    }
+class ExpressionStatement(Node):
+    __slots__ = ("expression",)
 
+    def __init__(self, expression):
+        self.expression = expression
 
-def ObjectTypeProperty(
-    key,
-    value,
-    static=False,
-    kind="init",
-    method=False,
-    variance=None,
-    optional=False,
-    force_variance=False,
-):
-    node = {
-        "type": "ObjectTypeProperty",
-        "key": key,
-        "value": value,
-        "static": static,
-        "kind": kind,
-        "method": method,
-        "optional": optional,
-    }
 
-    # This is necessary because the generated AST from babylon
-    # includes the `variance` key only in some cases
-    if force_variance or variance:
-        node["variance"] = variance
+class AssignmentExpression(Node):
+    __slots__ = ("operator", "left", "right")
 
-    return node
+    def __init__(self, left, right, operator="="):
+        self.operator = operator
+        self.left = left
+        self.right = right
 
 
-def FunctionTypeAnnotation(params=None, rest=None, type_parameters=None, return_type=None):
-    return {
-        "type": "FunctionTypeAnnotation",
-        "params": params or [],
-        "rest": rest,
-        "typeParameters": type_parameters,
-        "returnType": return_type,
-    }
+class MemberExpression(Node):
+    __slots__ = ("object", "property", "computed")
 
+    def __init__(self, object_, property_, computed=False):
+        self.object = object_
+        self.property = property_
+        self.computed = computed
 
-def FunctionTypeParam(name, optional=False, type_annotation=None):
-    return {
-        "type": "FunctionTypeParam",
-        "name": name,
-        "optional": optional,
-        "typeAnnotation": type_annotation,
-    }
 
+class ThisExpression(Node):
+    __slots__ = ()
 
-def VoidTypeAnnotation():
-    return {"type": "VoidTypeAnnotation"}
 
+class ConditionalExpression(Node):
+    __slots__ = ("test", "consequent", "alternate")
 
-def UnionTypeAnnotation(types):
-    return {"type": "UnionTypeAnnotation", "types": types}
+    def __init__(self, test, consequent, alternate):
+        self.test = test
+        self.consequent = consequent
+        self.alternate = alternate
 
 
-def CommentLine(value):
-    return {"type": "CommentLine", "value": " " + str(value).strip()}
+class NumericLiteral(Node):
+    __slots__ = ("value", "extra")
 
+    def __init__(self, value):
+        self.value = value
+        self.extra = {"rawValue": value, "raw": json.dumps(value)}
 
-def ObjectTypeIndexer(id_, key, value, static=False, variance=None):
-    return {
-        "type": "ObjectTypeIndexer",
-        "id": id_,
-        "key": key,
-        "value": value,
-        "static": static,
-        "variance": variance,
-    }
 
+class CallExpression(Node):
+    __slots__ = ("callee", "arguments")
 
-def VariableDeclaration(declarations, kind="const"):
-    return {"type": "VariableDeclaration", "declarations": declarations, "kind": kind}
+    def __init__(self, callee, arguments):
+        self.callee = callee
+        self.arguments = arguments
 
 
-def VariableDeclarator(id_, init=None):
-    return {"type": "VariableDeclarator", "id": id_, "init": init}
+class TypeParameterInstantiation(Node):
+    __slots__ = ("params",)
 
+    def __init__(self, params):
+        self.params = params
 
-def ArrayPattern(elements):
-    return {"type": "ArrayPattern", "elements": elements}
 
+class ExistsTypeAnnotation(Node):
+    __slots__ = ()
 
-def TypeCastExpression(expression, type_annotation, extra=None):
-    return {
-        "type": "TypeCastExpression",
-        "expression": expression,
-        "typeAnnotation": type_annotation,
-        "extra": dict({"parenthesized": True}, **(extra or {})),
-    }
 
+class BooleanTypeAnnotation(Node):
+    __slots__ = ()
 
-def NewExpression(callee, arguments=None):
-    return {"type": "NewExpression", "callee": callee, "arguments": arguments or []}
 
+class ArrayExpression(Node):
+    __slots__ = ("elements",)
 
-def ReturnStatement(argument):
-    return {"type": "ReturnStatement", "argument": argument}
+    def __init__(self, elements=None):
+        self.elements = elements or []
+
+
+class BinaryExpression(Node):
+    __slots__ = ("left", "right", "operator")
+
+    def __init__(self, left, right, operator="==="):
+        self.left = left
+        self.right = right
+        self.operator = operator
+
+
+class UnaryExpression(Node):
+    __slots__ = ("operator", "prefix", "argument", "extra")
+
+    def __init__(self, operator=None, prefix=True, argument=None, extra=None):
+        self.operator = operator
+        self.prefix = prefix
+        self.argument = argument
+        self.extra = dict({"parenthesizedArgument": False}, **(extra or {}))
+
+
+class StringLiteral(Node):
+    __slots__ = ("value", "extra")
+
+    def __init__(self, value):
+        self.value = value
+        self.extra = {"rawValue": value, "raw": json.dumps(value)}
+
+
+class BooleanLiteral(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class LogicalExpression(Node):
+    __slots__ = ("left", "right", "operator")
+
+    def __init__(self, left, right, operator="&&"):
+        self.left = left
+        self.right = right
+        self.operator = operator
+
+
+class NullLiteral(Node):
+    __slots__ = ()
+
+
+class ObjectProperty(Node):
+    __slots__ = ("key", "value", "method", "computed", "shorthand")
+
+    def __init__(self, key, value, method=False, computed=False, shorthand=False):
+        self.key = key
+        self.value = value
+        self.method = method
+        self.computed = computed
+        self.shorthand = shorthand
+
+
+class ArrowFunctionExpression(Node):
+    __slots__ = ("params", "body", "id", "generator", "async")
+
+    def __init__(self, params=None, body=None, id=None, generator=False, async_=False):
+        self.params = params or []
+        self.body = body or []
+        self.id = id
+        self.generator = generator
+        setattr(self, "async", async_)
+
+
+class DeclareTypeAlias(Node):
+    __slots__ = ("id", "right", "typeParameters")
+
+    def __init__(self, id_, right, type_parameters=None):
+        self.id = id_
+        self.right = right
+        self.typeParameters = type_parameters
+
+
+class TypeAlias(Node):
+    __slots__ = ("id", "typeParameters", "right")
+
+    def __init__(self, id_, right, type_parameters=None):
+        self.id = id_
+        self.typeParameters = type_parameters
+        self.right = right
+
+
+class ObjectTypeAnnotation(Node):
+    __slots__ = ("properties", "callProperties", "indexers", "exact")
+
+    def __init__(self, properties, call_properties=None, indexers=None, exact=False):
+        self.properties = properties
+        self.callProperties = call_properties or []
+        self.indexers = indexers or []
+        self.exact = exact
+
+
+class ObjectTypeProperty(Node):
+    __slots__ = ("key", "value", "static", "kind", "method", "optional", "variance")
+
+    def __init__(
+        self,
+        key,
+        value,
+        static=False,
+        kind="init",
+        method=False,
+        variance=None,
+        optional=False,
+        force_variance=False,
+    ):
+        self.key = key
+        self.value = value
+        self.static = static
+        self.kind = kind
+        self.method = method
+        self.optional = optional
+
+        # This is necessary because the generated AST from babylon
+        # includes the `variance` key only in some cases
+        if force_variance or variance:
+            self.variance = variance
+
+
+class FunctionTypeAnnotation(Node):
+    __slots__ = ("params", "rest", "typeParameters", "returnType")
+
+    def __init__(self, params=None, rest=None, type_parameters=None, return_type=None):
+        self.params = params or []
+        self.rest = rest
+        self.typeParameters = type_parameters
+        self.returnType = return_type
+
+
+class FunctionTypeParam(Node):
+    __slots__ = ("name", "optional", "typeAnnotation")
+
+    def __init__(self, name, optional=False, type_annotation=None):
+        self.name = name
+        self.optional = optional
+        self.typeAnnotation = type_annotation
+
+
+class VoidTypeAnnotation(Node):
+    __slots__ = ()
+
+
+class UnionTypeAnnotation(Node):
+    __slots__ = ("types",)
+
+    def __init__(self, types):
+        self.types = types
+
+
+class CommentLine(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = " " + str(value).strip()
+
+
+class ObjectTypeIndexer(Node):
+    __slots__ = ("id", "key", "value", "static", "variance")
+
+    def __init__(self, id_, key, value, static=False, variance=None):
+        self.id = id_
+        self.key = key
+        self.value = value
+        self.static = static
+        self.variance = variance
+
+
+class VariableDeclaration(Node):
+    __slots__ = ("declarations", "kind")
+
+    def __init__(self, declarations, kind="const"):
+        self.declarations = declarations
+        self.kind = kind
+
+
+class VariableDeclarator(Node):
+    __slots__ = ("id", "init")
+
+    def __init__(self, id_, init=None):
+        self.id = id_
+        self.init = init
+
+
+class ArrayPattern(Node):
+    __slots__ = ("elements",)
+
+    def __init__(self, elements):
+        self.elements = elements
+
+
+class TypeCastExpression(Node):
+    __slots__ = ("expression", "typeAnnotation", "extra")
+
+    def __init__(self, expression, type_annotation, extra=None):
+        self.expression = expression
+        self.typeAnnotation = type_annotation
+        self.extra = dict({"parenthesized": True}, **(extra or {}))
+
+
+class NewExpression(Node):
+    __slots__ = ("callee", "arguments")
+
+    def __init__(self, callee, arguments=None):
+        self.callee = callee
+        self.arguments = arguments or []
+
+
+class ReturnStatement(Node):
+    __slots__ = ("argument",)
+
+    def __init__(self, argument):
+        self.argument = argument
+
+
+class ImportDeclaration(Node):
+    __slots__ = ("specifiers", "source", "importKind")
+
+    def __init__(self, specifiers, source, import_kind="value"):
+        self.specifiers = specifiers
+        self.source = source
+        self.importKind = import_kind
+
+
+class ImportSpecifier(Node):
+    __slots__ = ("imported", "local", "importKind")
+
+    def __init__(self, imported, local, import_kind=None):
+        self.imported = imported
+        self.local = local
+        self.importKind = import_kind
@@ -0,0 +1,646 @@
+import json
+from collections.abc import Mapping
+from typing import Any, Callable, List, Optional
+
+INDENT = "  "
+
+# Precedence of the expressions, an operand binding looser than its position is parenthesized
+SEQUENCE = 0
+ASSIGNMENT = 2
+CONDITIONAL = 4
+UNARY = 16
+POSTFIX = 17
+CALL = 18
+MEMBER = 19
+PRIMARY = 20
+
+BINARY_PRECEDENCE = {
+    "??": 5,
+    "||": 5,
+    "&&": 6,
+    "|": 7,
+    "^": 8,
+    "&": 9,
+    "==": 10,
+    "!=": 10,
+    "===": 10,
+    "!==": 10,
+    "<": 11,
+    ">": 11,
+    "<=": 11,
+    ">=": 11,
+    "instanceof": 11,
+    "in": 11,
+    "<<": 12,
+    ">>": 12,
+    ">>>": 12,
+    "+": 13,
+    "-": 13,
+    "*": 14,
+    "/": 14,
+    "%": 14,
+    "**": 15,
+}
+
+EXPRESSION_PRECEDENCE = {
+    "SequenceExpression": SEQUENCE,
+    "AssignmentExpression": ASSIGNMENT,
+    "ArrowFunctionExpression": ASSIGNMENT,
+    "YieldExpression": ASSIGNMENT,
+    "ConditionalExpression": CONDITIONAL,
+    "UnaryExpression": UNARY,
+    "AwaitExpression": UNARY,
+    "UpdateExpression": POSTFIX,
+    "CallExpression": CALL,
+    "NewExpression": CALL,
+    "MemberExpression": MEMBER,
+}
+
+VARIANCE = {"plus": "+", "minus": "-"}
+
+
+def get_precedence(node: Any) -> int:
+    if node["type"] in ("BinaryExpression", "LogicalExpression"):
+        return BINARY_PRECEDENCE[node["operator"]]
+
+    return EXPRESSION_PRECEDENCE.get(node["type"], PRIMARY)
+
+
+class JavaScriptPrinter:
+    """
+    Prints the Babel AST built with `json_codegen.astlib.javascript` as JavaScript with Flow
+    annotations, formatted like the fixtures of the generators: two spaces indentation, double
+    quotes, trailing commas in multi-line object types and a blank line between declarations.
+
+    Expressions are printed on one line like `@babel/generator` does, without wrapping.
+    """
+
+    def __init__(self, indent: str = INDENT):
+        self.indent = indent
+
+    def to_source(self, node: Any) -> str:
+        code = self.print(node, 0)
+
+        return code + "\n" if code else code
+
+    def print(self, node: Any, level: int, separator: str = "\n") -> str:
+        """
+        Returns the code of `node` preceded by its leading comments, the lines after the first
+        one are indented for `level`
+        """
+        try:
+            method: Callable[[Any, int], str] = getattr(self, "print_" + node["type"])
+        except AttributeError:
+            raise NotImplementedError(f"Can't print {node['type']} nodes") from None
+
+        code = method(node, level)
+        comments = node.get("leadingComments")
+
+        if comments:
+            indent = self.indent * level
+            lines = [self.print_comment(c) for c in comments]
+            code = f"\n{indent}".join(lines) + separator + indent + code
+
+        return code
+
+    def print_comment(self, comment: Any) -> str:
+        if comment["type"] == "CommentBlock":
+            return f"/*{comment['value']}*/"
+
+        return f"//{comment['value']}"
+
+    def expression(self, node: Any, level: int, precedence: int = ASSIGNMENT) -> str:
+        code = self.print(node, level)
+
+        if get_precedence(node) < precedence:
+            return f"({code})"
+
+        return code
+
+    def join(self, nodes: List[Any], level: int, precedence: int = ASSIGNMENT) -> str:
+        return ", ".join(self.expression(n, level, precedence) for n in nodes)
+
+    def lines(self, nodes: List[Any], level: int, blank_line: Callable[[Any, Any], bool]) -> str:
+        """
+        Prints `nodes` one per line at `level`, separated by a blank line when `blank_line` of
+        two consecutive nodes is true
+        """
+        indent = self.indent * level
+        lines = []
+
+        for i, node in enumerate(nodes):
+            if i and blank_line(nodes[i - 1], node):
+                lines.append("")
+
+            lines.append(indent + self.print(node, level))
+
+        return "\n".join(lines)
+
+    def block(self, nodes: List[Any], level: int, blank_line: Callable[[Any, Any], bool]) -> str:
+        if not nodes:
+            return "{}"
+
+        return "{\n" + self.lines(nodes, level + 1, blank_line) + "\n" + self.indent * level + "}"
+
+    # Program structure
+
+    def print_File(self, node: Any, level: int) -> str:
+        return self.print(node["program"], level)
+
+    def print_Program(self, node: Any, level: int) -> str:
+        directives = [self.print(d, level) for d in node.get("directives") or []]
+        statements = [self.print(s, level) for s in node["body"]]
+
+        # The leading comments of the module are separated from the first statement
+        if statements:
+            statements[0] = self.print(node["body"][0], level, separator="\n\n")
+
+        return "\n\n".join(directives + statements)
+
+    def print_Directive(self, node: Any, level: int) -> str:
+        return self.print(node["value"], level) + ";"
+
+    def print_DirectiveLiteral(self, node: Any, level: int) -> str:
+        return json.dumps(node["value"], ensure_ascii=False)
+
+    # Statements
+
+    def print_BlockStatement(self, node: Any, level: int) -> str:
+        # Groups of statements of the same kind are separated by a blank line
+        return self.block(node["body"], level, lambda p, c: p["type"] != c["type"])
+
+    def print_ExpressionStatement(self, node: Any, level: int) -> str:
+        code = self.expression(node["expression"], level, SEQUENCE)
+
+        # Avoid parsing the statement as a block or a declaration
+        if code.startswith(("{", "function", "class")):
+            code = f"({code})"
+
+        return code + ";"
+
+    def print_ReturnStatement(self, node: Any, level: int) -> str:
+        if node.get("argument") is None:
+            return "return;"
+
+        return f"return {self.expression(node['argument'], level, SEQUENCE)};"
+
+    def print_VariableDeclaration(self, node: Any, level: int) -> str:
+        return f"{node['kind']} {self.join(node['declarations'], level)};"
+
+    def print_VariableDeclarator(self, node: Any, level: int) -> str:
+        code = self.print(node["id"], level)
+
+        if node.get("init") is not None:
+            code += " = " + self.expression(node["init"], level)
+
+        return code
+
+    def print_ImportDeclaration(self, node: Any, level: int) -> str:
+        kind = node.get("importKind")
+        default, names = [], []
+
+        for specifier in node["specifiers"]:
+            if specifier["type"] == "ImportSpecifier":
+                names.append(self.print(specifier, level))
+            else:
+                default.append(self.print(specifier, level))
+
+        if names:
+            default.append("{ " + ", ".join(names) + " }")
+
+        source = self.print(node["source"], level)
+        prefix = f"import {kind} " if kind in ("type", "typeof") else "import "
+
+        if not default:
+            return f"{prefix}{source};"
+
+        return f"{prefix}{', '.join(default)} from {source};"
+
+    def print_ImportSpecifier(self, node: Any, level: int) -> str:
+        imported = self.print(node["imported"], level)
+        local = self.print(node.get("local") or node["imported"], level)
+        kind = node.get("importKind")
+        code = imported if imported == local else f"{imported} as {local}"
+
+        return f"{kind} {code}" if kind in ("type", "typeof") else code
+
+    def print_ImportDefaultSpecifier(self, node: Any, level: int) -> str:
+        return self.print(node["local"], level)
+
+    def print_ImportNamespaceSpecifier(self, node: Any, level: int) -> str:
+        return "* as " + self.print(node["local"], level)
+
+    def print_ExportNamedDeclaration(self, node: Any, level: int) -> str:
+        kind = "type " if node.get("exportKind") == "type" else ""
+
+        if node.get("declaration") is not None:
+            return "export " + self.print(node["declaration"], level)
+
+        code = f"export {kind}{{ {self.join(node['specifiers'], level)} }}"
+
+        if node.get("source") is not None:
+            code += " from " + self.print(node["source"], level)
+
+        return code + ";"
+
+    def print_ExportSpecifier(self, node: Any, level: int) -> str:
+        local = self.print(node["local"], level)
+        exported = self.print(node.get("exported") or node["local"], level)
+
+        return local if local == exported else f"{local} as {exported}"
+
+    def print_ClassDeclaration(self, node: Any, level: int) -> str:
+        code = "class " + self.print(node["id"], level)
+
+        if node.get("superClass") is not None:
+            code += " extends " + self.expression(node["superClass"], level, CALL)
+
+        return code + " " + self.print(node["body"], level)
+
+    def print_ClassBody(self, node: Any, level: int) -> str:
+        # Properties are grouped together, methods are separated by a blank line
+        def blank_line(previous: Any, current: Any) -> bool:
+            return not (previous["type"] == current["type"] == "ClassProperty")
+
+        return self.block(node["body"], level, blank_line)
+
+    def print_ClassProperty(self, node: Any, level: int) -> str:
+        code = "static " if node.get("static") else ""
+        code += self.variance(node.get("variance")) + self.key(node, level)
+
+        if node.get("typeAnnotation") is not None:
+            code += ": " + self.print(node["typeAnnotation"], level)
+
+        if node.get("value") is not None:
+            code += " = " + self.expression(node["value"], level)
+
+        return code + ";"
+
+    def print_ClassMethod(self, node: Any, level: int) -> str:
+        code = "static " if node.get("static") else ""
+        code += "async " if node.get("async") else ""
+        code += "*" if node.get("generator") else ""
+        code += node["kind"] + " " if node["kind"] in ("get", "set") else ""
+        code += self.key(node, level) + self.params(node, level)
+
+        return code + " " + self.print(node["body"], level)
+
+    def print_DeclareTypeAlias(self, node: Any, level: int) -> str:
+        return "declare " + self.print_TypeAlias(node, level)
+
+    def print_TypeAlias(self, node: Any, level: int) -> str:
+        code = "type " + self.print(node["id"], level)
+
+        if node.get("typeParameters") is not None:
+            code += self.print(node["typeParameters"], level)
+
+        right = node["right"]
+
+        # Object types declared on their own are printed one member per line
+        if right["type"] == "ObjectTypeAnnotation":
+            return f"{code} = {self.object_type(right, level, multiline=True)};"
+
+        return f"{code} = {self.print(right, level)};"
+
+    # Expressions
+
+    def print_Identifier(self, node: Any, level: int) -> str:
+        code: str = node["name"] + ("?" if node.get("optional") else "")
+
+        if node.get("typeAnnotation") is not None:
+            code += ": " + self.print(node["typeAnnotation"], level)
+
+        return code
+
+    def print_ThisExpression(self, node: Any, level: int) -> str:
+        return "this"
+
+    def print_StringLiteral(self, node: Any, level: int) -> str:
+        return json.dumps(node["value"], ensure_ascii=False)
+
+    def print_NumericLiteral(self, node: Any, level: int) -> str:
+        extra = node.get("extra") or {}
+
+        return extra.get("raw") or json.dumps(node["value"])
+
+    def print_BooleanLiteral(self, node: Any, level: int) -> str:
+        return "true" if node["value"] else "false"
+
+    def print_NullLiteral(self, node: Any, level: int) -> str:
+        return "null"
+
+    def print_ArrayExpression(self, node: Any, level: int) -> str:
+        return "[" + ", ".join(self.element(e, level) for e in node["elements"]) + "]"
+
+    def print_ArrayPattern(self, node: Any, level: int) -> str:
+        return self.print_ArrayExpression(node, level)
+
+    def print_ObjectExpression(self, node: Any, level: int) -> str:
+        if not node["properties"]:
+            return "{}"
+
+        return "{ " + self.join(node["properties"], level) + " }"
+
+    def print_ObjectPattern(self, node: Any, level: int) -> str:
+        return self.print_ObjectExpression(node, level)
+
+    def print_ObjectProperty(self, node: Any, level: int) -> str:
+        if node.get("shorthand"):
+            return self.print(node["value"], level)
+
+        return self.key(node, level) + ": " + self.expression(node["value"], level)
+
+    def print_SpreadElement(self, node: Any, level: int) -> str:
+        return "..." + self.expression(node["argument"], level)
+
+    def print_RestElement(self, node: Any, level: int) -> str:
+        return self.print_SpreadElement(node, level)
+
+    def print_AssignmentPattern(self, node: Any, level: int) -> str:
+        return self.print(node["left"], level) + " = " + self.expression(node["right"], level)
+
+    def print_AssignmentExpression(self, node: Any, level: int) -> str:
+        left = self.expression(node["left"], level, CALL)
+        right = self.expression(node["right"], level)
+
+        return f"{left} {node['operator']} {right}"
+
+    def print_SequenceExpression(self, node: Any, level: int) -> str:
+        return self.join(node["expressions"], level)
+
+    def print_ConditionalExpression(self, node: Any, level: int) -> str:
+        test = self.expression(node["test"], level, CONDITIONAL + 1)
+        consequent = self.expression(node["consequent"], level)
+        alternate = self.expression(node["alternate"], level, CONDITIONAL)
+
+        return f"{test} ? {consequent} : {alternate}"
+
+    def print_BinaryExpression(self, node: Any, level: int) -> str:
+        precedence = get_precedence(node)
+
+        # Exponentiation is right associative, the other operators are left associative
+        right_associative = node["operator"] == "**"
+        left = self.expression(node["left"], level, precedence + right_associative)
+        right = self.expression(node["right"], level, precedence + (not right_associative))
+
+        return f"{left} {node['operator']} {right}"
+
+    def print_LogicalExpression(self, node: Any, level: int) -> str:
+        return self.print_BinaryExpression(node, level)
+
+    def print_UnaryExpression(self, node: Any, level: int) -> str:
+        operator: str = node["operator"]
+        argument = self.expression(node["argument"], level, UNARY)
+
+        if operator.isalpha() or argument.startswith(operator):
+            return f"{operator} {argument}"
+
+        return operator + argument
+
+    def print_UpdateExpression(self, node: Any, level: int) -> str:
+        argument = self.expression(node["argument"], level, POSTFIX)
+        operator: str = node["operator"]
+
+        if node.get("prefix"):
+            return operator + argument
+
+        return argument + operator
+
+    def print_MemberExpression(self, node: Any, level: int) -> str:
+        object_ = self.expression(node["object"], level, CALL)
+
+        # Integers need parentheses or their dot is read as a decimal point
+        if node["object"]["type"] == "NumericLiteral" and object_.isdigit():
+            object_ = f"({object_})"
+
+        if node.get("computed"):
+            return f"{object_}[{self.expression(node['property'], level, SEQUENCE)}]"
+
+        return f"{object_}.{self.print(node['property'], level)}"
+
+    def print_CallExpression(self, node: Any, level: int) -> str:
+        callee = self.expression(node["callee"], level, CALL)
+
+        return f"{callee}({self.join(node['arguments'], level)})"
+
+    def print_NewExpression(self, node: Any, level: int) -> str:
+        callee = self.expression(node["callee"], level, MEMBER)
+
+        return f"new {callee}({self.join(node['arguments'] or [], level)})"
+
+    def print_ArrowFunctionExpression(self, node: Any, level: int) -> str:
+        code = ("async " if node.get("async") else "") + self.params(node, level) + " => "
+        body = node["body"]
+
+        if body["type"] == "BlockStatement":
+            return code + self.print(body, level)
+
+        if body["type"] == "ObjectExpression":
+            return code + f"({self.print(body, level)})"
+
+        return code + self.expression(body, level)
+
+    def print_TypeCastExpression(self, node: Any, level: int) -> str:
+        expression = self.expression(node["expression"], level)
+
+        return f"({expression}: {self.print(node['typeAnnotation'], level)})"
+
+    # Flow types
+
+    def print_TypeAnnotation(self, node: Any, level: int) -> str:
+        return self.print(node["typeAnnotation"], level)
+
+    def print_AnyTypeAnnotation(self, node: Any, level: int) -> str:
+        return "any"
+
+    def print_MixedTypeAnnotation(self, node: Any, level: int) -> str:
+        return "mixed"
+
+    def print_EmptyTypeAnnotation(self, node: Any, level: int) -> str:
+        return "empty"
+
+    def print_NumberTypeAnnotation(self, node: Any, level: int) -> str:
+        return "number"
+
+    def print_StringTypeAnnotation(self, node: Any, level: int) -> str:
+        return "string"
+
+    def print_BooleanTypeAnnotation(self, node: Any, level: int) -> str:
+        return "boolean"
+
+    def print_VoidTypeAnnotation(self, node: Any, level: int) -> str:
+        return "void"
+
+    def print_NullLiteralTypeAnnotation(self, node: Any, level: int) -> str:
+        return "null"
+
+    def print_ExistsTypeAnnotation(self, node: Any, level: int) -> str:
+        return "*"
+
+    def print_StringLiteralTypeAnnotation(self, node: Any, level: int) -> str:
+        return json.dumps(node["value"], ensure_ascii=False)
+
+    def print_NumberLiteralTypeAnnotation(self, node: Any, level: int) -> str:
+        return self.print_NumericLiteral(node, level)
+
+    def print_BooleanLiteralTypeAnnotation(self, node: Any, level: int) -> str:
+        return self.print_BooleanLiteral(node, level)
+
+    def print_NullableTypeAnnotation(self, node: Any, level: int) -> str:
+        return "?" + self.type_operand(node["typeAnnotation"], level)
+
+    def print_ArrayTypeAnnotation(self, node: Any, level: int) -> str:
+        return self.type_operand(node["elementType"], level) + "[]"
+
+    def print_UnionTypeAnnotation(self, node: Any, level: int) -> str:
+        return " | ".join(self.type_operand(t, level) for t in node["types"])
+
+    def print_IntersectionTypeAnnotation(self, node: Any, level: int) -> str:
+        return " & ".join(self.type_operand(t, level) for t in node["types"])
+
+    def print_TupleTypeAnnotation(self, node: Any, level: int) -> str:
+        return "[" + ", ".join(self.print(t, level) for t in node["types"]) + "]"
+
+    def print_GenericTypeAnnotation(self, node: Any, level: int) -> str:
+        code = self.print(node["id"], level)
+
+        if node.get("typeParameters") is not None:
+            code += self.print(node["typeParameters"], level)
+
+        return code
+
+    def print_QualifiedTypeIdentifier(self, node: Any, level: int) -> str:
+        return self.print(node["qualification"], level) + "." + self.print(node["id"], level)
+
+    def print_TypeParameterInstantiation(self, node: Any, level: int) -> str:
+        return "<" + ", ".join(self.print(p, level) for p in node["params"]) + ">"
+
+    def print_FunctionTypeAnnotation(self, node: Any, level: int) -> str:
+        return self.function_type(node, level) + " => " + self.print(node["returnType"], level)
+
+    def print_FunctionTypeParam(self, node: Any, level: int) -> str:
+        type_ = self.print(node["typeAnnotation"], level)
+
+        if node.get("name") is None:
+            return type_
+
+        optional = "?" if node.get("optional") else ""
+
+        return f"{self.print(node['name'], level)}{optional}: {type_}"
+
+    def print_ObjectTypeAnnotation(self, node: Any, level: int) -> str:
+        return self.object_type(node, level)
+
+    def print_ObjectTypeProperty(self, node: Any, level: int) -> str:
+        code = "static " if node.get("static") else ""
+        code += self.variance(node.get("variance")) + self.print(node["key"], level)
+        value = node["value"]
+
+        if node.get("method"):
+            return (
+                code
+                + self.function_type(value, level)
+                + ": "
+                + self.print(value["returnType"], level)
+            )
+
+        return code + ("?" if node.get("optional") else "") + ": " + self.print(value, level)
+
+    def print_ObjectTypeIndexer(self, node: Any, level: int) -> str:
+        code = "static " if node.get("static") else ""
+        code += self.variance(node.get("variance")) + "["
+
+        if node.get("id") is not None:
+            code += self.print(node["id"], level) + ": "
+
+        return code + self.print(node["key"], level) + "]: " + self.print(node["value"], level)
+
+    def print_ObjectTypeCallProperty(self, node: Any, level: int) -> str:
+        code = "static " if node.get("static") else ""
+
+        return (
+            code
+            + self.function_type(node["value"], level)
+            + ": "
+            + self.print(node["value"]["returnType"], level)
+        )
+
+    # Helpers
+
+    def key(self, node: Any, level: int) -> str:
+        key = self.print(node["key"], level)
+
+        return f"[{key}]" if node.get("computed") else key
+
+    def variance(self, variance: Optional[Any]) -> str:
+        if variance is None:
+            return ""
+
+        kind = variance["kind"] if isinstance(variance, Mapping) else variance
+
+        return VARIANCE.get(kind, "")
+
+    def element(self, node: Optional[Any], level: int) -> str:
+        return "" if node is None else self.expression(node, level)
+
+    def params(self, node: Any, level: int) -> str:
+        return "(" + ", ".join(self.print(p, level) for p in node["params"]) + ")"
+
+    def type_operand(self, node: Any, level: int) -> str:
+        code = self.print(node, level)
+
+        if node["type"] in ("UnionTypeAnnotation", "IntersectionTypeAnnotation"):
+            return f"({code})"
+
+        if node["type"] == "FunctionTypeAnnotation":
+            return f"({code})"
+
+        return code
+
+    def function_type(self, node: Any, level: int) -> str:
+        params = [self.print(p, level) for p in node["params"]]
+
+        if node.get("rest") is not None:
+            params.append("..." + self.print(node["rest"], level))
+
+        code = "(" + ", ".join(params) + ")"
+
+        if node.get("typeParameters") is not None:
+            code = self.print(node["typeParameters"], level) + code
+
+        return code
+
+    def object_type(self, node: Any, level: int, multiline: bool = False) -> str:
+        members = node["properties"] + node.get("indexers", []) + node.get("callProperties", [])
+        start, end = ("{|", "|}") if node.get("exact") else ("{", "}")
+
+        if not members:
+            return start + end
+
+        if not multiline:
+            return f"{start} " + ", ".join(self.print(m, level) for m in members) + f" {end}"
+
+        # Methods are separated from the properties by a blank line
+        def blank_line(previous: Any, current: Any) -> bool:
+            return bool(previous.get("method") or current.get("method"))
+
+        indent = self.indent * (level + 1)
+        lines: List[str] = []
+
+        for i, member in enumerate(members):
+            if i and blank_line(members[i - 1], member):
+                lines.append("")
+
+            lines.append(indent + self.print(member, level + 1) + ",")
+
+        return start + "\n" + "\n".join(lines) + "\n" + self.indent * level + end
+
+
+_printer = JavaScriptPrinter()
+
+
+def to_source(node: Mapping) -> str:
+    """
+    Returns the JavaScript code of the Babel AST `node`
+    """
+    return _printer.to_source(node)
@@ -0,0 +1,493 @@
+import os
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from json_codegen.cache import Cache
+from json_codegen.cli import (
+    EMIT_AST,
+    EMIT_BABEL,
+    Target,
+    format_output,
+    get_generator,
+    get_generator_from_args,
+    get_output_extension,
+    get_parser_options,
+    load_instance,
+    stream_output,
+    write_code,
+    write_output,
+)
+from json_codegen.core import SchemaParser
+from json_codegen.js_renderer import JsRenderer
+from json_codegen.manifest import BuildManifest, format_depfile, get_fingerprint
+from json_codegen.profiling import GenerationProfile, PhaseTimer
+
+# Workers of the process pool are replaced after this many schemas to bound their memory
+MAX_TASKS_PER_CHILD = 50
+
+
+class SchemaResult(NamedTuple):
+    schema: str
+    output: str
+    error: Optional[str] = None
+    # Files referenced by the schema
+    dependencies: Tuple[str, ...] = ()
+    # If the generated code differs from the content of the output
+    changed: bool = True
+    # Seconds spent in each phase of the generation
+    timings: Dict[str, float] = {}
+    # AST left to print in a batch with bin/ast_to_js, with --emit babel
+    ast: Any = None
+
+
+# Arguments of `generate_target()` for the schema being generated, inherited by forked workers
+_target_instances: List[Tuple[str, str, Any, bool, PhaseTimer, str, bool]] = []
+
+
+def load_targets(
+    generators: List[Type[Any]],
+    filename: str,
+    args: Namespace,
+    cache: Optional[Cache] = None,
+    timers: Optional[List[PhaseTimer]] = None,
+) -> List[Any]:
+    """
+    Returns an instance of every generator in `generators` for the schema in `filename`, the
+    schema is decoded and parsed once and its state is shared by the instances.
+
+    `timers` are the `PhaseTimer`s of the generators.
+    """
+    instances = []
+    state = None
+
+    for generator, timer in zip(generators, timers or [PhaseTimer() for _ in generators]):
+        if state is not None and issubclass(generator, SchemaParser):
+            with timer.measure("parse"):
+                instance = generator.from_state(
+                    state, filename=filename, **get_parser_options(args)
+                )
+        else:
+            instance = load_instance(generator, filename, args, cache=cache, timer=timer)
+
+            if isinstance(instance, SchemaParser):
+                state = instance.get_state()
+
+        instances.append(instance)
+
+    return instances
+
+
+def report_result(
+    result: SchemaResult, check: bool = False, profile: Optional[GenerationProfile] = None
+) -> None:
+    """
+    Writes the outcome of `result` to stderr and adds its timings to `profile`
+    """
+    if profile is not None:
+        profile.add(result.schema, result.output, result.timings)
+
+    if result.error is not None:
+        sys.stderr.write(f"{result.schema}: {result.error}\n")
+    elif check and result.changed:
+        sys.stderr.write(f"{result.schema}: {result.output} is out of date\n")
+    elif check or not result.changed:
+        sys.stderr.write(f"{result.schema} -> {result.output} (unchanged)\n")
+    else:
+        sys.stderr.write(f"{result.schema} -> {result.output}\n")
+
+
+def get_manifest_fingerprint(args: Namespace) -> str:
+    return get_fingerprint(
+        extra_sources=[args.generator] if args.generator else [],
+        language=args.language,
+        generator=args.generator,
+        prefix=args.prefix,
+        prune=args.prune,
+        only=args.only,
+        hoist_shapes=args.hoist_shapes,
+        emit=args.emit,
+    )
+
+
+def get_dependencies(instance: Any) -> Tuple[str, ...]:
+    """
+    Returns the files loaded to resolve the references of the schema of `instance`
+    """
+    if isinstance(instance, SchemaParser):
+        return tuple(sorted(str(p) for p in instance.resolver.dependencies))
+
+    return ()
+
+
+def generate_output(
+    instance: Any,
+    output: str,
+    timer: PhaseTimer,
+    emit: str = EMIT_AST,
+    check: bool = False,
+    compact: bool = False,
+) -> Tuple[bool, Any]:
+    """
+    Writes the code of `instance` into `output`, returns if the output changed and, with
+    `EMIT_BABEL`, the AST to print with `render_pending()` instead of writing it
+    """
+    with timer.measure("generate"):
+        instance = instance.generate()
+
+    if emit == EMIT_BABEL and hasattr(instance, "as_js"):
+        return False, instance.as_ast()
+
+    write = partial(write_code, instance, emit=emit, compact=compact)
+
+    return stream_output(output, write, check=check, timer=timer), None
+
+
+def generate_schema(
+    args: Namespace, filename: str, output: str, cache: Optional[Cache] = None
+) -> SchemaResult:
+    """
+    Generates the code of one schema into `output`, failures are returned in the result
+    """
+    timer = PhaseTimer()
+
+    try:
+        generator = get_generator_from_args(args)
+        instance = load_instance(generator, filename, args, cache=cache, timer=timer)
+        changed, ast = generate_output(
+            instance, output, timer, args.emit, check=args.check, compact=args.compact
+        )
+    except Exception as e:
+        return SchemaResult(filename, output, f"{type(e).__name__}: {e}", timings=timer.timings)
+
+    return SchemaResult(
+        filename,
+        output,
+        dependencies=get_dependencies(instance),
+        changed=changed,
+        timings=timer.timings,
+        ast=ast,
+    )
+
+
+def generate_target(
+    filename: str,
+    output: str,
+    instance: Any,
+    check: bool = False,
+    timer: Optional[PhaseTimer] = None,
+    emit: str = EMIT_AST,
+    compact: bool = False,
+) -> SchemaResult:
+    """
+    Generates the code of a loaded target into `output`, failures are returned in the result
+    """
+    timer = timer or PhaseTimer()
+
+    try:
+        changed, ast = generate_output(instance, output, timer, emit, check=check, compact=compact)
+    except Exception as e:
+        return SchemaResult(filename, output, f"{type(e).__name__}: {e}", timings=timer.timings)
+
+    return SchemaResult(
+        filename,
+        output,
+        dependencies=get_dependencies(instance),
+        changed=changed,
+        timings=timer.timings,
+        ast=ast,
+    )
+
+
+def render_pending(
+    results: Iterable[SchemaResult], renderer: JsRenderer, check: bool = False
+) -> Iterator[SchemaResult]:
+    """
+    Prints the ASTs left in `results` in a single batch of `renderer` and writes them into
+    their outputs. The time spent printing is shared by the outputs.
+    """
+    results = list(results)
+    pending = [i for i, r in enumerate(results) if r.ast is not None]
+
+    if pending:
+        start = time.perf_counter()
+        codes = renderer.render_many([results[i].ast for i in pending], return_exceptions=True)
+        elapsed = (time.perf_counter() - start) / len(pending)
+
+        for i, code in zip(pending, codes):
+            result = results[i]
+            timer = PhaseTimer()
+            timer.timings.update(result.timings, as_code=elapsed)
+
+            try:
+                if isinstance(code, Exception):
+                    raise code
+
+                with timer.measure("write"):
+                    changed = write_output(result.output, code, check=check)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                results[i] = result._replace(error=error, timings=timer.timings, ast=None)
+            else:
+                results[i] = result._replace(changed=changed, timings=timer.timings, ast=None)
+
+    yield from results
+
+
+def _generate_target_task(index: int) -> SchemaResult:
+    return generate_target(*_target_instances[index])
+
+
+def get_target_outputs(args: Namespace, filename: str, targets: List[Target]) -> List[str]:
+    output_dir = Path(args.output_dir or "")
+
+    return [
+        str(
+            output_dir
+            / format_output(
+                t.output or args.output_template,
+                filename,
+                get_output_extension(get_generator(t.language), args.emit),
+            )
+        )
+        for t in targets
+    ]
+
+
+def write_depfile(args: Namespace, inputs: Mapping[str, Iterable[str]]) -> None:
+    """
+    Writes to --depfile a rule for every output depending on its `inputs` and on the external
+    generator
+    """
+    generator = [args.generator] if args.generator else []
+    rules = [(output, [*i, *generator]) for output, i in sorted(inputs.items())]
+
+    write_output(args.depfile, format_depfile(rules))
+
+
+def generate_targets(
+    args: Namespace, filename: str, targets: List[Target], cache: Optional[Cache] = None
+) -> List[SchemaResult]:
+    """
+    Generates every target of `targets` from a single parse of the schema in `filename`, with
+    more than one job the targets are generated in forked processes sharing the parsed schema
+    """
+    outputs = get_target_outputs(args, filename, targets)
+
+    timers = [PhaseTimer() for _ in targets]
+
+    try:
+        generators = [get_generator(t.language) for t in targets]
+        instances = load_targets(generators, filename, args, cache=cache, timers=timers)
+    except Exception as e:
+        return [SchemaResult(filename, o, f"{type(e).__name__}: {e}") for o in outputs]
+
+    _target_instances[:] = [
+        (filename, o, i, args.check, t, args.emit, args.compact)
+        for o, i, t in zip(outputs, instances, timers)
+    ]
+
+    try:
+        jobs = min(args.jobs, len(targets))
+
+        if jobs > 1:
+            from multiprocessing import get_all_start_methods, get_context
+
+            # Workers inherit the parsed schema instead of receiving a copy
+            if "fork" in get_all_start_methods():
+                with get_context("fork").Pool(jobs) as pool:
+                    return pool.map(_generate_target_task, range(len(outputs)))
+
+        return [_generate_target_task(i) for i in range(len(outputs))]
+    finally:
+        _target_instances.clear()
+
+
+def _generate_schema_task(task: Tuple[Namespace, str, str]) -> SchemaResult:
+    return generate_schema(*task)
+
+
+def generate_many(
+    args: Namespace,
+    tasks: List[Tuple[str, str]],
+    jobs: int = 1,
+    cache: Optional[Cache] = None,
+) -> Iterator[SchemaResult]:
+    """
+    Generates the `(schema, output)` pairs of `tasks`, with more than one job in a process pool.
+    `cache` is only used in process.
+
+    Results are yielded as soon as they are ready.
+    """
+    # Largest schemas first so the slowest ones don't end up running alone at the end
+    tasks = sorted(tasks, key=lambda t: os.path.getsize(t[0]), reverse=True)
+
+    if jobs <= 1 or len(tasks) <= 1:
+        yield from (generate_schema(args, *task, cache=cache) for task in tasks)
+        return
+
+    from multiprocessing import Pool
+
+    with Pool(min(jobs, len(tasks)), maxtasksperchild=MAX_TASKS_PER_CHILD) as pool:
+        yield from pool.imap_unordered(_generate_schema_task, [(args,) + t for t in tasks])
+
+
+def run_stream(args: Namespace) -> None:
+    """
+    Answers the requests read from stdin, the options of `args` are their defaults
+    """
+    from json_codegen.server import CodegenService, serve_stream
+
+    options = {"language": args.language, "generator": args.generator, "prefix": args.prefix}
+    defaults = {k: v for k, v in options.items() if v is not None}
+
+    serve_stream(CodegenService(), sys.stdin.buffer, sys.stdout.buffer, defaults)
+
+
+def run_targets(
+    parser: ArgumentParser,
+    args: Namespace,
+    schemas: List[str],
+    profile: GenerationProfile,
+    cache: Optional[Cache] = None,
+    renderer: Optional[JsRenderer] = None,
+) -> None:
+    """
+    Generates every language of `args.targets` for each schema of `schemas` from a single parse
+    """
+    targets: List[Target] = args.targets
+    failures = 0
+    changes = 0
+    inputs: Dict[str, List[str]] = {}
+
+    results: Iterable[SchemaResult] = (
+        r for s in schemas for r in generate_targets(args, s, targets, cache=cache)
+    )
+
+    if renderer is not None:
+        results = render_pending(results, renderer, check=args.check)
+
+    for result in results:
+        report_result(result, check=args.check, profile=profile)
+
+        if result.error is None:
+            changes += result.changed
+            inputs[result.output] = [result.schema, *result.dependencies]
+        else:
+            failures += 1
+
+    if args.depfile:
+        write_depfile(args, inputs)
+
+    total = len(schemas) * len(targets)
+
+    if failures:
+        parser.exit(1, f"{failures} of {total} outputs failed\n")
+
+    if args.check and changes:
+        parser.exit(1, f"{changes} of {total} outputs out of date\n")
+
+
+def run_watch(
+    args: Namespace,
+    tasks: List[Tuple[str, str]],
+    profile: GenerationProfile,
+    cache: Optional[Cache] = None,
+    renderer: Optional[JsRenderer] = None,
+) -> None:
+    """
+    Generates the `(schema, output)` pairs of `tasks` again whenever their inputs change, until
+    interrupted
+    """
+    from json_codegen.watch import watch_schemas
+
+    def generate(filename: str, output: str) -> SchemaResult:
+        results = [generate_schema(args, filename, output, cache=cache)]
+
+        if renderer is not None:
+            results = list(render_pending(results, renderer))
+
+        return results[0]
+
+    try:
+        watch_schemas(tasks, generate, partial(report_result, profile=profile))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_batch(
+    parser: ArgumentParser,
+    args: Namespace,
+    tasks: List[Tuple[str, str]],
+    profile: GenerationProfile,
+    cache: Optional[Cache] = None,
+    renderer: Optional[JsRenderer] = None,
+) -> None:
+    """
+    Generates the `(schema, output)` pairs of `tasks` on their own, failures don't stop the
+    other schemas. With --manifest the outputs whose inputs didn't change are skipped.
+    """
+    total = len(tasks)
+    manifest = None
+    fingerprint = ""
+    inputs: Dict[str, List[str]] = {}
+
+    # Skip the outputs whose inputs didn't change
+    if args.manifest:
+        manifest = BuildManifest(args.manifest)
+        fingerprint = get_manifest_fingerprint(args)
+        skipped = [t for t in tasks if manifest.is_up_to_date(t[1], t[0], fingerprint)]
+        tasks = [t for t in tasks if t not in skipped]
+        inputs.update((o, manifest.get_inputs(o)) for _, o in skipped)
+
+    failures = 0
+    changes = 0
+
+    results: Iterable[SchemaResult] = generate_many(args, tasks, jobs=args.jobs, cache=cache)
+
+    if renderer is not None:
+        results = render_pending(results, renderer, check=args.check)
+
+    for result in results:
+        report_result(result, check=args.check, profile=profile)
+
+        if result.error is None:
+            changes += result.changed
+            inputs[result.output] = [result.schema, *result.dependencies]
+
+            if manifest is not None:
+                manifest.record(result.output, result.schema, fingerprint, result.dependencies)
+        else:
+            failures += 1
+
+            if manifest is not None:
+                manifest.discard(result.output)
+
+    if manifest is not None:
+        manifest.save()
+
+        if total > len(tasks):
+            sys.stderr.write(f"{total - len(tasks)} of {total} outputs up to date\n")
+
+    if args.depfile:
+        write_depfile(args, inputs)
+
+    if failures:
+        parser.exit(1, f"{failures} of {total} schemas failed\n")
+
+    if args.check and changes:
+        parser.exit(1, f"{changes} of {total} outputs out of date\n")
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import pickle  # nosec B403
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from json_codegen import __version__
+
+CACHE_ENV = "JSON_CODEGEN_CACHE_DIR"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 128
+
+# Bump when the layout of the cached state changes
+CACHE_FORMAT = 1
+
+_SUFFIX = ".pickle"
+
+
+def ensure_private_directory(directory: Union[str, Path]) -> bool:
+    """
+    Creates `directory` readable and writable only by the current user, returns if the existing
+    directory is owned by the current user and not writable by others.
+
+    Cached files are unpickled or unmarshalled, a directory other users can write to would let
+    them run code in this process.
+    """
+    directory = Path(directory)
+
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        stat = directory.stat()
+    except OSError:
+        return False
+
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        return False
+
+    return not stat.st_mode & 0o022
+
+
+class SchemaCache:
+    """
+    On-disk cache of the parsed state of `SchemaParser` instances.
+
+    Entries are keyed by the content of the schema, the prefix and the library version; the
+    least recently used entries are evicted once the cache grows bigger than `max_size` bytes.
+
+    Entries are unpickled so the directory must be trusted: it's created private and it's not
+    used when owned by another user or writable by others.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._trusted: Optional[bool] = None
+
+    @property
+    def trusted(self) -> bool:
+        if self._trusted is None:
+            self._trusted = ensure_private_directory(self.directory)
+
+        return self._trusted
+
+    def key(self, filename: Union[str, Path], prefix: Optional[str] = None, **options: Any) -> str:
+        """
+        Returns the key of the schema in `filename`, `options` are the parser's options changing
+        the parsed state
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}\0{CACHE_FORMAT}\0{prefix or ''}\0".encode())
+        digest.update(f"{sorted(options.items())!r}\0".encode())
+
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.trusted:
+            return None
+
+        path = self._path(key)
+
+        try:
+            with path.open("rb") as f:
+                state = pickle.load(f)  # nosec B301
+        except OSError:
+            return None
+        except Exception:
+            # Truncated entries or entries of classes which changed since they were written
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return state
+
+    def put(self, key: str, state: Any) -> None:
+        if not self.trusted:
+            return
+
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.directory), suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(tmp_name, str(self._path(key)))
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+
+        for path in self.directory.glob("*" + _SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+            total_size -= size
+
+
+class MemorySchemaCache:
+    """
+    In-memory LRU cache of the parsed state of `SchemaParser` instances for long running
+    processes, with the same interface of `SchemaCache`.
+
+    Entries are keyed by the path, modification time and size of the schema instead of its
+    content so hits don't read the file.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def key(self, filename: Union[str, Path], prefix: Optional[str] = None, **options: Any) -> str:
+        path = Path(filename).resolve()
+        stat = path.stat()
+
+        return repr((str(path), stat.st_mtime_ns, stat.st_size, prefix, sorted(options.items())))
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return None
+
+        return self._entries[key]
+
+    def put(self, key: str, state: Any) -> None:
+        self._entries[key] = state
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Caches of the parsed schemas accepted by the CLI
+Cache = Union[SchemaCache, MemorySchemaCache]
@@ -0,0 +1,212 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from json_codegen.resolver import escape_pointer_token
+
+SCALAR_TYPES = frozenset(("string", "integer", "number", "boolean"))
+ALL_TYPES = SCALAR_TYPES | {"object", "array"}
+DEFAULT_TYPES = frozenset(("string", "integer", "boolean", "object", "array"))
+
+
+class Capabilities(NamedTuple):
+    """
+    Schema constructs supported by a generator in the properties of the generated classes
+    """
+
+    # Values of `type`
+    types: FrozenSet[str] = ALL_TYPES
+    # Types of the properties with a `default`, None if defaults are ignored
+    default_types: Optional[FrozenSet[str]] = None
+    # Python types of the scalars in the `default` values, None for any
+    default_values: Optional[Tuple[type, ...]] = None
+    # Properties without `type`
+    untyped_properties: bool = True
+    # Properties or items without `type` referencing a definition
+    untyped_refs: bool = True
+    # Properties without `type` with `additionalProperties`
+    untyped_maps: bool = True
+    # Array items without `type`
+    untyped_items: bool = True
+    # `items` as a list (tuples)
+    tuples: bool = True
+    # `additionalProperties`
+    additional_properties: bool = True
+    # `additionalProperties` without `$ref`
+    scalar_additional_properties: bool = True
+    # Array items with more than one `$ref`
+    multiple_refs_arrays: bool = True
+    # Objects with a `oneOf` whose first option isn't a `$ref`
+    inline_one_of: bool = True
+
+
+class SchemaProblem(NamedTuple):
+    pointer: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.pointer}: {self.message}"
+
+
+Rule = Callable[[str, Mapping], Iterator[SchemaProblem]]
+
+
+def _check_type(
+    capabilities: Capabilities, pointer: str, node: Mapping
+) -> Iterator[SchemaProblem]:
+    type_ = node.get("type")
+
+    if type_ is not None and (not isinstance(type_, str) or type_ not in capabilities.types):
+        yield SchemaProblem(f"{pointer}/type", f"type {type_!r} is not supported")
+
+
+def _check_default_values(
+    capabilities: Capabilities, pointer: str, value: Any
+) -> Iterator[SchemaProblem]:
+    stack = [(pointer, value)]
+
+    while stack:
+        pointer, value = stack.pop()
+
+        if isinstance(value, Mapping):
+            stack.extend((f"{pointer}/{escape_pointer_token(k)}", v) for k, v in value.items())
+        elif isinstance(value, list):
+            stack.extend((f"{pointer}/{i}", v) for i, v in enumerate(value))
+        elif not isinstance(value, capabilities.default_values or ()):
+            yield SchemaProblem(pointer, f"default value {value!r} is not supported")
+
+
+def _compile_property_rules(capabilities: Capabilities) -> Tuple[Rule, ...]:
+    rules = []
+
+    def check_type(pointer: str, property_: Mapping) -> Iterator[SchemaProblem]:
+        if "type" in property_:
+            yield from _check_type(capabilities, pointer, property_)
+        elif capabilities.untyped_refs and "$ref" in property_:
+            pass
+        elif capabilities.untyped_maps and "additionalProperties" in property_:
+            pass
+        elif not capabilities.untyped_properties:
+            yield SchemaProblem(pointer, "properties without type are not supported")
+
+    rules.append(check_type)
+
+    def check_additional_properties(pointer: str, property_: Mapping) -> Iterator[SchemaProblem]:
+        additional_properties = property_.get("additionalProperties")
+
+        if additional_properties is None:
+            return
+        elif not capabilities.additional_properties:
+            yield SchemaProblem(
+                f"{pointer}/additionalProperties", "additionalProperties are not supported"
+            )
+        elif not isinstance(additional_properties, Mapping) or (
+            "$ref" not in additional_properties
+        ):
+            yield SchemaProblem(
+                f"{pointer}/additionalProperties",
+                "additionalProperties without $ref are not supported",
+            )
+
+    if not (capabilities.additional_properties and capabilities.scalar_additional_properties):
+        rules.append(check_additional_properties)
+
+    def check_default(pointer: str, property_: Mapping) -> Iterator[SchemaProblem]:
+        if "default" not in property_ or property_.get("additionalProperties") is not None:
+            return
+
+        type_ = property_.get("type")
+
+        if capabilities.default_types is not None and (
+            not isinstance(type_, str) or type_ not in capabilities.default_types
+        ):
+            yield SchemaProblem(
+                f"{pointer}/default", f"default for type {type_!r} is not supported"
+            )
+
+        if capabilities.default_values is not None:
+            yield from _check_default_values(
+                capabilities, f"{pointer}/default", property_["default"]
+            )
+
+    if capabilities.default_types is not None or capabilities.default_values is not None:
+        rules.append(check_default)
+
+    def check_one_of(pointer: str, property_: Mapping) -> Iterator[SchemaProblem]:
+        one_of = property_.get("oneOf")
+
+        if property_.get("type") != "object" or not one_of:
+            return
+
+        if not isinstance(one_of[0], Mapping) or "$ref" not in one_of[0]:
+            yield SchemaProblem(f"{pointer}/oneOf/0", "oneOf without $ref is not supported")
+
+    if not capabilities.inline_one_of:
+        rules.append(check_one_of)
+
+    def check_items(pointer: str, property_: Mapping) -> Iterator[SchemaProblem]:
+        items = property_.get("items")
+
+        # Nested arrays are checked all the way down
+        while isinstance(items, Mapping):
+            pointer = f"{pointer}/items"
+
+            if "type" in items:
+                yield from _check_type(capabilities, pointer, items)
+            elif capabilities.untyped_refs and ("$ref" in items or "oneOf" in items):
+                pass
+            elif not capabilities.untyped_items:
+                yield SchemaProblem(pointer, "array items without type are not supported")
+
+            refs = [o for o in items.get("oneOf", ()) if isinstance(o, Mapping) and "$ref" in o]
+
+            if not capabilities.multiple_refs_arrays and len(refs) > 1:
+                yield SchemaProblem(
+                    f"{pointer}/oneOf", "array items with more than one $ref are not supported"
+                )
+
+            items = items.get("items")
+
+        if isinstance(items, list) and not capabilities.tuples:
+            yield SchemaProblem(f"{pointer}/items", "tuples are not supported")
+
+    rules.append(check_items)
+
+    return tuple(rules)
+
+
+@lru_cache(maxsize=None)
+def compile_capabilities(capabilities: Capabilities) -> Tuple[Rule, ...]:
+    """
+    Returns the rules checking the properties against `capabilities`, compiled once per
+    generator
+    """
+    return _compile_property_rules(capabilities)
+
+
+def check_records(capabilities: Capabilities, records: Iterable) -> Iterator[SchemaProblem]:
+    """
+    Yields every construct not supported by `capabilities` in the properties of `records` in a
+    single pass
+    """
+    rules = compile_capabilities(capabilities)
+
+    for record in records:
+        for key, property_ in record.properties:
+            pointer = f"{record.key}/properties/{escape_pointer_token(key)}"
+
+            if not isinstance(property_, Mapping):
+                yield SchemaProblem(pointer, "property definitions must be objects")
+                continue
+
+            for rule in rules:
+                yield from rule(pointer, property_)
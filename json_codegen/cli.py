@@ -1,32 +1,425 @@
 #!/usr/bin/env python3
 
+import glob
+import hashlib
+import json
+import os
+import stat
 import sys
-from argparse import ArgumentParser
+import time
+from argparse import Action, ArgumentParser, ArgumentTypeError, Namespace
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+    Union,
+    cast,
+)
 
-from json_codegen import generators
-from json_codegen.core import load_external_generator, load_schema
+from json_codegen.cache import CACHE_ENV, Cache, SchemaCache, ensure_private_directory
+from json_codegen.core import SchemaParser, load_external_generator, load_schema
+from json_codegen.decoders import AUTO_BACKEND, BACKENDS, DEFAULT_BACKEND, is_available
+from json_codegen.languages import LANGUAGES
+from json_codegen.manifest import hash_file
+from json_codegen.profiling import GenerationProfile, PhaseTimer
+from json_codegen.registry import generate_with_shared_types
 
 sys.path.append((Path(__file__).parent.resolve() / "..").as_posix())
 
+# Schemas bigger than this are decoded incrementally
+STREAMING_THRESHOLD = 32 * 1024 * 1024
 
-LANGUAGES = {
-    "python3": generators.Python3Generator,
-    "python3+marshmallow": generators.Python3MarshmallowGenerator,
-    "javascript+flow": generators.JavaScriptFlowGenerator,
-    "flow": generators.FlowGenerator,
-}
+# Name of the files generated in --output-dir
+DEFAULT_OUTPUT_TEMPLATE = "{name}{ext}"
 
+# Outputs of the generators building a JavaScript AST, with --emit
+EMIT_AST = "ast"
+EMIT_JS = "js"
+EMIT_BABEL = "babel"
 
-def get_generator(language):
+
+class Target(NamedTuple):
+    language: str
+    # Template of the generated file, None for the --output or --output-dir defaults
+    output: Optional[str] = None
+
+
+def parse_target(value: str) -> Target:
+    """
+    Parses a `language[:output]` value of --language
+    """
+    language, _, output = value.partition(":")
+
+    if language not in LANGUAGES:
+        raise ArgumentTypeError(f"Language {language} not supported")
+
+    return Target(language, output or None)
+
+
+class TargetAction(Action):
+    """
+    Appends the values of --language to `targets`, `language` is the first language given
+    """
+
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Any,
+        option_string: Optional[str] = None,
+    ) -> None:
+        namespace.targets = [*namespace.targets, values]
+
+        if namespace.language is None:
+            namespace.language = values.language
+
+
+def get_generator(language: str) -> Type[Any]:
     try:
         return LANGUAGES[language]
     except KeyError:
         raise ValueError(f"Language {language} not supported")
 
 
-def main():
-    # Validating parameters
+def load_generator(
+    generator: Type[Any],
+    filename: str,
+    prefix: Optional[str] = None,
+    cache: Optional[Cache] = None,
+    frozen: bool = False,
+    json_backend: Optional[str] = None,
+    timer: Optional[PhaseTimer] = None,
+    **kwds: Any,
+) -> Any:
+    kwds = dict(kwds, prefix=prefix, filename=filename)
+    timer = timer or PhaseTimer()
+
+    # Try the cache first
+    if cache is not None:
+        with timer.measure("load_schema"):
+            key = cache.key(
+                filename, prefix, hoist_shapes=bool(kwds.get("hoist_shapes")), frozen=frozen
+            )
+            state = cache.get(key)
+
+        if state is not None:
+            with timer.measure("parse"):
+                return generator.from_state(state, **kwds)
+
+    # Parse the schema
+    with open(filename) as f:
+        if os.path.getsize(filename) > STREAMING_THRESHOLD:
+            # Decoding and parsing are interleaved
+            with timer.measure("load_schema"):
+                instance = generator.from_stream(f, frozen=frozen, **kwds)
+        else:
+            with timer.measure("load_schema"):
+                schema = load_schema(f.read(), frozen=frozen, backend=json_backend)
+
+            with timer.measure("parse"):
+                instance = generator(schema, **kwds)
+
+    if cache is not None:
+        cache.put(key, instance.get_state())
+
+    return instance
+
+
+def get_parser_options(args: Namespace) -> Dict[str, Any]:
+    """
+    Returns the options of `SchemaParser` given on the command line
+    """
+    return dict(
+        prefix=args.prefix, prune=args.prune, only=args.only, hoist_shapes=args.hoist_shapes
+    )
+
+
+def load_instance(
+    generator: Type[Any],
+    filename: str,
+    args: Namespace,
+    cache: Optional[Cache] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> Any:
+    if not issubclass(generator, SchemaParser):
+        timer = timer or PhaseTimer()
+
+        with open(filename) as f, timer.measure("load_schema"):
+            schema = load_schema(f.read(), backend=args.json_backend)
+
+        with timer.measure("parse"):
+            return generator(schema, prefix=args.prefix)
+
+    if args.no_cache:
+        cache = None
+    elif cache is None and args.cache_dir:
+        cache = SchemaCache(args.cache_dir)
+
+    return load_generator(
+        generator,
+        filename,
+        cache=cache,
+        frozen=args.frozen_nodes,
+        json_backend=args.json_backend,
+        timer=timer,
+        **get_parser_options(args),
+    )
+
+
+def find_missing_definitions(instance: SchemaParser, names: Iterable[str]) -> List[str]:
+    """
+    Returns the definitions of `names`, given with --only, not found in the schema
+    """
+    missing = []
+
+    for name in names:
+        try:
+            instance.find_definition_key(name)
+        except ValueError:
+            missing.append(name)
+
+    return missing
+
+
+@contextmanager
+def replacing_file(filename: Union[str, Path]) -> Iterator[Path]:
+    """
+    Creates a temporary file replacing `filename` atomically when the block exits, readers never
+    see a partially written file. `filename` is kept when the block removes the temporary file.
+    """
+    path = Path(filename)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+    os.close(os.open(str(tmp_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+
+    try:
+        yield tmp_path
+
+        if not tmp_path.exists():
+            return
+
+        # Keep the permissions of the file being replaced
+        try:
+            os.chmod(str(tmp_path), stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+
+        os.replace(str(tmp_path), str(path))
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        raise
+
+
+def replace_file(filename: Union[str, Path], data: bytes) -> None:
+    """
+    Replaces the content of `filename` atomically, readers never see a partially written file
+    """
+    with replacing_file(filename) as tmp_path:
+        tmp_path.write_bytes(data)
+
+
+def write_output(filename: Union[str, Path], code: str, check: bool = False) -> bool:
+    """
+    Writes `code` into `filename` unless the file has the same content already, so unchanged
+    outputs keep their modification time. With `check` nothing is written.
+
+    Returns if the content of the file differs from `code`.
+    """
+    data = code.encode()
+
+    if hash_file(filename) == hashlib.sha256(data).hexdigest():
+        return False
+
+    if not check:
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        replace_file(filename, data)
+
+    return True
+
+
+class CodeWriter:
+    """
+    Text file hashing the code written into it before passing it to `fp`, if any, and timing
+    the writes to `fp`
+    """
+
+    def __init__(self, fp: Optional[IO[str]] = None):
+        self.fp = fp
+        self.hash = hashlib.sha256()
+        self.write_time = 0.0
+
+    def write(self, code: str) -> int:
+        if code:
+            self.hash.update(code.encode())
+
+            if self.fp is not None:
+                start = time.perf_counter()
+                self.fp.write(code)
+                self.write_time += time.perf_counter() - start
+
+        return len(code)
+
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+
+def stream_code(
+    write_code: Callable[[IO[str]], Any], fp: Optional[IO[str]], timer: Optional[PhaseTimer]
+) -> CodeWriter:
+    """
+    Passes the code written by `write_code` to `fp` as it's generated, the time spent writing
+    into `fp` is added to the write phase of `timer` and the rest to its as_code phase
+    """
+    writer = CodeWriter(fp)
+    start = time.perf_counter()
+
+    write_code(cast(IO[str], writer))
+
+    if timer is not None:
+        timer.add("as_code", time.perf_counter() - start - writer.write_time)
+        timer.add("write", writer.write_time)
+
+    return writer
+
+
+def stream_output(
+    filename: Union[str, Path],
+    write_code: Callable[[IO[str]], Any],
+    check: bool = False,
+    timer: Optional[PhaseTimer] = None,
+) -> bool:
+    """
+    Like `write_output()` with the code written by `write_code` into a text file, which is
+    written into `filename` while it's generated instead of being held in memory as a whole.
+
+    Returns if the content of the file differs from the code.
+    """
+    previous = hash_file(filename)
+
+    if check:
+        return stream_code(write_code, None, timer).hexdigest() != previous
+
+    Path(filename).parent.mkdir(parents=True, exist_ok=True)
+
+    with replacing_file(filename) as tmp_path:
+        with open(str(tmp_path), "w", encoding="utf-8", newline="") as f:
+            writer = stream_code(write_code, f, timer)
+
+        changed = writer.hexdigest() != previous
+
+        # Unchanged outputs keep their modification time
+        if not changed:
+            tmp_path.unlink()
+
+    return changed
+
+
+def expand_schemas(paths: Iterable[str]) -> List[str]:
+    """
+    Expands directories and glob patterns into the schema files they match, directories are
+    searched recursively for `*.json` files
+    """
+    schemas: List[str] = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(str(p) for p in Path(path).rglob("*.json") if p.is_file())
+        elif glob.has_magic(path):
+            matches = sorted(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+        else:
+            schemas.append(path)
+            continue
+
+        # Patterns can match the same schema more than once
+        schemas.extend(m for m in matches if m not in schemas)
+
+    return schemas
+
+
+def format_output(template: str, filename: str, extension: str) -> str:
+    path = Path(filename)
+
+    return template.format(
+        name=path.name.split(".")[0], stem=path.stem, ext=extension, parent=path.parent.name
+    )
+
+
+def get_generator_from_args(args: Namespace) -> Type[Any]:
+    if args.generator:
+        cache_dir = None
+
+        # Keep the bytecode of external generators with the schema cache
+        if args.cache_dir and not args.no_cache:
+            cache_dir = Path(args.cache_dir) / "generators"
+
+            if not all(ensure_private_directory(d) for d in (cache_dir.parent, cache_dir)):
+                cache_dir = None
+
+        return load_external_generator(args.generator, cache_dir=cache_dir)
+
+    return get_generator(args.language)
+
+
+def get_output_extension(generator: Type[Any], emit: str = EMIT_AST) -> str:
+    # The generators building a JavaScript AST can print it as code
+    if emit in (EMIT_JS, EMIT_BABEL) and hasattr(generator, "as_js"):
+        return ".js"
+
+    extension: str = generator.output_extension
+
+    return extension
+
+
+def write_code(instance: Any, fp: IO[str], emit: str = EMIT_AST, compact: bool = False) -> None:
+    """
+    Writes the code of a generated `instance` into the text file `fp`, the generators building
+    a JavaScript AST serialize it while writing, without indentation with `compact`
+    """
+    if not hasattr(instance, "as_js"):
+        if hasattr(instance, "as_code_to"):
+            instance.as_code_to(fp)
+        else:
+            fp.write(instance.as_code())
+    elif emit == EMIT_JS:
+        fp.write(instance.as_js())
+    else:
+        instance.as_code_to(fp, compact=compact)
+
+
+def find_output_conflicts(schemas: List[str], outputs: List[str]) -> List[str]:
+    """
+    Returns the problems of `outputs`: outputs generated more than once and outputs overwriting
+    one of the `schemas`
+    """
+    problems = []
+    inputs = {Path(s).resolve() for s in schemas}
+    seen = set()
+
+    for output in outputs:
+        path = Path(output).resolve()
+
+        if path in inputs:
+            problems.append(f"{output} would overwrite a schema")
+        elif path in seen:
+            problems.append(f"{output} is generated more than once")
+
+        seen.add(path)
+
+    return problems
+
+
+def get_argument_parser() -> ArgumentParser:
     parser = ArgumentParser(description="Generates code from a JSON-schema definition")
     parser.add_argument("--prefix", "-p", help="Optional prefix for generated classes")
     parser.add_argument(
@@ -40,39 +433,446 @@ def main():
             "When used the option --language will be ignored."
         ),
     )
-    parser.add_argument("schema", help="Definition of the PRD as JSON schema")
+    parser.add_argument(
+        "schema",
+        nargs="*",
+        help=(
+            "Definition of the PRD as JSON schema, directories and glob patterns are expanded. "
+            "More than one schema requires --output-dir"
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        "-d",
+        help="Output directory, each schema is generated in a file named after the schema",
+    )
+    parser.add_argument(
+        "--output-template",
+        default=DEFAULT_OUTPUT_TEMPLATE,
+        help=(
+            "Path of the generated files relative to --output-dir. {name} is the schema's "
+            "file name up to the first dot, {stem} without the last extension, {parent} the "
+            "name of its directory and {ext} the extension of the generated code. "
+            f"Default is {DEFAULT_OUTPUT_TEMPLATE}"
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        help=(
+            "Build manifest recording the inputs of the generated files, the files whose "
+            "schema, referenced files, generator and options didn't change are not generated "
+            "again"
+        ),
+    )
+    parser.add_argument(
+        "--depfile",
+        metavar="FILE",
+        help=(
+            "Write to FILE the schema, the files it references and the --generator module each "
+            "output depends on, in the Make format also read by Ninja. "
+            "Requires --output-dir or --output"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and generate again the outputs of the schemas, or of the files they "
+            "reference, when they change. Requires --output-dir or --output"
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Read the requests from stdin, one JSON object per line with the schema as path or "
+            "text, the language and the prefix, and write one JSON result per line to stdout. "
+            "--language, --generator and --prefix are the defaults of the requests"
+        ),
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=(
+            "Compare the generated code with the existing outputs without writing them, exits "
+            "with an error when an output is out of date"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help=(
+            "Number of processes generating the schemas in --output-dir, or the targets of "
+            "a schema with more than one --language. Default is 1"
+        ),
+    )
+    parser.add_argument(
+        "--shared-module",
+        help=(
+            "Generate the definitions shared by the schemas once in this module and import "
+            "them in the code generated for each schema"
+        ),
+    )
     parser.add_argument(
         "--language",
         "-l",
-        choices=LANGUAGES,
+        action=TargetAction,
+        type=parse_target,
+        metavar="LANGUAGE[:OUTPUT]",
         help=(
-            "Output language. "
+            "Output language, one of the built-in languages or of the generators registered by "
+            "the installed packages. "
+            "Repeat as language:output to generate more than one language from a single parse of "
+            "the schema, output is a template like --output-template. "
             "This option will be ignored if the --generator option is used. "
             "Default is python3"
         ),
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--emit",
+        choices=(EMIT_AST, EMIT_JS, EMIT_BABEL),
+        default=EMIT_AST,
+        help=(
+            "Output of the generators building a JavaScript AST, the AST as JSON for "
+            "bin/ast_to_js, the JavaScript code printed without Node, or printed by "
+            "@babel/generator in a pool of bin/ast_to_js workers. "
+            f"Default is {EMIT_AST}"
+        ),
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write the AST as JSON without indentation, with --emit ast",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Generate only the definitions reachable from the root schema",
+    )
+    parser.add_argument(
+        "--only",
+        type=lambda s: [name.strip() for name in s.split(",") if name.strip()],
+        help=(
+            "Comma separated list of definitions to generate together with the definitions "
+            "they reference. The root schema is not generated"
+        ),
+    )
+    parser.add_argument(
+        "--hoist-shapes",
+        action="store_true",
+        help="Generate the inline objects found more than once in the schema as named types",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=(AUTO_BACKEND,) + BACKENDS,
+        default=DEFAULT_BACKEND,
+        help=(
+            "JSON decoder used to load the schemas, auto picks the fastest one installed. "
+            f"Default is {DEFAULT_BACKEND}"
+        ),
+    )
+    parser.add_argument(
+        "--frozen-nodes",
+        action="store_true",
+        help="Decode the schema into compact immutable nodes to reduce memory usage",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get(CACHE_ENV),
+        help=(
+            "Directory where to cache the parsed schemas between runs. "
+            f"Default is the value of the {CACHE_ENV} environment variable"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Don't read or write the schema cache"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print to stderr the time spent loading, parsing, generating and writing each output",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        help="Write the time spent in each phase of each output to FILE as JSON",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        metavar="FILE",
+        help="Run the generation under cProfile and dump the statistics to FILE for pstats",
+    )
+
+    parser.set_defaults(targets=[])
 
-    # Load schema
-    with open(args.schema) as f:
-        schema = load_schema(f.read())
+    return parser
 
-    # Generate code
-    if args.generator:
-        generator = load_external_generator(args.generator)
+
+def main(argv: Optional[List[str]] = None, cache: Optional[Cache] = None) -> None:
+    """
+    Runs the command line with the arguments `argv`, `cache` overrides the cache of the parsed
+    schemas
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv[:1] == ["serve"]:
+        from json_codegen.server import main as serve_main
+
+        return serve_main(argv[1:])
+
+    # Validating parameters
+    parser = get_argument_parser()
+    args = parser.parse_args(argv)
+
+    if (args.profile or args.profile_json or args.profile_stats) and args.stream:
+        parser.error("--profile, --profile-json and --profile-stats can't be used with --stream")
+
+    if args.profile_stats and args.jobs > 1:
+        parser.error("--profile-stats requires --jobs 1")
+
+    if args.compact and args.emit != EMIT_AST:
+        parser.error("--compact requires --emit ast")
+
+    # The service answering the requests on stdin chooses the output of each request
+    if args.stream and (args.emit != EMIT_AST or args.check or args.compact):
+        parser.error("--emit, --check and --compact can't be used with --stream")
+
+    profile = GenerationProfile()
+    renderer = None
+
+    # The ASTs are printed in batches by a pool of Node workers
+    if args.emit == EMIT_BABEL:
+        from json_codegen.js_renderer import JsRenderer
+
+        renderer = JsRenderer()
+
+    try:
+        if args.profile_stats:
+            import cProfile
+
+            profiler = cProfile.Profile()
+
+            try:
+                return profiler.runcall(run, parser, args, profile, cache=cache, renderer=renderer)
+            finally:
+                profiler.dump_stats(args.profile_stats)
+
+        return run(parser, args, profile, cache=cache, renderer=renderer)
+    finally:
+        if renderer is not None:
+            renderer.close()
+
+        if args.profile and profile.rows:
+            sys.stderr.write(profile.format_table())
+
+        if args.profile_json:
+            with open(args.profile_json, "w") as f:
+                json.dump(profile.as_dict(), f, indent=2)
+                f.write("\n")
+
+
+def run(
+    parser: ArgumentParser,
+    args: Namespace,
+    profile: GenerationProfile,
+    cache: Optional[Cache] = None,
+    renderer: Any = None,
+) -> None:
+    """
+    Generates the code of the schemas of the parsed arguments `args`, the time spent in each
+    phase of each output is added to `profile`. The ASTs left to print by `--emit babel` are
+    printed with `renderer`, a `JsRenderer`
+    """
+    if not is_available(args.json_backend):
+        parser.error(f"JSON backend {args.json_backend} is not installed")
+
+    if args.stream:
+        if args.schema:
+            parser.error("--stream reads the schemas from stdin")
+
+        from json_codegen.batch import run_stream
+
+        return run_stream(args)
+
+    if not args.schema:
+        parser.error("the following arguments are required: schema")
+
+    targets: List[Target] = args.targets
+    many_targets = len(targets) > 1 or any(t.output for t in targets)
+
+    if many_targets and not all(t.output for t in targets):
+        parser.error("Every --language needs an output when generating more than one language")
+
+    if many_targets and (
+        args.output or args.generator or args.shared_module or args.manifest or args.watch
+    ):
+        parser.error(
+            "More than one --language can't be used with --output, --generator, "
+            "--shared-module, --manifest or --watch"
+        )
+
+    schemas = expand_schemas(args.schema)
+
+    if not schemas:
+        parser.error("No schema found")
+
+    if (len(schemas) > 1 or args.shared_module) and not args.output_dir:
+        parser.error("--output-dir is required when generating more than one schema")
+
+    if args.watch and (args.shared_module or not (args.output_dir or args.output)):
+        parser.error("--watch requires --output-dir or --output and no --shared-module")
+
+    if args.manifest and (args.shared_module or not (args.output_dir or args.output)):
+        parser.error("--manifest requires --output-dir or --output and no --shared-module")
+
+    if args.depfile and (
+        args.shared_module or args.watch or not (args.output_dir or args.output or many_targets)
+    ):
+        parser.error(
+            "--depfile requires --output-dir or --output and no --shared-module or --watch"
+        )
+
+    if args.check and (args.watch or args.manifest or not (args.output_dir or args.output)):
+        parser.error("--check requires --output-dir or --output and no --watch or --manifest")
+
+    # Generate every language of a schema from a single parse
+    if many_targets:
+        from json_codegen.batch import get_target_outputs, run_targets
+
+        conflicts = find_output_conflicts(
+            schemas, [o for s in schemas for o in get_target_outputs(args, s, targets)]
+        )
+
+        if conflicts:
+            parser.error("\n".join(conflicts))
+
+        return run_targets(parser, args, schemas, profile, cache=cache, renderer=renderer)
+
+    # Get generator
+    generator = get_generator_from_args(args)
+
+    if args.shared_module and not issubclass(generator, SchemaParser):
+        parser.error(f"{generator.__name__} doesn't support --shared-module")
+
+    # Outputs of the schemas followed by the shared module's
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+        extension = get_output_extension(generator, args.emit)
+        outputs = [
+            str(output_dir / format_output(args.output_template, filename, extension))
+            for filename in schemas
+        ]
+
+        if args.shared_module:
+            outputs.append(str(output_dir / (args.shared_module.rsplit(".", 1)[-1] + extension)))
     else:
-        generator = get_generator(args.language)
+        outputs = [args.output] if args.output else []
+
+    conflicts = find_output_conflicts(schemas, outputs)
+
+    if conflicts:
+        parser.error("\n".join(conflicts))
+
+    # Generate every schema on its own, failures don't stop the other schemas. A single --output
+    # too when it's tracked by the manifest, the watcher or the depfile.
+    tracked = args.manifest or args.watch or args.depfile
+    one_by_one = args.output_dir or (args.output and tracked)
+
+    if one_by_one and not args.shared_module:
+        from json_codegen.batch import run_batch, run_watch
+
+        tasks = list(zip(schemas, outputs))
+
+        if args.watch:
+            return run_watch(args, tasks, profile, cache=cache, renderer=renderer)
+
+        return run_batch(parser, args, tasks, profile, cache=cache, renderer=renderer)
+
+    # Load schemas, the shared module is timed on its own
+    timers = [PhaseTimer() for _ in outputs or schemas]
+    instances = [
+        load_instance(generator, filename, args, cache=cache, timer=timer)
+        for filename, timer in zip(schemas, timers)
+    ]
+
+    missing = [
+        f"{filename}: definition {name} not found"
+        for filename, instance in zip(schemas, instances)
+        if isinstance(instance, SchemaParser)
+        for name in find_missing_definitions(instance, args.only or ())
+    ]
+
+    if missing:
+        parser.error("\n".join(missing))
+
+    # Report the unsupported constructs of every schema before generating any code
+    problems = [
+        f"{filename}: {problem}"
+        for filename, instance in zip(schemas, instances)
+        if isinstance(instance, SchemaParser)
+        for problem in instance.check_schema()
+    ]
 
-    code = generator(schema, prefix=args.prefix).generate().as_code()
+    if problems:
+        parser.exit(1, "Unsupported schema:\n" + "\n".join(problems) + "\n")
 
     # Output code
-    if args.output:
-        with open(args.output, "w") as f:
-            f.write(code)
+    if args.shared_module:
+        with timers[-1].measure("generate"):
+            common, instances = generate_with_shared_types(
+                generator, instances, args.shared_module, prefix=args.prefix
+            )
+
+        instances.append(common)
+    else:
+        with timers[0].measure("generate"):
+            instances = [instances[0].generate()]
+
+    if renderer is not None and hasattr(generator, "as_js"):
+        from json_codegen.js_renderer import JsRenderError
+
+        start = time.perf_counter()
+
+        try:
+            codes = renderer.render_many([i.as_ast() for i in instances])
+        except JsRenderError as e:
+            parser.exit(1, f"{e}\n")
+
+        for timer in timers:
+            timer.add("as_code", (time.perf_counter() - start) / len(timers))
+
+        writes = [lambda fp, code=code: fp.write(code) for code in codes]
     else:
-        sys.stdout.write(code)
-        sys.stdout.write("\n")
+        # The code is written while it's generated
+        writes = [
+            partial(write_code, instance, emit=args.emit, compact=args.compact)
+            for instance in instances
+        ]
+
+    names = schemas + [args.shared_module] if args.shared_module else schemas
+
+    if not outputs:
+        stream_code(writes[0], sys.stdout, timers[0])
+
+        with timers[0].measure("write"):
+            sys.stdout.write("\n")
+
+        profile.add(names[0], None, timers[0].timings)
+        return
+
+    stale = []
+
+    for name, output, write, timer in zip(names, outputs, writes, timers):
+        if stream_output(output, write, check=args.check, timer=timer):
+            stale.append(output)
+
+        profile.add(name, output, timer.timings)
+
+    if args.check and stale:
+        parser.exit(1, "".join(f"{o} is out of date\n" for o in stale))
 
 
 if __name__ == "__main__":
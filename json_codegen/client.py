@@ -0,0 +1,121 @@
+"""
+Thin client forwarding the command line to a running `json_codegen serve`, the code is generated
+in process when no server is running.
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+SOCKET_ENV = "JSON_CODEGEN_SOCKET"
+
+
+def get_socket_directory() -> str:
+    """
+    Returns the per-user directory of the default socket in the temporary directory, it must be
+    private: another local user creating the socket would receive the requests
+    """
+    return os.path.join(tempfile.gettempdir(), f"json_codegen-{os.getuid()}")
+
+
+def get_socket_path() -> str:
+    """
+    Returns the path of the server's socket, from the `JSON_CODEGEN_SOCKET` environment variable
+    or in the per-user socket directory
+    """
+    default = os.path.join(get_socket_directory(), "server.sock")
+
+    return os.environ.get(SOCKET_ENV) or default
+
+
+def check_socket_owner(socket_path: str) -> None:
+    """
+    Raises `PermissionError` if `socket_path`, or the default socket directory containing it,
+    exists and isn't owned by the current user
+    """
+    paths = [socket_path]
+    directory = os.path.dirname(os.path.abspath(socket_path))
+
+    if directory == os.path.abspath(get_socket_directory()):
+        paths.append(directory)
+
+    for path in paths:
+        try:
+            owner = os.lstat(path).st_uid
+        except FileNotFoundError:
+            continue
+
+        if owner != os.getuid():
+            raise PermissionError(f"{path} is owned by another user")
+
+
+def request(payload: Dict, socket_path: Optional[str] = None) -> Dict:
+    """
+    Sends a request to the server and returns its response, raises `OSError` if the server
+    isn't running or its socket belongs to another user
+    """
+    socket_path = socket_path or get_socket_path()
+    check_socket_owner(socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+
+        with sock.makefile("rwb") as f:
+            f.write(json.dumps(payload).encode() + b"\n")
+            f.flush()
+            line = f.readline()
+
+    if not line:
+        raise ConnectionError("Connection closed by the server")
+
+    response: Dict = json.loads(line)
+
+    return response
+
+
+# Options keeping the command line running, they would block the server
+IN_PROCESS_OPTIONS = ("--watch", "--stream")
+
+
+def is_in_process(argv: List[str]) -> bool:
+    """
+    Returns if the command line `argv` has one of `IN_PROCESS_OPTIONS`, or of their
+    abbreviations, and must run in process
+    """
+    return any(
+        len(arg) >= 3 and option.startswith(arg) for arg in argv for option in IN_PROCESS_OPTIONS
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+
+    if is_in_process(argv):
+        response = None
+    else:
+        try:
+            response = request({"argv": argv, "cwd": os.getcwd()})
+        except OSError:
+            # No server, generate in process
+            response = None
+
+    if response is None:
+        from json_codegen import cli
+
+        cli.main(argv)
+        return
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+
+    status = response.get("status", 1)
+
+    if status:
+        sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
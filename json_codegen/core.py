@@ -1,89 +1,514 @@
+import hashlib
+import importlib.machinery
 import importlib.util
+import itertools
 import json
+import marshal
+import os
 from collections import OrderedDict
 from pathlib import Path
-from typing import Iterable
+from types import CodeType
+from typing import IO, Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from json_codegen.capabilities import Capabilities, SchemaProblem, check_records
+from json_codegen.decoders import get_decoder
+from json_codegen.nodes import SchemaNode, SchemaNodeFactory, with_item
+from json_codegen.resolver import (
+    RefResolver,
+    escape_pointer_token,
+    iter_refs,
+    split_ref,
+)
+from json_codegen.shapes import ShapeIndex, hoist_shared_shapes
+from json_codegen.streaming import DEFAULT_CHUNK_SIZE, ROOT, iter_schema
+
+DEFINITIONS_KEYS = ("definitions", "$defs")
+
+CLASS = "class"
+ALIAS = "alias"
 
 
 class GeneratorNotFoundException(Exception):
     pass
 
 
-def load_external_generator(filename: Path):
-    module_name = filename.stem
+class UnsupportedSchemaException(NotImplementedError):
+    """
+    Raised before generating the code when the schema uses constructs the generator doesn't
+    support, `problems` lists all of them
+    """
+
+    def __init__(self, problems: List[SchemaProblem]):
+        self.problems = problems
+
+        super().__init__("Unsupported schema:\n" + "\n".join(f"  {p}" for p in problems))
+
+
+class _SourceLoader(importlib.machinery.SourceFileLoader):
+    """
+    Source loader caching the bytecode in `cache_dir` instead of next to the source file
+    """
+
+    def __init__(self, fullname: str, path: str, cache_dir: Optional[Path] = None):
+        super().__init__(fullname, path)
+        self.cache_dir = cache_dir
+
+    def get_code(self, fullname: str) -> Optional[CodeType]:
+        if self.cache_dir is None:
+            return super().get_code(fullname)
+
+        source_path = self.get_filename(fullname)
+        stat = os.stat(source_path)
+        header = importlib.util.MAGIC_NUMBER + f"{stat.st_mtime_ns}:{stat.st_size}\n".encode()
+        name = hashlib.sha256(source_path.encode()).hexdigest()[:32]
+        cache_path = self.cache_dir / f"{name}.pyc"
+
+        try:
+            data = cache_path.read_bytes()
+        except OSError:
+            pass
+        else:
+            if data.startswith(header):
+                offset = len(header)
+                cached: CodeType = marshal.loads(data[offset:])  # nosec B302
+
+                return cached
+
+        code = self.source_to_code(self.get_data(source_path), source_path)
+
+        # The cache is best effort
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(header + marshal.dumps(code))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+        return code
+
+
+# External generators loaded in this process by path, with the mtime and size of the file
+_external_generators: Dict[Path, Tuple[Tuple[int, int], type]] = {}
+
+
+def load_external_generator(filename: Union[str, Path], cache_dir: Optional[Path] = None) -> type:
+    """
+    Loads the generator class defined in `filename`, the class is named after the file in
+    CamelCase.
+
+    Classes are loaded once per process and loaded again only when the file changes. The bytecode
+    is cached next to the file like for any module, or in `cache_dir`.
+    """
+    path = Path(filename).resolve()
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    try:
+        loaded_version, klass = _external_generators[path]
+    except KeyError:
+        pass
+    else:
+        if loaded_version == version:
+            return klass
+
+    module_name = path.stem
     klass_name = "".join(s.capitalize() for s in module_name.split("_"))
-    filename_str = str(filename)
 
-    spec = importlib.util.spec_from_file_location(module_name, filename_str)
+    loader = _SourceLoader(module_name, str(path), cache_dir=cache_dir)
+    spec = importlib.util.spec_from_file_location(module_name, str(path), loader=loader)
+    assert spec is not None
     module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    loader.exec_module(module)
 
     try:
-        return getattr(module, klass_name)
+        klass = getattr(module, klass_name)
     except AttributeError:
         raise GeneratorNotFoundException(f"Class {klass_name} not found in {filename}")
 
+    _external_generators[path] = (version, klass)
+
+    return klass
+
+
+def load_schema(
+    schema_str: Union[str, bytes], frozen: bool = False, backend: Optional[str] = None
+) -> Any:
+    """
+    Decodes a JSON schema with the decoder `backend`, see `json_codegen.decoders`.
+
+    With `frozen` the objects are decoded as immutable `SchemaNode`s, this always uses the
+    standard library decoder.
+    """
+    if frozen:
+        return json.loads(schema_str, object_pairs_hook=SchemaNodeFactory())
+
+    return get_decoder(backend)(schema_str)
 
-def load_schema(schema_str):
-    return json.loads(schema_str, object_pairs_hook=OrderedDict)
+
+def parse_definition(
+    key: str, definition: Mapping, section: str = "definitions"
+) -> Tuple[str, Mapping]:
+    new_key = f"#/{section}/{escape_pointer_token(key)}"
+
+    # Frozen nodes can be shared as they are
+    if isinstance(definition, SchemaNode):
+        if "title" not in definition:
+            definition = definition.with_item("title", key)
+
+        return new_key, definition
+
+    new_definition = dict(definition)
+
+    if "title" not in new_definition:
+        new_definition["title"] = key
+
+    return new_key, new_definition
+
+
+def is_primitive_alias(definition: Mapping) -> bool:
+    return definition.get("type") != "object" or len(definition.get("properties", {})) == 0
+
+
+class DefinitionRecord:
+    """
+    Metadata of a definition computed once at parse time
+    """
+
+    __slots__ = ("key", "title", "name", "kind", "properties", "required", "definition")
+
+    def __init__(self, key: str, definition: Mapping, prefix: str = "") -> None:
+        title = definition.get("title")
+        properties = definition.get("properties") or {}
+
+        self.key = key
+        self.title = title
+        self.name = None if title is None else prefix + title
+        self.kind = ALIAS if is_primitive_alias(definition) else CLASS
+        self.properties = tuple((k, properties[k]) for k in sorted(properties.keys()))
+        self.required = frozenset(definition.get("required", ()))
+        self.definition = definition
+
+    @property
+    def is_alias(self) -> bool:
+        return self.kind == ALIAS
 
 
 class SchemaParser:
-    def __init__(self, schema, *args, **kwds):
+    # Schema constructs supported by the generator, checked before generating the code
+    capabilities: Optional[Capabilities] = None
+
+    def __init__(self, schema: Any, *args: Any, **kwds: Any) -> None:
         self.schema = schema
         self.prefix = kwds.get("prefix") or ""
-        self.definitions = OrderedDict()
+        self.only = kwds.get("only")
+        self.prune = bool(kwds.get("prune") or self.only)
+        self.shared = frozenset(kwds.get("shared") or ())
+        self.shared_module = kwds.get("shared_module")
+        # The definitions are imported by other modules
+        self.exported = bool(kwds.get("exported"))
+        self.definitions: "OrderedDict[str, Any]" = OrderedDict()
+
+        definitions = kwds.get("definitions")
+
+        if definitions is None:
+            self.__parse_definitions()
+        else:
+            self.definitions.update(definitions)
+
+        self.shapes = ShapeIndex()
+
+        if kwds.get("hoist_shapes"):
+            self.schema, self.definitions = hoist_shared_shapes(
+                self.schema, self.definitions, self.shapes
+            )
+
+        self.resolver = RefResolver(
+            self.schema, definitions=self.definitions, filename=kwds.get("filename")
+        )
+
+        self.__reachable: Optional[Set[str]] = None
+        self.__external: Optional[List[DefinitionRecord]] = None
+
+        self.index = OrderedDict(
+            (key, DefinitionRecord(key, definition, prefix=self.prefix))
+            for key, definition in self.definitions.items()
+        )
+
+    @classmethod
+    def from_stream(
+        cls,
+        fp: IO[str],
+        *args: Any,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        frozen: bool = False,
+        **kwds: Any,
+    ) -> "SchemaParser":
+        """
+        Builds the parser while reading the schema incrementally from `fp`, each definition is
+        normalised as soon as it's decoded so the whole JSON text is never held in memory.
+        """
+        schema: "OrderedDict[str, Any]" = OrderedDict()
+        definitions: "OrderedDict[str, Any]" = OrderedDict()
+        object_pairs_hook = SchemaNodeFactory() if frozen else None
+        events = iter_schema(fp, chunk_size=chunk_size, object_pairs_hook=object_pairs_hook)
+
+        for kind, key, value in events:
+            if kind == ROOT:
+                schema[key] = value
+            else:
+                new_key, new_definition = parse_definition(key, value, section=kind)
+                definitions[new_key] = new_definition
+
+        return cls(schema, *args, definitions=definitions, **kwds)
 
-        self.__parse_definitions()
+    @classmethod
+    def from_state(cls, state: Tuple[Any, Any], *args: Any, **kwds: Any) -> "SchemaParser":
+        """
+        Builds the parser from the state returned by `get_state()` skipping the parsing of the
+        definitions.
+        """
+        schema, definitions = state
 
-    def __parse_definitions(self):
-        definitions = self.schema.get("definitions", {})
+        return cls(schema, *args, definitions=definitions, **kwds)
 
-        for key, definition in definitions.items():
-            new_key = f"#/definitions/{key}"
-            new_definition = dict(definition)
+    def get_state(self) -> Tuple[Any, "OrderedDict[str, Any]"]:
+        schema = OrderedDict((k, v) for k, v in self.schema.items() if k not in DEFINITIONS_KEYS)
 
-            if "title" not in new_definition:
-                new_definition["title"] = key
+        return schema, self.definitions
 
-            self.definitions[new_key] = new_definition
+    def __parse_definitions(self) -> None:
+        for section in DEFINITIONS_KEYS:
+            definitions = self.schema.get(section, {})
 
-    def apply_prefix(self, definition):
+            for key, definition in definitions.items():
+                new_key, new_definition = parse_definition(key, definition, section=section)
+
+                self.definitions[new_key] = new_definition
+
+    def resolve_ref(self, ref: str) -> Any:
+        return self.resolver.resolve(ref)
+
+    def get_record(self, ref: str) -> DefinitionRecord:
+        try:
+            return self.index[ref]
+        except KeyError:
+            pass
+
+        # Records of refs outside of the definitions are built on first use
+        record = DefinitionRecord(ref, self.resolve_ref(ref), prefix=self.prefix)
+        self.index[ref] = record
+
+        return record
+
+    def find_definition_key(self, name: str) -> str:
+        for section in DEFINITIONS_KEYS:
+            key = f"#/{section}/{escape_pointer_token(name)}"
+
+            if key in self.definitions:
+                return key
+
+        for key, definition in self.definitions.items():
+            if definition["title"] == name:
+                return key
+
+        raise ValueError(f"Definition {name} not found")
+
+    def get_reachable_definitions(self) -> Set[str]:
+        """
+        Returns the keys of the definitions reachable through `$ref`s from the root schema or,
+        if given, from the `only` definitions.
+        """
+        if self.__reachable is not None:
+            return self.__reachable
+
+        if self.only:
+            reachable = {self.find_definition_key(name) for name in self.only}
+            stack = [self.definitions[key] for key in reachable]
+        else:
+            reachable = set()
+            stack = [v for k, v in self.schema.items() if k not in DEFINITIONS_KEYS]
+
+        visited_refs = set()
+
+        while stack:
+            for ref in iter_refs(stack.pop()):
+                if ref in visited_refs:
+                    continue
+
+                visited_refs.add(ref)
+
+                # Definitions from other documents are found by get_external_records()
+                document_ref, _ = split_ref(ref)
+
+                if document_ref:
+                    continue
+
+                if ref in self.definitions:
+                    reachable.add(ref)
+                    stack.append(self.definitions[ref])
+                else:
+                    stack.append(self.resolve_ref(ref))
+
+        self.__reachable = reachable
+
+        return reachable
+
+    def get_external_records(self) -> List[DefinitionRecord]:
+        """
+        Returns the records of the definitions of other documents referenced by the schema's
+        definitions to generate, directly or through other external definitions. Nothing else
+        generates them so they're generated with the schema's own definitions.
+        """
+        if self.__external is not None:
+            return self.__external
+
+        stack = [r.definition for r in self.__iter_schema_records(shared=False)]
+        stack.extend(v for k, v in self.schema.items() if k not in DEFINITIONS_KEYS)
+        records: Dict[str, DefinitionRecord] = {}
+
+        while stack:
+            for ref in iter_refs(stack.pop()):
+                key = self.resolver.get_external_key(ref)
+
+                if key is None or key in records:
+                    continue
+
+                records[key] = self.get_record(key)
+                stack.append(records[key].definition)
+
+        self.__external = list(records.values())
+
+        return self.__external
+
+    def __iter_schema_records(self, shared: bool) -> Iterable[DefinitionRecord]:
+        records = (
+            self.index[key] for key in self.definitions.keys() if (key in self.shared) is shared
+        )
+
+        if not self.prune:
+            return records
+
+        reachable = self.get_reachable_definitions()
+
+        return (r for r in records if r.key in reachable)
+
+    def iter_records(self, shared: bool = False) -> Iterable[DefinitionRecord]:
+        """
+        Iterates over the records of the definitions to be generated, followed by the ones of
+        the other documents they reference, or, with `shared`, over the ones provided by the
+        shared module
+        """
+        records = self.__iter_schema_records(shared)
+
+        if shared:
+            return records
+
+        return itertools.chain(records, self.get_external_records())
+
+    def apply_prefix(self, definition: Any) -> Any:
         title = definition.get("title")
 
         if title is None:
             return definition
 
         new_title = "{}{}".format(self.prefix, definition["title"])
-        new_definition = dict(definition, title=new_title)
 
-        return new_definition
+        return with_item(definition, "title", new_title)
 
-    def definition_is_primitive_alias(self, definition):
-        return definition.get("type") != "object" or len(definition.get("properties", {})) == 0
+    def definition_is_primitive_alias(self, definition: Mapping) -> bool:
+        return is_primitive_alias(definition)
+
+    def get_root_definition(self) -> Any:
+        # The root is not generated when only some definitions are requested
+        if self.only:
+            return {}
 
-    def get_root_definition(self):
         return self.apply_prefix(self.schema)
 
-    def get_klass_definitions(self) -> Iterable:
-        return (
-            self.apply_prefix(d)
-            for d in self.definitions.values()
-            if not self.definition_is_primitive_alias(d)
+    def get_root_record(self) -> Optional[DefinitionRecord]:
+        if self.only or "title" not in self.schema:
+            return None
+
+        return DefinitionRecord("#", self.schema, prefix=self.prefix)
+
+    def get_klass_records(self) -> Iterable[DefinitionRecord]:
+        return (r for r in self.iter_records() if r.kind == CLASS)
+
+    def get_alias_records(self) -> Iterable[DefinitionRecord]:
+        return (r for r in self.iter_records() if r.kind == ALIAS)
+
+    def get_shared_klass_records(self) -> Iterable[DefinitionRecord]:
+        return (r for r in self.iter_records(shared=True) if r.kind == CLASS)
+
+    def check_schema(self) -> List[SchemaProblem]:
+        """
+        Returns the constructs of the records to generate not supported by the generator
+        """
+        if self.capabilities is None:
+            return []
+
+        records = list(self.get_klass_records())
+        root_record = self.get_root_record()
+
+        if root_record is not None:
+            records.append(root_record)
+
+        problems = list(check_records(self.capabilities, records))
+
+        # Definitions of other documents are generated under their own name
+        names = {r.name for r in self.__iter_schema_records(shared=False)}
+        names.update(r.name for r in self.__iter_schema_records(shared=True))
+
+        if root_record is not None:
+            names.add(root_record.name)
+
+        problems.extend(
+            SchemaProblem(r.key, f"definition {r.name} clashes with a definition of the schema")
+            for r in self.get_external_records()
+            if r.name in names
         )
 
-    def get_type_aliases(self):
-        return (d for d in self.definitions.values() if self.definition_is_primitive_alias(d))
+        return problems
+
+    def ensure_supported(self) -> None:
+        problems = self.check_schema()
+
+        if problems:
+            raise UnsupportedSchemaException(problems)
+
+    def get_klass_definitions(self) -> Iterable:
+        return (self.apply_prefix(r.definition) for r in self.get_klass_records())
+
+    def get_type_aliases(self) -> Iterable:
+        return (r.definition for r in self.get_alias_records())
 
 
 class BaseGenerator:
-    _body = None
+    _body: Any = None
 
-    def generate(self):
+    # Extension of the files generated with --output-dir
+    output_extension = ""
+
+    def generate(self) -> Any:
         return self
 
-    def as_code(self):
+    def as_code(self) -> str:
         raise NotImplementedError(self)
 
-    def as_ast(self):
+    def as_code_to(self, fp: IO[str], **kwds: Any) -> None:
+        """
+        Writes the code into the text file `fp`, the generators able to serialize their code
+        incrementally override it
+        """
+        fp.write(self.as_code(**kwds))
+
+    def write_to(self, path: Union[str, Path], **kwds: Any) -> None:
+        """
+        Writes the code into the file `path`, `kwds` are the options of `as_code_to()`
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            self.as_code_to(f, **kwds)
+
+    def as_ast(self) -> Any:
         raise NotImplementedError(self)
@@ -0,0 +1,82 @@
+import json
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+Decoder = Callable[[Union[str, bytes]], Any]
+
+DEFAULT_BACKEND = "json"
+AUTO_BACKEND = "auto"
+
+# Backends tried in order by the "auto" backend, the stdlib is always available
+BACKENDS: Tuple[str, ...] = ("orjson", "ujson", "json")
+
+
+def _load_orjson() -> Decoder:
+    import orjson
+
+    return orjson.loads
+
+
+def _load_ujson() -> Decoder:
+    import ujson
+
+    decoder: Decoder = ujson.loads
+
+    return decoder
+
+
+def _load_json() -> Decoder:
+    # Dicts keep the insertion order, an `object_pairs_hook` would only slow down decoding
+    return json.loads
+
+
+_LOADERS: Dict[str, Callable[[], Decoder]] = {
+    "orjson": _load_orjson,
+    "ujson": _load_ujson,
+    "json": _load_json,
+}
+
+_decoders: Dict[str, Decoder] = {}
+
+
+def get_decoder(backend: Optional[str] = None) -> Decoder:
+    """
+    Returns the `loads()` function of the JSON decoder `backend`, with "auto" the fastest
+    backend installed.
+
+    Raises `ValueError` if the backend is unknown or not installed.
+    """
+    backend = backend or DEFAULT_BACKEND
+
+    try:
+        return _decoders[backend]
+    except KeyError:
+        pass
+
+    if backend == AUTO_BACKEND:
+        for name in BACKENDS:
+            if is_available(name):
+                decoder = get_decoder(name)
+                break
+    else:
+        try:
+            loader = _LOADERS[backend]
+        except KeyError:
+            raise ValueError(f"JSON backend {backend} not supported")
+
+        try:
+            decoder = loader()
+        except ImportError:
+            raise ValueError(f"JSON backend {backend} is not installed")
+
+    _decoders[backend] = decoder
+
+    return decoder
+
+
+def is_available(backend: str) -> bool:
+    try:
+        get_decoder(backend)
+    except ValueError:
+        return False
+
+    return True
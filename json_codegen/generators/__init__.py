@@ -1,8 +1,25 @@
-from json_codegen.generators.flow import FlowGenerator  # noqa: F401
-from json_codegen.generators.javascript_flow import (  # noqa: F401
-    JavaScriptFlowGenerator,
-)
-from json_codegen.generators.python3 import Python3Generator  # noqa: F401
-from json_codegen.generators.python3_marshmallow import (  # noqa: F401
-    Python3MarshmallowGenerator,
-)
+import importlib
+from typing import Any, List
+
+# Generators are imported on first access, importing the package is cheap
+_GENERATORS = {
+    "FlowGenerator": "json_codegen.generators.flow",
+    "JavaScriptFlowGenerator": "json_codegen.generators.javascript_flow",
+    "Python3Generator": "json_codegen.generators.python3",
+    "Python3MarshmallowGenerator": "json_codegen.generators.python3_marshmallow",
+}
+
+__all__ = list(_GENERATORS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _GENERATORS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    return getattr(importlib.import_module(module_name), name)
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
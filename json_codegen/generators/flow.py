@@ -1,27 +1,52 @@
-import json
+import io
+from functools import partial
+from typing import IO, Any
 
 from json_codegen.astlib import javascript as ast
-from json_codegen.core import BaseGenerator, SchemaParser
-from json_codegen.js_utils import get_type_annotation
+from json_codegen.astlib.javascript_printer import to_source
+from json_codegen.capabilities import Capabilities
+from json_codegen.core import ALIAS, BaseGenerator, DefinitionRecord, SchemaParser
+from json_codegen.js_utils import get_shared_module_source, get_type_annotation
 
 
 class FlowGenerator(SchemaParser, BaseGenerator):
-    def generate(self):
-        # Generates type aliases
+    output_extension = ".json"
+    capabilities = Capabilities(tuples=False)
+
+    def generate(self) -> "FlowGenerator":
+        self.ensure_supported()
+
         self._body = []
 
-        for definition in self.get_type_aliases():
-            self._body.append(self.type_alias(definition))
+        # Import the types generated in the shared module
+        specifiers = [
+            ast.ImportSpecifier(ast.Identifier(name), ast.Identifier(name))
+            for name in (
+                r.title if r.kind == ALIAS else r.name for r in self.iter_records(shared=True)
+            )
+        ]
+
+        if specifiers:
+            self._body.append(
+                ast.ImportDeclaration(
+                    specifiers, get_shared_module_source(self.shared_module), import_kind="type"
+                )
+            )
+
+        # Generates type aliases
+
+        for record in self.get_alias_records():
+            self._body.append(self.type_alias(record))
 
         # Generates definitions
-        for definition in self.get_klass_definitions():
-            self._body.append(self.klass(definition))
+        for record in self.get_klass_records():
+            self._body.append(self.klass(record))
 
         # Generate root definition
-        root_definition = self.get_root_definition()
+        root_record = self.get_root_record()
 
-        if "title" in root_definition:
-            self._body.append(self.klass(root_definition))
+        if root_record is not None:
+            self._body.append(self.klass(root_record))
 
         # Add leading comment
         if len(self._body):
@@ -29,28 +54,42 @@ class FlowGenerator(SchemaParser, BaseGenerator):
 
         return self
 
-    def type_alias(self, definition):
-        aliased_type = get_type_annotation(self.definitions, definition, required=True)
-        type_alias = ast.DeclareTypeAlias(
-            id_=ast.Identifier(definition["title"]), right=aliased_type
+    def get_type_annotation(self, property_: Any, required: bool = False) -> ast.Node:
+        # Identical subschemas share the same annotation
+        annotation: ast.Node = self.shapes.memoize(
+            ("annotation", required),
+            property_,
+            partial(get_type_annotation, self.resolver, property_, required=required),
         )
 
-        return type_alias
+        return annotation
 
-    def klass(self, definition):
+    def declare_type(self, name: str, right: ast.Node) -> ast.Node:
+        # The types imported by other modules are exported instead of declared
+        if self.exported:
+            return ast.ExportNamedDeclaration(
+                declaration=ast.TypeAlias(id_=ast.Identifier(name), right=right),
+                export_kind="type",
+            )
+
+        return ast.DeclareTypeAlias(id_=ast.Identifier(name), right=right)
+
+    def type_alias(self, record: DefinitionRecord) -> ast.Node:
+        aliased_type = get_type_annotation(self.resolver, record.definition, required=True)
+
+        return self.declare_type(record.title, aliased_type)
+
+    def klass(self, record: DefinitionRecord) -> ast.Node:
         # Build class property Flow definition
         klass_annotations = []
-        required = definition.get("required", ())
-        properties = definition.get("properties", {})
 
-        for key in sorted(properties.keys()):
+        for key, property_ in record.properties:
             # Add property type definition
-            property_ = properties[key]
-            is_required = key in required
+            is_required = key in record.required
             has_default = "default" in property_
 
-            property_annotation = get_type_annotation(
-                self.definitions, property_, required=(is_required or has_default)
+            property_annotation = self.get_type_annotation(
+                property_, required=(is_required or has_default)
             )
             property_def = ast.ObjectTypeProperty(
                 key=ast.Identifier(key), value=property_annotation, force_variance=True
@@ -58,18 +97,13 @@ class FlowGenerator(SchemaParser, BaseGenerator):
             klass_annotations.append(property_def)
 
         # Add class constructor
-        if len(properties):
+        if len(record.properties):
             klass_annotations.append(self.klass_constructor())
 
         # Return class definition
-        klass = ast.DeclareTypeAlias(
-            id_=ast.Identifier(definition["title"]),
-            right=ast.ObjectTypeAnnotation(klass_annotations),
-        )
+        return self.declare_type(record.name, ast.ObjectTypeAnnotation(klass_annotations))
 
-        return klass
-
-    def klass_constructor(self):
+    def klass_constructor(self) -> ast.ObjectTypeProperty:
         return ast.ObjectTypeProperty(
             key=ast.Identifier("constructor"),
             value=ast.FunctionTypeAnnotation(
@@ -86,8 +120,24 @@ class FlowGenerator(SchemaParser, BaseGenerator):
             method=True,
         )
 
-    def as_ast(self):
+    def as_ast(self) -> ast.File:
         return ast.File(program=ast.Program(body=self._body), comments=[ast.CommentLine("@flow")])
 
-    def as_code(self):
-        return json.dumps(self.as_ast(), indent=2)
+    def as_code(self, compact: bool = False) -> str:
+        code = io.StringIO()
+        self.as_code_to(code, compact=compact)
+
+        return code.getvalue()
+
+    def as_code_to(self, fp: IO[str], compact: bool = False) -> None:
+        """
+        Writes the AST as JSON into the text file `fp` while it's serialized, without
+        indentation with `compact`
+        """
+        ast.dump(self.as_ast(), fp, compact=compact)
+
+    def as_js(self) -> str:
+        """
+        Returns the JavaScript code of the AST, printed without Node
+        """
+        return to_source(self.as_ast())
@@ -1,29 +1,52 @@
-import json
+import io
+from collections.abc import Mapping
+from functools import partial
+from typing import IO
 
 from json_codegen.astlib import javascript as ast
-from json_codegen.core import BaseGenerator, SchemaParser
-from json_codegen.js_utils import get_type_annotation
-from json_codegen.types import (
-    DefinitionType,
-    PropertiesType,
-    PropertyType,
-    RequiredType,
-)
+from json_codegen.astlib.javascript_printer import to_source
+from json_codegen.capabilities import DEFAULT_TYPES, Capabilities
+from json_codegen.core import BaseGenerator, DefinitionRecord, SchemaParser
+from json_codegen.js_utils import get_shared_module_source, get_type_annotation
+from json_codegen.types import PropertiesType, PropertyType, RequiredType
 
 
 class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
-    def generate(self):
+    output_extension = ".json"
+    capabilities = Capabilities(
+        default_types=DEFAULT_TYPES,
+        untyped_properties=False,
+        untyped_refs=False,
+        tuples=False,
+        scalar_additional_properties=False,
+        inline_one_of=False,
+    )
+
+    def generate(self) -> "JavaScriptFlowGenerator":
+        self.ensure_supported()
+
         # Generates definitions first
         self._body = []
 
-        for definition in self.get_klass_definitions():
-            self._body.append(self.klass(definition))
+        # Import the classes generated in the shared module
+        specifiers = [
+            ast.ImportSpecifier(ast.Identifier(r.name), ast.Identifier(r.name))
+            for r in self.get_shared_klass_records()
+        ]
+
+        if specifiers:
+            self._body.append(
+                ast.ImportDeclaration(specifiers, get_shared_module_source(self.shared_module))
+            )
+
+        for record in self.get_klass_records():
+            self._body.append(self.klass(record))
 
         # Generate root definition
-        root_definition = self.get_root_definition()
+        root_record = self.get_root_record()
 
-        if "title" in self.schema:
-            self._body.append(self.klass(root_definition))
+        if root_record is not None:
+            self._body.append(self.klass(root_record))
 
         # Add leading comments
         if len(self._body):
@@ -31,20 +54,27 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
 
         return self
 
-    def klass(self, definition: DefinitionType) -> ast.ExportNamedDeclaration:
+    def get_type_annotation(self, property_: PropertyType, required: bool = False) -> ast.AST:
+        # Identical subschemas share the same annotation
+        annotation: ast.AST = self.shapes.memoize(
+            ("annotation", required),
+            property_,
+            partial(get_type_annotation, self.resolver, property_, required=required),
+        )
+
+        return annotation
+
+    def klass(self, record: DefinitionRecord) -> ast.ExportNamedDeclaration:
         # Build class property Flow definition
         body = []
-        required = definition.get("required", [])
-        properties = definition.get("properties", {})
 
-        for key in sorted(properties.keys()):
+        for key, property_ in record.properties:
             # Add property type definition
-            property_ = properties[key]
-            is_required = key in required
+            is_required = key in record.required
             has_default = "default" in property_
 
-            property_annotation = get_type_annotation(
-                self.definitions, property_, required=(is_required or has_default)
+            property_annotation = self.get_type_annotation(
+                property_, required=(is_required or has_default)
             )
             property_def = ast.ClassProperty(
                 key=ast.Identifier(key), typeAnnotation=ast.TypeAnnotation(property_annotation)
@@ -53,13 +83,13 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
             body.append(property_def)
 
         # Add class constructor
-        if len(properties):
-            body.append(self.klass_constructor(properties, required))
+        if len(record.properties):
+            body.append(self.klass_constructor(record.properties, record.required))
 
         # Return class definition
         return ast.ExportNamedDeclaration(
             declaration=ast.ClassDeclaration(
-                id_=ast.Identifier(definition["title"]), body=ast.ClassBody(body=body)
+                id_=ast.Identifier(record.name), body=ast.ClassBody(body=body)
             )
         )
 
@@ -75,23 +105,22 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
 
         consequent = ast.MemberExpression(ast.Identifier("data"), property_=ast.Identifier(name))
 
-        if isinstance(items, dict) and "oneOf" in items:
+        if isinstance(items, Mapping) and "oneOf" in items:
             one_of = items["oneOf"][0]
 
             if "$ref" not in one_of:
                 raise NotImplementedError(f"Only 'oneOf' with '$ref's are supported: {one_of}")
 
-            ref_key = one_of["$ref"]
-            ref = self.definitions[ref_key]
+            record = self.get_record(one_of["$ref"])
 
-            if not self.definition_is_primitive_alias(ref):
+            if not record.is_alias:
                 consequent = ast.CallExpression(
                     callee=ast.MemberExpression(consequent, ast.Identifier("map")),
                     arguments=[
                         ast.ArrowFunctionExpression(
                             params=[ast.Identifier("v")],
                             body=ast.CallExpression(
-                                ast.Identifier(ref["title"]), [ast.Identifier("v")]
+                                ast.Identifier(record.title), [ast.Identifier("v")]
                             ),
                         )
                     ],
@@ -228,7 +257,7 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
         )
 
         # ...assign newValue...
-        ref_title = self.definitions[property_["$ref"]]["title"]
+        ref_title = self.get_record(property_["$ref"]).title
 
         new_value = ast.VariableDeclaration(
             [
@@ -295,7 +324,7 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
 
     def get_member_as_object(self, key: str, property_: PropertyType, required: bool = False):
         if "oneOf" in property_:
-            ref_title = self.definitions[property_["oneOf"][0]["$ref"]]["title"]
+            ref_title = self.get_record(property_["oneOf"][0]["$ref"]).title
 
             if required:
                 # new Object(data.key)
@@ -334,8 +363,7 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
         # Build constructor body
         body = []
 
-        for key in sorted(properties.keys()):
-            property_ = properties[key]
+        for key, property_ in properties:
             required = key in requireds
 
             # Left assignment
@@ -366,11 +394,27 @@ class JavaScriptFlowGenerator(SchemaParser, BaseGenerator):
             key=ast.Identifier("constructor"), kind="constructor", params=params, body=block
         )
 
-    def as_ast(self):
+    def as_ast(self) -> ast.File:
         comments = [ast.CommentLine("@flow")] if len(self._body) else []
         file_ = ast.File(program=ast.Program(body=self._body), comments=comments)
 
         return file_
 
-    def as_code(self):
-        return json.dumps(self.as_ast(), indent=2)
+    def as_code(self, compact: bool = False) -> str:
+        code = io.StringIO()
+        self.as_code_to(code, compact=compact)
+
+        return code.getvalue()
+
+    def as_code_to(self, fp: IO[str], compact: bool = False) -> None:
+        """
+        Writes the AST as JSON into the text file `fp` while it's serialized, without
+        indentation with `compact`
+        """
+        ast.dump(self.as_ast(), fp, compact=compact)
+
+    def as_js(self) -> str:
+        """
+        Returns the JavaScript code of the AST, printed without Node
+        """
+        return to_source(self.as_ast())
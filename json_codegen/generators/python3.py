@@ -1,39 +1,56 @@
-from typing import Dict, List, NewType
+from collections.abc import Mapping
+from functools import partial
+from typing import AbstractSet, Dict, NewType, Sequence, Tuple
 
 import astor
 
 from json_codegen.astlib import python as ast
-from json_codegen.core import BaseGenerator, SchemaParser
+from json_codegen.capabilities import DEFAULT_TYPES, Capabilities
+from json_codegen.core import BaseGenerator, DefinitionRecord, SchemaParser
 
 DefinitionType = NewType("DefinitionType", Dict)
 PropertyType = NewType("PropertyType", Dict)
-PropertiesType = NewType("PropertiesType", List[PropertyType])
-RequiredType = NewType("RequiredType", List)
+PropertiesType = NewType("PropertiesType", Sequence[Tuple[str, PropertyType]])
+RequiredType = NewType("RequiredType", AbstractSet[str])
 
 PYTHON_ANNOTATION_MAP = {"string": "str", "integer": "int", "number": "float", "boolean": "bool"}
 
 
 class Python3Generator(SchemaParser, BaseGenerator):
+    output_extension = ".py"
+    capabilities = Capabilities(
+        default_types=DEFAULT_TYPES,
+        untyped_properties=False,
+        untyped_refs=False,
+        untyped_maps=False,
+        untyped_items=False,
+        tuples=False,
+        scalar_additional_properties=False,
+        inline_one_of=False,
+    )
+
     def generate(self):
+        self.ensure_supported()
+
         # Add module imports
         self._body = []
 
         self._body.extend(self.make_module_imports())
 
         # Generates definitions first
-        for definition in self.get_klass_definitions():
-            self._body.append(self.make_klass(definition))
+        for record in self.get_klass_records():
+            self._body.append(self.make_klass(record))
 
         # Generate root definition
-        root_definition = self.get_root_definition()
+        root_record = self.get_root_record()
 
-        if "title" in root_definition:
-            self._body.append(self.make_klass(root_definition))
+        if root_record is not None:
+            self._body.append(self.make_klass(root_record))
 
         return self
 
     def make_module_imports(self) -> ast.ImportFrom:
-        return [
+        imports = [
             ast.ImportFrom(
                 module="typing",
                 names=[
@@ -46,21 +63,26 @@ class Python3Generator(SchemaParser, BaseGenerator):
             )
         ]
 
-    def make_klass(self, definition: DefinitionType) -> ast.Call:
+        # Import the classes generated in the shared module
+        names = [ast.alias(name=r.name, asname=None) for r in self.get_shared_klass_records()]
+
+        if names:
+            imports.append(ast.ImportFrom(module=self.shared_module, names=names, level=0))
+
+        return imports
+
+    def make_klass(self, record: DefinitionRecord) -> ast.Call:
         # Build class properties
         class_body = []
-        properties = definition.get("properties")
-
-        if properties:
-            required = definition.get("required", [])
 
-            class_body.append(self.make_klass_constructor(properties, required))
+        if record.properties:
+            class_body.append(self.make_klass_constructor(record.properties, record.required))
         else:
             class_body.append(ast.Pass())
 
         # Create class definition
         class_def = ast.ClassDef(
-            name=definition["title"], bases=[], body=class_body, decorator_list=[], keywords=[]
+            name=record.name, bases=[], body=class_body, decorator_list=[], keywords=[]
         )
 
         # Add to module's body
@@ -123,7 +145,7 @@ class Python3Generator(SchemaParser, BaseGenerator):
         # Exit early if doesn't needs to wrap
         items = property_.get("items")
 
-        if isinstance(items, dict):
+        if isinstance(items, Mapping):
             one_of = items.get("oneOf")
             ref = one_of[0]["$ref"] if one_of else None
         elif isinstance(items, list):
@@ -135,13 +157,13 @@ class Python3Generator(SchemaParser, BaseGenerator):
             return value
 
         # Don't wrap if type is a primitive
-        ref = self.definitions[ref]
+        record = self.get_record(ref)
 
-        if self.definition_is_primitive_alias(ref):
+        if record.is_alias:
             return value
 
         # Wrap value
-        ref_title = ref["title"]
+        ref_title = record.title
 
         return ast.ListComp(
             elt=ast.Call(
@@ -231,10 +253,10 @@ class Python3Generator(SchemaParser, BaseGenerator):
 
             if ref is not None:
                 # Don't wrap if type is a primitive
-                ref = self.definitions[ref]
+                record = self.get_record(ref)
 
-                if not self.definition_is_primitive_alias(ref):
-                    ref_title = ref["title"]
+                if not record.is_alias:
+                    ref_title = record.title
 
                     value = ast.IfExp(
                         test=ast.Compare(
@@ -253,14 +275,14 @@ class Python3Generator(SchemaParser, BaseGenerator):
         # ...map object
         if property_type == "object":
             if "oneOf" in property_:
-                ref = self.definitions[property_["oneOf"][0]["$ref"]]
+                record = self.get_record(property_["oneOf"][0]["$ref"])
 
-                if self.definition_is_primitive_alias(ref):
-                    annotation = self.get_partial_annotation_from_definition(ref)
+                if record.is_alias:
+                    annotation = self.get_partial_annotation_from_definition(record.definition)
                 else:
-                    annotation = ast.Name(id=ref["title"])
+                    annotation = ast.Name(id=record.title)
             elif "additionalProperties" in property_:
-                object_name = self.definitions[property_["additionalProperties"]["$ref"]]["title"]
+                object_name = self.get_record(property_["additionalProperties"]["$ref"]).title
 
                 annotation = ast.Subscript(
                     value=ast.Name(id="Dict"),
@@ -275,7 +297,7 @@ class Python3Generator(SchemaParser, BaseGenerator):
         elif property_type == "array":
             items = property_.get("items")
 
-            if isinstance(items, dict):
+            if isinstance(items, Mapping):
                 item_annotation = self.get_partial_annotation_from_definition(items)
             elif isinstance(items, list):
                 raise NotImplementedError(f"Tuple for 'array' is not supported: {property_}")
@@ -326,12 +348,16 @@ class Python3Generator(SchemaParser, BaseGenerator):
                 )
             )
 
-        for key in sorted(properties.keys()):
+        for key, property_ in properties:
             # Get default value
             is_required = key in requireds
-            property_ = properties[key]
 
-            annotation = self.get_annotation_from_definition(property_, is_required=is_required)
+            # Identical subschemas share the same annotation
+            annotation = self.shapes.memoize(
+                ("annotation", is_required),
+                property_,
+                partial(self.get_annotation_from_definition, property_, is_required=is_required),
+            )
             value = self.get_data_value(key, property_, is_required=is_required)
 
             # Build assign expression
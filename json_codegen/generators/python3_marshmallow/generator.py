@@ -1,10 +1,11 @@
-from re import search
+from collections.abc import Mapping
 from typing import List
 
 import astor
 
 from json_codegen.astlib import python as ast
-from json_codegen.core import BaseGenerator, SchemaParser
+from json_codegen.capabilities import Capabilities
+from json_codegen.core import BaseGenerator, DefinitionRecord, SchemaParser
 from json_codegen.generators.python3_marshmallow.object_generator import ObjectGenerator
 from json_codegen.generators.python3_marshmallow.utils import (
     class_name,
@@ -15,22 +16,35 @@ from json_codegen.types import PropertyType
 
 
 class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
+    output_extension = ".py"
+    capabilities = Capabilities(
+        types=frozenset(marshmallow_type_map),
+        default_values=(bool, int, str),
+        untyped_properties=False,
+        untyped_maps=False,
+        untyped_items=False,
+        additional_properties=False,
+        multiple_refs_arrays=False,
+    )
+
     def generate(self):
+        self.ensure_supported()
+
         # Add module imports
         self._body = []
         self._body.extend(self.module_imports())
 
         # Generates definitions first
-        for definition in self.get_klass_definitions():
-            schema = self.klass(definition)
+        for record in self.get_klass_records():
+            schema = self.klass(record)
             self._body.append(schema)
             self._body.append(ObjectGenerator.construct_class(schema))
 
         # Generate root definition
-        root_definition = self.get_root_definition()
+        root_record = self.get_root_record()
 
-        if "title" in root_definition:
-            root_schema = self.klass(root_definition)
+        if root_record is not None:
+            root_schema = self.klass(root_record)
             post_load_helper = Python3MarshmallowGenerator.construct_dec_post_load(root_schema)
 
             for node in ast.walk(root_schema):
@@ -43,7 +57,7 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
         return self
 
     def module_imports(self):
-        return [
+        imports = [
             ast.ImportFrom(
                 module="marshmallow",
                 level=0,
@@ -64,20 +78,31 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
             ),
         ]
 
-    def klass(self, definition):
+        # Import the schemas and classes generated in the shared module
+        names = []
+
+        for record in self.get_shared_klass_records():
+            name = upper_first_letter(record.name)
+            names.append(ast.alias(name=name + "Schema", asname=None))
+            names.append(ast.alias(name=name, asname=None))
+
+        if names:
+            imports.append(ast.ImportFrom(module=self.shared_module, level=0, names=names))
+
+        return imports
+
+    def klass(self, record: DefinitionRecord):
         # Build class properties
         class_body = []
-        properties = definition.get("properties")
 
-        if properties:
-            required = definition.get("required", ())
-            class_body.extend(self.get_klass_constructor(properties, required))
+        if record.properties:
+            class_body.extend(self.get_klass_constructor(record.properties, record.required))
         else:
             class_body.append(ast.Pass())
 
         # Create class definition
         class_def = ast.ClassDef(
-            name=upper_first_letter(definition["title"]) + "Schema",
+            name=upper_first_letter(record.name) + "Schema",
             bases=[ast.Name(id="Schema")],
             body=class_body,
             decorator_list=[],
@@ -98,10 +123,9 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
 
     def get_nested_type(self, prop):
         """
-        Scrap the definition from the reference string
+        Resolve the referenced definition and use its title as the nested schema's name
         """
-        nested_schema_name = search("#/definitions/(.*)$", prop["$ref"])
-        attr_type = nested_schema_name.group(1)
+        attr_type = self.get_record(prop["$ref"]).title
         attr_args = [ast.Name(id=upper_first_letter(attr_type) + "Schema")]
         return "Dict", attr_args
 
@@ -161,7 +185,7 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
                     values.append(ast.List(elts=[_default_helper(el) for el in v]))
                 elif isinstance(v, str):
                     values.append(ast.Str(s=v))
-                elif isinstance(v, dict):
+                elif isinstance(v, Mapping):
                     values.append(_dict_default_helper(v))
                 else:
                     raise NotImplementedError("Default type not handled (Dict)")
@@ -172,7 +196,7 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
 
         body = (
             _dict_default_helper(default)
-            if isinstance(default, dict)
+            if isinstance(default, Mapping)
             else _default_helper(default)
         )
 
@@ -204,7 +228,7 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
         # Exit early if doesn't needs to wrap
         property_items = property_.get("items", {})
 
-        if isinstance(property_items, dict) and "oneOf" in property_items:
+        if isinstance(property_items, Mapping) and "oneOf" in property_items:
             refs = (i.get("$ref") for i in property_items["oneOf"])
             refs = [r for r in refs if r is not None]
         elif isinstance(property_items, list):
@@ -223,14 +247,14 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
             raise NotImplementedError(f"{self}: we only support one $ref per array")
 
         # Don't wrap if type is a primitive
-        ref = self.definitions[refs[0]]
+        record = self.get_record(refs[0])
 
-        if self.definition_is_primitive_alias(ref):
+        if record.is_alias:
             return self._set_item_type_scalar(property_, value)
 
         # Where the array type references a definition, make a nested field with
         # the type of the item schema
-        ref_title = upper_first_letter(ref["title"])
+        ref_title = upper_first_letter(record.title)
         for node in ast.walk(value):
             if isinstance(node, ast.Call):
                 x = self._make_field("Nested", [ast.Name(id=ref_title + "Schema")], [])
@@ -262,9 +286,8 @@ class Python3MarshmallowGenerator(SchemaParser, BaseGenerator):
         # Prepare body
         body = []
 
-        for key in sorted(properties.keys()):
+        for key, property_ in properties:
             # Get default value
-            property_ = properties[key]
             value = self._get_member_value(key, property_, required)
 
             # Build assign expression
@@ -0,0 +1,254 @@
+import json
+import os
+import queue
+import shutil
+import subprocess  # nosec B404
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from json_codegen.astlib.javascript import Node
+
+# Node script printing Babel ASTs with @babel/generator
+AST_TO_JS = Path(__file__).resolve().parent.parent / "bin" / "ast_to_js"
+
+# Times a request is sent again after crashing its worker
+MAX_RETRIES = 1
+
+# Seconds to wait for each response before the worker is considered hung
+READ_TIMEOUT = 30.0
+
+
+class JsRenderError(Exception):
+    pass
+
+
+class _Worker:
+    """
+    A `bin/ast_to_js --ndjson` process answering one request per line in order
+    """
+
+    def __init__(self, command: Sequence[str], timeout: float = READ_TIMEOUT):
+        try:
+            self.process = subprocess.Popen(  # nosec B603
+                list(command), stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+        except OSError as e:
+            raise JsRenderError(f"Can't start {' '.join(command)}: {e}") from e
+
+        assert self.process.stdin is not None and self.process.stdout is not None
+        self.stdin: IO[bytes] = self.process.stdin
+        self.stdout: IO[bytes] = self.process.stdout
+        self.timeout = timeout
+
+        # Lines of stdout are read by a thread so reads can time out, b"" marks the end
+        self._lines: "queue.Queue[bytes]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self) -> None:
+        try:
+            for line in self.stdout:
+                self._lines.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._lines.put(b"")
+
+    def send(self, requests: List[Tuple[int, bytes]]) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Pipelines the `(id, line)` requests and returns the responses read in order, with the
+        reason the worker stopped answering if it answered less than all of them. A worker
+        which stopped answering must be discarded.
+        """
+
+        # Written from another thread so a full stdout pipe can't block both processes
+        def write() -> None:
+            try:
+                for _, line in requests:
+                    self.stdin.write(line)
+
+                self.stdin.flush()
+            except OSError:
+                pass
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+
+        responses = []
+        failure = None
+
+        for index, _ in requests:
+            try:
+                line = self._lines.get(timeout=self.timeout)
+            except queue.Empty:
+                failure = f"ast_to_js didn't answer in {self.timeout:g}s"
+                break
+
+            if not line:
+                failure = "ast_to_js exited while rendering"
+                break
+
+            try:
+                response = json.loads(line)
+            except ValueError:
+                failure = f"Invalid response from ast_to_js: {line[:200]!r}"
+                break
+
+            if (
+                not isinstance(response, dict)
+                or response.get("id") != index
+                or not ("code" in response or "error" in response)
+            ):
+                failure = f"Unexpected response from ast_to_js: {str(response)[:200]}"
+                break
+
+            responses.append(response)
+
+        if failure is not None:
+            # Unblocks the writer of a hung worker
+            self.process.kill()
+
+        writer.join()
+
+        return responses, failure
+
+    def close(self) -> None:
+        try:
+            self.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+        self._reader.join()
+        self.stdout.close()
+
+
+class JsRenderer:
+    """
+    Prints Babel ASTs as JavaScript with a pool of persistent `bin/ast_to_js` Node workers, one
+    per core by default.
+
+    The ASTs of a batch are spread over the workers and pipelined to each of them, workers are
+    started on the first batch and kept until `close()`. A worker which crashes, doesn't answer
+    within `timeout` seconds or answers something else than a response is replaced and its
+    unanswered requests are sent again, a request failing a worker more than `max_retries`
+    times fails.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        command: Optional[Sequence[str]] = None,
+        max_retries: int = MAX_RETRIES,
+        timeout: float = READ_TIMEOUT,
+    ):
+        self.size = workers or os.cpu_count() or 1
+        self.command = list(
+            command or [shutil.which("node") or "node", str(AST_TO_JS), "--ndjson"]
+        )
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JsRenderer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+
+            self._workers.clear()
+
+    def render(self, ast: Any) -> str:
+        code = self.render_many([ast])[0]
+
+        if isinstance(code, JsRenderError):
+            raise code
+
+        return code
+
+    def render_many(
+        self, asts: Iterable[Any], return_exceptions: bool = False
+    ) -> List[Union[str, JsRenderError]]:
+        """
+        Returns the code of every AST of `asts`, in the same order. With `return_exceptions` the
+        ASTs failing to render get their `JsRenderError` in place of their code, otherwise the
+        first one is raised.
+        """
+        lines = [
+            json.dumps({"id": i, "ast": ast}, separators=(",", ":"), default=Node.as_dict).encode()
+            + b"\n"
+            for i, ast in enumerate(asts)
+        ]
+        results: List[Any] = [None] * len(lines)
+        attempts = [0] * len(lines)
+        pending = list(range(len(lines)))
+
+        with self._lock:
+            while pending:
+                workers = self._get_workers(min(self.size, len(pending)))
+                step = len(workers)
+                chunks = [pending[i::step] for i in range(step)]
+
+                with ThreadPoolExecutor(len(workers)) as executor:
+                    answers = list(
+                        executor.map(
+                            lambda w, c: w.send([(i, lines[i]) for i in c]), workers, chunks
+                        )
+                    )
+
+                pending = []
+
+                for worker, chunk, (responses, failure) in zip(workers, chunks, answers):
+                    for index, response in zip(chunk, responses):
+                        if "error" in response:
+                            results[index] = JsRenderError(response["error"])
+                        else:
+                            results[index] = response["code"]
+
+                    if failure is None:
+                        continue
+
+                    # The first unanswered request failed the worker
+                    self._discard(worker)
+                    answered = len(responses)
+                    unanswered = chunk[answered:]
+                    attempts[unanswered[0]] += 1
+
+                    if attempts[unanswered[0]] > self.max_retries:
+                        results[unanswered[0]] = JsRenderError(failure)
+                        unanswered = unanswered[1:]
+
+                    pending.extend(unanswered)
+
+                pending.sort()
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, JsRenderError):
+                    raise result
+
+        return results
+
+    def _get_workers(self, count: int) -> List[_Worker]:
+        while len(self._workers) < count:
+            self._workers.append(_Worker(self.command, self.timeout))
+
+        return self._workers[:count]
+
+    def _discard(self, worker: _Worker) -> None:
+        self._workers.remove(worker)
+        worker.close()
@@ -2,6 +2,14 @@ from json_codegen.astlib import javascript as ast
 from json_codegen.types import DefinitionType, PropertyType
 
 
+def get_shared_module_source(shared_module: str) -> ast.AST:
+    """
+    Returns the source of the imports from the shared module, generated next to the modules
+    importing it and named after the last component of `shared_module`
+    """
+    return ast.StringLiteral("./" + shared_module.rsplit(".", 1)[-1])
+
+
 def get_object_type_annotation(definitions: DefinitionType, property_: PropertyType) -> ast.AST:
     additionalProperties = property_.get("additionalProperties")
 
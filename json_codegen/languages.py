@@ -0,0 +1,110 @@
+import importlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+# Packages can register generators for new languages under this entry point group, the name of
+# the entry point is the language and its value the generator class
+ENTRY_POINT_GROUP = "json_codegen.generators"
+
+BUILTIN_LANGUAGES = {
+    "python3": "json_codegen.generators.python3:Python3Generator",
+    "python3+marshmallow": (
+        "json_codegen.generators.python3_marshmallow:Python3MarshmallowGenerator"
+    ),
+    "javascript+flow": "json_codegen.generators.javascript_flow:JavaScriptFlowGenerator",
+    "flow": "json_codegen.generators.flow:FlowGenerator",
+}
+
+
+def _load_object(reference: str) -> Any:
+    module_name, _, attribute = reference.partition(":")
+
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _iter_entry_points() -> Iterator:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # Python < 3.8
+        try:
+            from importlib_metadata import entry_points  # type: ignore[no-redef]
+        except ImportError:
+            yield from _iter_pkg_resources_entry_points()
+            return
+
+    try:
+        yield from entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:
+        # Python < 3.10 returns a dict of groups
+        yield from entry_points().get(ENTRY_POINT_GROUP, ())
+
+
+def _iter_pkg_resources_entry_points() -> Iterator:
+    try:
+        import pkg_resources
+    except ImportError:
+        return
+
+    yield from pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)
+
+
+class LanguageRegistry(Mapping):
+    """
+    Maps the name of the languages to their generator class, a generator is imported only when
+    its language is looked up.
+
+    Besides the built-in languages, generators are discovered through the
+    `json_codegen.generators` entry points on the first lookup of an unknown language.
+    """
+
+    def __init__(self, languages: Dict[str, str]):
+        self._references = dict(languages)
+        self._entry_points: Optional[Dict] = None
+        self._generators: Dict[str, type] = {}
+
+    @property
+    def entry_points(self) -> Dict:
+        if self._entry_points is None:
+            self._entry_points = {
+                ep.name: ep for ep in _iter_entry_points() if ep.name not in self._references
+            }
+
+        return self._entry_points
+
+    def register(self, language: str, reference: str) -> None:
+        """
+        Registers the generator `reference`, as "module:Class", for `language`
+        """
+        self._references[language] = reference
+        self._generators.pop(language, None)
+
+    def __getitem__(self, language: str) -> type:
+        try:
+            return self._generators[language]
+        except KeyError:
+            pass
+
+        generator: type
+
+        if language in self._references:
+            generator = _load_object(self._references[language])
+        else:
+            generator = self.entry_points[language].load()
+
+        self._generators[language] = generator
+
+        return generator
+
+    def __contains__(self, language: object) -> bool:
+        return language in self._references or language in self.entry_points
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._references
+        yield from self.entry_points
+
+    def __len__(self) -> int:
+        return len(self._references) + len(self.entry_points)
+
+
+LANGUAGES = LanguageRegistry(BUILTIN_LANGUAGES)
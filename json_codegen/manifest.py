@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from json_codegen import __version__
+
+# Bump when the layout of the manifest changes
+MANIFEST_FORMAT = 1
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+def hash_file(filename: Union[str, Path]) -> Optional[str]:
+    """
+    Returns the sha256 of the content of `filename`, None if it can't be read
+    """
+    digest = hashlib.sha256()
+
+    try:
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+
+    return digest.hexdigest()
+
+
+def get_fingerprint(extra_sources: Iterable[Union[str, Path]] = (), **options: Any) -> str:
+    """
+    Returns the hash of the library's sources, of `extra_sources`, like an external generator,
+    and of the `options` changing the generated code
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{__version__}\0{sorted(options.items())!r}\0".encode())
+
+    sources: List[Tuple[str, Union[str, Path]]] = [
+        (str(p.relative_to(_PACKAGE_DIR)), p) for p in sorted(_PACKAGE_DIR.rglob("*.py"))
+    ]
+    sources.extend((str(s), s) for s in extra_sources)
+
+    for name, source in sources:
+        digest.update(f"{name}\0{hash_file(source)}\0".encode())
+
+    return digest.hexdigest()
+
+
+def escape_depfile_path(path: str) -> str:
+    return path.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+
+def format_depfile(rules: Iterable[Tuple[str, Iterable[str]]]) -> str:
+    """
+    Returns a dependency file in the Make format, also read by Ninja, with a rule for each output
+    of `rules` depending on its inputs
+    """
+    lines = []
+
+    for output, inputs in rules:
+        paths = [escape_depfile_path(p) for p in dict.fromkeys(inputs)]
+        lines.append(" ".join([escape_depfile_path(output) + ":", *paths]) + "\n")
+
+    return "".join(lines)
+
+
+class BuildManifest:
+    """
+    Records the inputs of every generated file, so the outputs whose schema, referenced files,
+    generator and options didn't change can be skipped without decoding the schema.
+    """
+
+    def __init__(self, filename: Union[str, Path]):
+        self.filename = Path(filename)
+        self.outputs: Dict[str, Dict] = {}
+
+        try:
+            with self.filename.open() as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(manifest, dict) and manifest.get("format") == MANIFEST_FORMAT:
+            self.outputs = manifest.get("outputs") or {}
+
+    def is_up_to_date(self, output: str, schema: str, fingerprint: str) -> bool:
+        entry = self.outputs.get(output)
+
+        if entry is None or entry["schema"] != schema or entry["fingerprint"] != fingerprint:
+            return False
+
+        if not os.path.exists(output):
+            return False
+
+        return all(hash_file(f) == h for f, h in entry["inputs"].items())
+
+    def record(
+        self, output: str, schema: str, fingerprint: str, dependencies: Iterable[str] = ()
+    ) -> None:
+        inputs = {f: hash_file(f) for f in [schema, *dependencies]}
+
+        self.outputs[output] = {"schema": schema, "fingerprint": fingerprint, "inputs": inputs}
+
+    def get_inputs(self, output: str) -> List[str]:
+        """
+        Returns the schema and the referenced files recorded for `output`
+        """
+        return list(self.outputs[output]["inputs"])
+
+    def discard(self, output: str) -> None:
+        self.outputs.pop(output, None)
+
+    def save(self) -> None:
+        directory = self.filename.parent
+        directory.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=str(directory), suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"format": MANIFEST_FORMAT, "outputs": self.outputs}, f, indent=2)
+
+            os.replace(tmp_name, str(self.filename))
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
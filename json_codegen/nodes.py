@@ -0,0 +1,161 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Nodes with more keys than this get a hash index on the first lookup, smaller ones are scanned
+INDEX_THRESHOLD = 16
+
+_MISSING = object()
+
+
+class SchemaNode(Mapping):
+    """
+    Immutable, tuple-backed mapping used as a compact replacement of `OrderedDict` for the nodes
+    of a parsed schema.
+
+    Keys are interned and keep their insertion order. Nodes are never mutated so they can be
+    shared between the parser and the generators without copying them.
+    """
+
+    __slots__ = ("_keys", "_values", "_index")
+
+    def __init__(self, keys: Tuple[str, ...] = (), values: Tuple[Any, ...] = ()):
+        self._keys = keys
+        self._values = values
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, Any]]) -> "SchemaNode":
+        """
+        Builds a node from key/value pairs, can be used as `object_pairs_hook` in `json.loads()`
+        """
+        keys: List[str] = []
+        values: List[Any] = []
+        positions: Dict[str, int] = {}
+
+        for key, value in pairs:
+            # Last value wins like in a dict
+            if key in positions:
+                values[positions[key]] = value
+                continue
+
+            positions[key] = len(keys)
+            keys.append(sys.intern(key))
+            values.append(value)
+
+        return cls(tuple(keys), tuple(values))
+
+    def _position(self, key: Any) -> int:
+        if len(self._keys) > INDEX_THRESHOLD:
+            if self._index is None:
+                self._index = {k: i for i, k in enumerate(self._keys)}
+
+            return self._index.get(key, -1)
+
+        try:
+            return self._keys.index(key)
+        except ValueError:
+            return -1
+
+    def __getitem__(self, key: str) -> Any:
+        i = self._position(key)
+
+        if i < 0:
+            raise KeyError(key)
+
+        return self._values[i]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._position(key)
+
+        return default if i < 0 else self._values[i]
+
+    def __contains__(self, key: object) -> bool:
+        return self._position(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> Tuple[str, ...]:  # type: ignore[override]
+        return self._keys
+
+    def values(self) -> Tuple[Any, ...]:  # type: ignore[override]
+        return self._values
+
+    def items(self) -> List[Tuple[str, Any]]:  # type: ignore[override]
+        return list(zip(self._keys, self._values))
+
+    def with_item(self, key: str, value: Any) -> "SchemaNode":
+        """
+        Returns a copy of the node with `key` set to `value`, the other values are shared
+        """
+        i = self._position(key)
+
+        if i < 0:
+            return type(self)(self._keys + (sys.intern(key),), self._values + (value,))
+
+        values = list(self._values)
+        values[i] = value
+
+        return type(self)(self._keys, tuple(values))
+
+    def __reduce__(self) -> Tuple[type, Tuple[Tuple[str, ...], Tuple[Any, ...]]]:
+        return type(self), (self._keys, self._values)
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{k!r}: {v!r}" for k, v in self.items())
+
+        return f"{type(self).__name__}({{{items}}})"
+
+
+class SchemaNodeFactory:
+    """
+    `object_pairs_hook` decoding the objects of a document into `SchemaNode`s.
+
+    Nodes with the same keys share their tuple of keys and identical nodes holding only strings,
+    like `{"type": "string"}`, are decoded once.
+    """
+
+    def __init__(self) -> None:
+        self._keys: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._nodes: Dict[Tuple[Tuple[str, ...], Tuple[Any, ...]], SchemaNode] = {}
+
+    def __call__(self, pairs: List[Tuple[str, Any]]) -> SchemaNode:
+        if not pairs:
+            return SchemaNode()
+
+        keys, values = zip(*pairs)
+
+        try:
+            keys = self._keys[keys]
+        except KeyError:
+            if len(set(keys)) < len(keys):
+                return SchemaNode.from_pairs(pairs)
+
+            keys = self._keys[keys] = tuple(map(sys.intern, keys))
+
+        if not all(type(v) is str for v in values):
+            return SchemaNode(keys, values)
+
+        try:
+            return self._nodes[keys, values]
+        except KeyError:
+            node = self._nodes[keys, values] = SchemaNode(keys, values)
+
+        return node
+
+
+def with_item(node: Mapping, key: str, value: Any) -> Mapping:
+    """
+    Returns a copy of `node` with `key` set to `value` preserving the type of the node
+    """
+    if isinstance(node, SchemaNode):
+        return node.with_item(key, value)
+
+    new_node = dict(node)
+    new_node[key] = value
+
+    return new_node
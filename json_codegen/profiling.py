@@ -0,0 +1,72 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Phases of the generation of an output, in order
+PHASES = ("load_schema", "parse", "generate", "as_code", "write")
+
+
+class PhaseTimer:
+    """
+    Accumulates the time spent in each phase of the generation of one output
+    """
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+
+class GenerationProfile:
+    """
+    Collects the timings of the phases of every generated output
+    """
+
+    def __init__(self) -> None:
+        self.rows: List[Tuple[str, Optional[str], Dict[str, float]]] = []
+
+    def add(self, schema: str, output: Optional[str], timings: Dict[str, float]) -> None:
+        self.rows.append((schema, output, dict(timings)))
+
+    def get_totals(self) -> Dict[str, float]:
+        return {p: sum(t.get(p, 0.0) for _, _, t in self.rows) for p in PHASES}
+
+    def format_table(self) -> str:
+        """
+        Returns the timings in milliseconds as a table, one row per output plus the totals
+        """
+        rows = [(schema, timings) for schema, _, timings in self.rows]
+        rows.append(("total", self.get_totals()))
+
+        width = max(len(name) for name, _ in rows)
+        lines = [f"{'schema':<{width}} " + " ".join(f"{p:>11}" for p in PHASES + ("total",))]
+
+        for name, timings in rows:
+            values = [timings.get(p, 0.0) * 1000 for p in PHASES]
+            values.append(sum(values))
+            lines.append(f"{name:<{width}} " + " ".join(f"{v:>9.1f}ms" for v in values))
+
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self) -> Dict:
+        """
+        Returns the timings in seconds as a JSON serializable summary
+        """
+        return {
+            "phases": list(PHASES),
+            "outputs": [
+                {"schema": schema, "output": output, "timings": timings}
+                for schema, output, timings in self.rows
+            ],
+            "totals": self.get_totals(),
+        }
@@ -0,0 +1,179 @@
+import hashlib
+import json
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Type
+
+from json_codegen.core import SchemaParser
+from json_codegen.resolver import unescape_pointer_token
+
+
+class SharedTypeRegistry:
+    """
+    Deduplicates definitions across many schemas by structural hash.
+
+    The hash of a definition covers its key, its content and, recursively, the hashes of the
+    definitions it references. Definitions whose hash is found in more than one schema are
+    shared: they can be generated once in a common module and imported by every schema.
+    """
+
+    def __init__(self) -> None:
+        self._parsers: List[SchemaParser] = []
+        self._hashes: List[Dict[str, str]] = []
+        self._owners: Dict[str, Set[int]] = defaultdict(set)
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._definitions: Dict[str, Tuple[str, Any]] = {}
+        self._shared: Optional[FrozenSet[str]] = None
+
+    def add(self, parser: SchemaParser) -> None:
+        position = len(self._parsers)
+        hashes: Dict[str, str] = {}
+
+        # Only the definitions generated by the parser can be shared
+        generated = {r.key for r in parser.iter_records()}
+
+        for key in parser.definitions.keys():
+            structural_hash = self._hash_definition(parser, key, hashes, set())
+
+            if key in generated:
+                self._owners[structural_hash].add(position)
+
+        self._parsers.append(parser)
+        self._hashes.append(OrderedDict((k, hashes[k]) for k in parser.definitions.keys()))
+        self._shared = None
+
+    def _hash_definition(
+        self, parser: SchemaParser, key: str, hashes: Dict[str, str], visiting: Set[str]
+    ) -> str:
+        try:
+            return hashes[key]
+        except KeyError:
+            pass
+
+        visiting.add(key)
+        dependencies: Set[str] = set()
+
+        def canonical(node: Any) -> Any:
+            if isinstance(node, Mapping):
+                ref = node.get("$ref")
+
+                if isinstance(ref, str) and ref in parser.definitions:
+                    # Recursive references are identified by their key only
+                    if ref in visiting:
+                        ref_hash = f"cycle:{ref}"
+                    else:
+                        ref_hash = self._hash_definition(parser, ref, hashes, visiting)
+                        dependencies.add(ref_hash)
+
+                    node = dict(node, **{"$ref": ref_hash})
+
+                return {k: canonical(v) for k, v in node.items()}
+            elif isinstance(node, list):
+                return [canonical(v) for v in node]
+            else:
+                return node
+
+        definition = parser.definitions[key]
+        text = json.dumps([key, canonical(definition)], sort_keys=True, separators=(",", ":"))
+        structural_hash = hashlib.sha256(text.encode()).hexdigest()
+
+        visiting.discard(key)
+
+        hashes[key] = structural_hash
+        self._dependencies[structural_hash] = dependencies
+        self._definitions.setdefault(structural_hash, (key, definition))
+
+        return structural_hash
+
+    def get_shared_hashes(self) -> FrozenSet[str]:
+        if self._shared is not None:
+            return self._shared
+
+        shared = {h for h, owners in self._owners.items() if len(owners) > 1}
+
+        # Different definitions with the same key can't live in the same module
+        keys: Dict[str, Set[str]] = defaultdict(set)
+
+        for structural_hash in shared:
+            keys[self._definitions[structural_hash][0]].add(structural_hash)
+
+        for hashes in keys.values():
+            if len(hashes) > 1:
+                shared -= hashes
+
+        # A shared definition needs all its references to be shared too
+        changed = True
+
+        while changed:
+            changed = False
+
+            for structural_hash in list(shared):
+                if not self._dependencies[structural_hash] <= shared:
+                    shared.discard(structural_hash)
+                    changed = True
+
+        self._shared = frozenset(shared)
+
+        return self._shared
+
+    def get_shared_keys(self, parser: SchemaParser) -> FrozenSet[str]:
+        position = self._parsers.index(parser)
+        shared = self.get_shared_hashes()
+
+        return frozenset(k for k, h in self._hashes[position].items() if h in shared)
+
+    def get_common_schema(self) -> Dict:
+        """
+        Returns a schema without root holding every shared definition
+        """
+        shared = self.get_shared_hashes()
+        schema: Dict[str, Dict] = OrderedDict()
+        seen = set()
+
+        for hashes in self._hashes:
+            for key, structural_hash in hashes.items():
+                if structural_hash not in shared or key in seen:
+                    continue
+
+                seen.add(key)
+
+                _, section, token = key.split("/", 2)
+                definitions = schema.setdefault(section, OrderedDict())
+                definitions[unescape_pointer_token(token)] = self._definitions[structural_hash][1]
+
+        return schema
+
+
+def generate_with_shared_types(
+    generator: Type[Any], parsers: List[SchemaParser], shared_module: str, **kwds: Any
+) -> Tuple[SchemaParser, List[SchemaParser]]:
+    """
+    Generates the common module with the definitions shared by `parsers` and one module for each
+    parser importing the shared definitions from `shared_module`.
+
+    Each parser keeps its `prune` and `only` options, only the definitions it generates are
+    shared. The parsers' schemas already have their shapes hoisted.
+    """
+    registry = SharedTypeRegistry()
+
+    for parser in parsers:
+        registry.add(parser)
+
+    common = generator(registry.get_common_schema(), exported=True, **kwds).generate()
+
+    generators = [
+        generator.from_state(
+            parser.get_state(),
+            **dict(
+                kwds,
+                filename=parser.resolver.path,
+                prune=parser.prune,
+                only=parser.only,
+                shared=registry.get_shared_keys(parser),
+                shared_module=shared_module,
+            ),
+        ).generate()
+        for parser in parsers
+    ]
+
+    return common, generators
@@ -0,0 +1,235 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, Tuple, Union
+from urllib.parse import unquote
+
+DEFAULT_CACHE_SIZE = 128
+
+
+def escape_pointer_token(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def unescape_pointer_token(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def build_pointer_index(document: Any, base: str = "") -> Dict[str, Any]:
+    """
+    Maps the JSON pointer of every object and array in `document` to the node itself
+    """
+    index = {}
+    stack = [(base, document)]
+
+    while stack:
+        pointer, node = stack.pop()
+        index[pointer] = node
+
+        if isinstance(node, Mapping):
+            children = ((escape_pointer_token(str(k)), v) for k, v in node.items())
+        elif isinstance(node, list):
+            children = ((str(i), v) for i, v in enumerate(node))
+        else:
+            continue
+
+        stack.extend(
+            (f"{pointer}/{token}", child)
+            for token, child in children
+            if isinstance(child, (Mapping, list))
+        )
+
+    return index
+
+
+def iter_refs(node: Any) -> Iterator[str]:
+    """
+    Yields the value of every `$ref` found in `node` and its children
+    """
+    stack = [node]
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, Mapping):
+            ref = node.get("$ref")
+
+            if isinstance(ref, str):
+                yield ref
+
+            stack.extend(v for v in node.values() if isinstance(v, (Mapping, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (Mapping, list)))
+
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    """
+    Splits a `$ref` into the referenced document and the decoded JSON pointer
+    """
+    document, _, fragment = ref.partition("#")
+
+    return document, unquote(fragment)
+
+
+def rebase_refs(node: Any, path: Path) -> Any:
+    """
+    Returns `node`, from the file `path`, with its `$ref`s made absolute so they can be resolved
+    from any other document
+    """
+    if isinstance(node, list):
+        return [rebase_refs(v, path) for v in node]
+    elif not isinstance(node, Mapping):
+        return node
+
+    new_node = {k: rebase_refs(v, path) for k, v in node.items()}
+    ref = new_node.get("$ref")
+
+    if isinstance(ref, str) and "://" not in ref:
+        document_ref, _, fragment = ref.partition("#")
+        document_path = (path.parent / document_ref).resolve() if document_ref else path
+        new_node["$ref"] = f"{document_path.as_posix()}#{fragment}"
+
+    return new_node
+
+
+class _Document:
+    def __init__(self, document: Any, path: Optional[Path] = None):
+        self.document = document
+        self.path = path
+        self.index = build_pointer_index(document)
+
+
+class RefResolver:
+    """
+    Resolves `$ref`s as JSON pointers into the root schema or into the local files it references,
+    the references found in a referenced file are resolved relative to that file.
+
+    The pointer index of every document is built once. Referenced files are loaded lazily and
+    kept in a LRU cache of `cache_size` documents.
+    """
+
+    def __init__(
+        self,
+        schema: Any,
+        definitions: Optional[Mapping] = None,
+        filename: Optional[Union[str, Path]] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.schema = schema
+        self.definitions = definitions if definitions is not None else {}
+        self.path = Path(filename).resolve() if filename is not None else None
+        self.cache_size = cache_size
+
+        self._root: Optional[_Document] = None
+        self._documents: "OrderedDict[Path, _Document]" = OrderedDict()
+        self._resolved: Dict[str, Any] = {}
+
+        # Files loaded to resolve the references of the schema
+        self.dependencies: Set[Path] = set()
+
+    @property
+    def root(self) -> _Document:
+        if self._root is None:
+            self._root = _Document(self.schema, self.path)
+
+            # Normalised definitions shadow the raw nodes of the schema
+            self._root.index.update(
+                (k.lstrip("#"), v) for k, v in self.definitions.items() if k.startswith("#")
+            )
+
+        return self._root
+
+    def load_document(self, path: Path) -> Any:
+        # Avoid circular imports
+        from json_codegen.core import load_schema
+
+        return load_schema(path.read_text())
+
+    def get_document(self, path: Path) -> _Document:
+        if self.path is not None and path == self.path:
+            return self.root
+
+        try:
+            document = self._documents[path]
+        except KeyError:
+            # The references of the file are relative to the file itself
+            document = _Document(rebase_refs(self.load_document(path), path), path)
+            self._documents[path] = document
+            self.dependencies.add(path)
+
+            if len(self._documents) > self.cache_size:
+                self._documents.popitem(last=False)
+        else:
+            self._documents.move_to_end(path)
+
+        return document
+
+    def get_external_key(self, ref: str) -> Optional[str]:
+        """
+        Returns the absolute form of a `$ref` into another local document, the same for every
+        relative form of the reference, or None if `ref` points into the root schema
+        """
+        document_ref, _, fragment = ref.partition("#")
+
+        if not document_ref or "://" in ref:
+            return None
+
+        base = self.path.parent if self.path is not None else Path.cwd()
+        path = (base / document_ref).resolve()
+
+        if self.path is not None and path == self.path:
+            return None
+
+        return f"{path.as_posix()}#{fragment}"
+
+    def resolve(self, ref: str) -> Any:
+        # Fast path for the definitions
+        try:
+            return self.definitions[ref]
+        except KeyError:
+            pass
+
+        try:
+            return self._resolved[ref]
+        except KeyError:
+            pass
+
+        document_ref, pointer = split_ref(ref)
+
+        if document_ref:
+            base = self.path.parent if self.path is not None else Path.cwd()
+            document = self.get_document((base / document_ref).resolve())
+        else:
+            document = self.root
+
+        try:
+            node = document.index[pointer]
+        except KeyError:
+            raise KeyError(ref) from None
+
+        # Nodes without title are named after the last token of the pointer
+        if isinstance(node, Mapping) and "title" not in node:
+            if pointer:
+                title = unescape_pointer_token(pointer.rsplit("/", 1)[-1])
+            elif document.path is not None:
+                title = document.path.name.split(".")[0]
+            else:
+                title = None
+
+            if title is not None:
+                node = dict(node, title=title)
+
+        self._resolved[ref] = node
+
+        return node
+
+    def __getitem__(self, ref: str) -> Any:
+        return self.resolve(ref)
+
+    def __contains__(self, ref: object) -> bool:
+        try:
+            self.resolve(str(ref))
+        except (KeyError, OSError):
+            return False
+
+        return True
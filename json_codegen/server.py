@@ -0,0 +1,244 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+from argparse import ArgumentParser
+from functools import partial
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional
+
+from json_codegen import cli
+from json_codegen.cache import (
+    DEFAULT_MAX_ENTRIES,
+    MemorySchemaCache,
+    ensure_private_directory,
+)
+from json_codegen.client import (
+    check_socket_owner,
+    get_socket_directory,
+    get_socket_path,
+    is_in_process,
+)
+from json_codegen.core import load_schema
+
+
+class CodegenService:
+    """
+    Handles the requests of the server's protocol, every request and response is a JSON object.
+
+    `{"argv": [...], "cwd": "..."}` runs the command line with the given arguments and returns
+    `{"status": int, "stdout": str, "stderr": str}`.
+
+    `{"schema": path}` or `{"schema_text": str}`, with optional `language`, `generator`,
+    `prefix`, `output` and `cwd`, generates one schema and returns `{"status": 0, "code": str}`
+    or `{"status": 0, "output": path}` when `output` is given, `{"status": 1, "error": str}` on
+    failure.
+
+    The parsed schemas are cached between requests until the files change.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_MAX_ENTRIES):
+        self.cache = MemorySchemaCache(cache_size)
+
+    def handle(self, request: Dict) -> Dict:
+        if not isinstance(request, dict):
+            return {"status": 1, "error": "Requests must be JSON objects"}
+
+        try:
+            with self.working_directory(request.get("cwd")):
+                if "argv" in request:
+                    return self.run(request["argv"])
+
+                return self.generate(request)
+        except Exception as e:
+            return {"status": 1, "error": f"{type(e).__name__}: {e}"}
+
+    @contextlib.contextmanager
+    def working_directory(self, cwd: Optional[str]) -> Iterator[None]:
+        if cwd is None:
+            yield
+            return
+
+        previous = os.getcwd()
+        os.chdir(cwd)
+
+        try:
+            yield
+        finally:
+            os.chdir(previous)
+
+    def run(self, argv: List[str]) -> Dict:
+        if argv[:1] == ["serve"]:
+            return {"status": 2, "stdout": "", "stderr": "Can't serve from the server\n"}
+
+        # Watching or streaming never returns and would block the other clients
+        if is_in_process(argv):
+            return {"status": 2, "stdout": "", "stderr": "Can't watch or stream from the server\n"}
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        status = 0
+
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                cli.main(argv, cache=self.cache)
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    status = e.code
+                elif e.code is not None:
+                    stderr.write(f"{e.code}\n")
+                    status = 1
+
+        return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def generate(self, request: Dict) -> Dict:
+        if request.get("generator"):
+            generator = cli.load_external_generator(Path(request["generator"]))
+        else:
+            generator = cli.get_generator(request.get("language") or "python3")
+
+        prefix = request.get("prefix")
+
+        if "schema_text" in request:
+            instance = generator(load_schema(request["schema_text"]), prefix=prefix)
+        elif issubclass(generator, cli.SchemaParser):
+            instance = cli.load_generator(
+                generator, request["schema"], prefix=prefix, cache=self.cache
+            )
+        else:
+            with open(request["schema"]) as f:
+                instance = generator(load_schema(f.read()), prefix=prefix)
+
+        instance = instance.generate()
+        output = request.get("output")
+
+        if output is None:
+            return {"status": 0, "code": instance.as_code()}
+
+        cli.stream_output(output, partial(cli.write_code, instance))
+
+        return {"status": 0, "output": output}
+
+
+def serve_stream(
+    service: CodegenService, rfile: IO[bytes], wfile: IO[bytes], defaults: Optional[Dict] = None
+) -> None:
+    """
+    Handles the requests read from `rfile`, one JSON object per line, and writes each response
+    on a line of `wfile` as soon as it's ready. `defaults` are added to the requests without them.
+    """
+    for line in rfile:
+        if not line.strip():
+            continue
+
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {"status": 1, "error": f"Invalid request: {e}"}
+        else:
+            if defaults and isinstance(request, dict):
+                request = dict(defaults, **request)
+
+            response = service.handle(request)
+
+        wfile.write(json.dumps(response).encode() + b"\n")
+        wfile.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "CodegenServer"
+
+    def handle(self) -> None:
+        serve_stream(self.server.service, self.rfile, self.wfile)
+
+
+class CodegenServer(socketserver.UnixStreamServer):
+    """
+    Serves `CodegenService` on a Unix socket, one JSON request per line.
+
+    Requests are handled one at a time: running the command line changes the working directory
+    of the process.
+    """
+
+    def __init__(self, socket_path: str, service: Optional[CodegenService] = None):
+        self.service = service or CodegenService()
+        self.socket_path = socket_path
+
+        # The default socket is created in a private per-user directory
+        directory = get_socket_directory()
+
+        if os.path.dirname(os.path.abspath(socket_path)) == os.path.abspath(directory):
+            if not ensure_private_directory(directory):
+                raise PermissionError(
+                    f"{directory} must be owned by the current user and not writable by others"
+                )
+
+        remove_stale_socket(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+
+        # Only the current user can connect
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+
+        with contextlib.suppress(OSError):
+            os.unlink(self.socket_path)
+
+
+def remove_stale_socket(socket_path: str) -> None:
+    """
+    Removes the socket file left by a server that didn't shut down cleanly, raises `OSError` if
+    a server is still listening on it or if it belongs to another user
+    """
+    check_socket_owner(socket_path)
+
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+
+    raise OSError(f"A server is already listening on {socket_path}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = ArgumentParser(
+        prog="json_codegen serve", description="Serves the code generation on a Unix socket"
+    )
+    parser.add_argument(
+        "--socket",
+        default=get_socket_path(),
+        help="Path of the socket. Default is the JSON_CODEGEN_SOCKET environment variable",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f"Number of parsed schemas kept in memory. Default is {DEFAULT_MAX_ENTRIES}",
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        server = CodegenServer(args.socket, CodegenService(args.cache_size))
+    except OSError as e:
+        parser.exit(1, f"{e}\n")
+
+    sys.stderr.write(f"Listening on {args.socket}\n")
+
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
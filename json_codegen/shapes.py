@@ -0,0 +1,187 @@
+import hashlib
+import json
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from json_codegen.nodes import with_item
+from json_codegen.resolver import escape_pointer_token
+
+
+class ShapeIndex:
+    """
+    Computes a stable structural hash for every subschema and memoizes values by hash, so
+    identical subtrees are processed once however many times they occur in the schema.
+
+    Hashes are order sensitive: the order of the keys can be significant in the generated code.
+    """
+
+    def __init__(self) -> None:
+        self._shapes: Dict[int, Tuple[Any, str]] = {}
+        self._memo: Dict[Tuple[Hashable, str], Any] = {}
+
+    def shape_of(self, node: Any) -> str:
+        children: Iterable[Tuple[Any, Any]]
+
+        if isinstance(node, Mapping):
+            parts: List[Tuple[Any, ...]] = [("o",)]
+            children = node.items()
+        elif isinstance(node, list):
+            parts = [("a",)]
+            children = enumerate(node)
+        else:
+            return json.dumps(node)
+
+        try:
+            return self._shapes[id(node)][1]
+        except KeyError:
+            pass
+
+        parts.extend((k, self.shape_of(v)) for k, v in children)
+        shape = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+        # Keep a reference to the node so its id can't be reused
+        self._shapes[id(node)] = (node, shape)
+
+        return shape
+
+    def memoize(self, namespace: Hashable, node: Any, factory: Callable[[], Any]) -> Any:
+        key = (namespace, self.shape_of(node))
+
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+
+        value = self._memo[key] = factory()
+
+        return value
+
+
+def _is_candidate(node: Any) -> bool:
+    return (
+        isinstance(node, Mapping)
+        and node.get("type") == "object"
+        and isinstance(node.get("properties"), Mapping)
+        and len(node["properties"]) > 0
+    )
+
+
+# Subschemas visited besides `properties` with the suffix of their name and if they are
+# replaced by a bare reference
+_CHILDREN = (("items", "Item", False), ("additionalProperties", "Value", True))
+
+
+class _Hoister:
+    def __init__(self, shapes: ShapeIndex, names: Set[str]):
+        self.shapes = shapes
+        self.names = names
+        self.counts: Counter = Counter()
+        self.hoisted: Optional[Set[str]] = None
+        self.definitions: Dict[str, Tuple[str, Any]] = OrderedDict()
+
+    def visit(self, node: Any, hint: str, ref_only: bool = False) -> Any:
+        """
+        Visits a subschema: while counting records the candidates, while rewriting returns the
+        subschema with the shared shapes replaced by references
+        """
+        new_node = self.visit_children(node, hint)
+
+        if not _is_candidate(node):
+            return new_node
+
+        shape = self.shapes.shape_of(node)
+
+        if self.hoisted is None:
+            self.counts[shape] += 1
+            return new_node
+        elif shape not in self.hoisted:
+            return new_node
+
+        ref = self.add_definition(shape, new_node, node.get("title") or hint)
+
+        if ref_only:
+            return {"$ref": ref}
+
+        return {"type": "object", "oneOf": [{"$ref": ref}]}
+
+    def visit_children(self, node: Any, hint: str) -> Any:
+        if not isinstance(node, Mapping):
+            return node
+
+        new_node = node
+
+        properties = node.get("properties")
+
+        if isinstance(properties, Mapping):
+            new_properties = OrderedDict(
+                (k, self.visit(v, k[:1].upper() + k[1:])) for k, v in properties.items()
+            )
+
+            if any(new_properties[k] is not v for k, v in properties.items()):
+                new_node = with_item(new_node, "properties", new_properties)
+
+        for key, suffix, ref_only in _CHILDREN:
+            child = node.get(key)
+
+            if isinstance(child, Mapping):
+                new_child = self.visit(child, hint + suffix, ref_only=ref_only)
+
+                if new_child is not child:
+                    new_node = with_item(new_node, key, new_child)
+
+        return new_node
+
+    def add_definition(self, shape: str, node: Any, name: str) -> str:
+        try:
+            return self.definitions[shape][0]
+        except KeyError:
+            pass
+
+        unique_name = name
+        i = 1
+
+        while unique_name in self.names:
+            i += 1
+            unique_name = f"{name}{i}"
+
+        self.names.add(unique_name)
+
+        ref = f"#/definitions/{escape_pointer_token(unique_name)}"
+        self.definitions[shape] = (ref, with_item(node, "title", unique_name))
+
+        return ref
+
+
+def hoist_shared_shapes(
+    schema: Any, definitions: "OrderedDict[str, Any]", shapes: ShapeIndex
+) -> Tuple[Any, "OrderedDict[str, Any]"]:
+    """
+    Moves the inline object subschemas occurring more than once into new definitions.
+
+    Returns the rewritten root schema and definitions, the new definitions are appended after the
+    existing ones.
+    """
+    names = {d.get("title") for d in definitions.values()}
+    names.update(k.rsplit("/", 1)[-1] for k in definitions.keys())
+    hoister = _Hoister(shapes, names)
+
+    def visit_all() -> Tuple[Any, "OrderedDict[str, Any]"]:
+        new_definitions = OrderedDict(
+            (k, hoister.visit_children(d, d.get("title") or "")) for k, d in definitions.items()
+        )
+        new_schema = hoister.visit_children(schema, schema.get("title") or "")
+
+        return new_schema, new_definitions
+
+    # Count the shapes first, then rewrite
+    visit_all()
+    hoister.hoisted = {shape for shape, count in hoister.counts.items() if count > 1}
+
+    if not hoister.hoisted:
+        return schema, definitions
+
+    new_schema, new_definitions = visit_all()
+    new_definitions.update(hoister.definitions.values())
+
+    return new_schema, new_definitions
@@ -0,0 +1,142 @@
+import json
+from collections import OrderedDict
+from typing import IO, Any, Callable, Iterator, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+ROOT = "root"
+DEFINITIONS = "definitions"
+DEFS = "$defs"
+
+_WHITESPACE = " \t\n\r"
+
+
+class _StreamReader:
+    """
+    Minimal incremental reader on top of `json.JSONDecoder.raw_decode()`.
+
+    Only the text needed to decode the current value is kept in memory, everything already
+    consumed is dropped from the buffer on the next read.
+    """
+
+    def __init__(
+        self,
+        fp: IO[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        object_pairs_hook: Optional[Callable] = None,
+    ):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook or OrderedDict)
+
+    def _fill(self, size: int = 0) -> bool:
+        if self.eof:
+            return False
+
+        chunk = self.fp.read(size or self.chunk_size)
+
+        if not chunk:
+            self.eof = True
+            return False
+
+        pos, self.pos = self.pos, 0
+        self.buffer = self.buffer[pos:] + chunk
+
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may be truncated by the end of the buffer, grow the read size
+                # geometrically to keep re-decoding of large values linear
+                if self._fill(max(self.chunk_size, len(self.buffer))):
+                    continue
+                raise
+
+            # Scalars like numbers can be split across chunks and still decode
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.pos = end
+
+            return value
+
+    def members(self) -> Iterator[str]:
+        """
+        Iterates over the keys of the object at the current position. The caller must consume
+        the member's value before asking for the next key.
+        """
+        self.expect("{")
+
+        if self.peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            if self.peek() != '"':
+                raise self._error("Expecting property name enclosed in double quotes")
+
+            key = self.value()
+            self.expect(":")
+
+            yield key
+
+            separator = self.peek()
+            self.pos += 1
+
+            if separator == "}":
+                return
+            elif separator != ",":
+                self.pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+
+def iter_schema(
+    fp: IO[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    object_pairs_hook: Optional[Callable] = None,
+) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Walks a JSON schema incrementally and yields `(kind, key, value)` events.
+
+    Every entry under `definitions` or `$defs` is yielded as a `DEFINITIONS` or `DEFS` event as
+    soon as it has been decoded, any other top level member is yielded as a `ROOT` event.
+    """
+    reader = _StreamReader(fp, chunk_size=chunk_size, object_pairs_hook=object_pairs_hook)
+
+    for key in reader.members():
+        if key in (DEFINITIONS, DEFS) and reader.peek() == "{":
+            for definition_key in reader.members():
+                yield key, definition_key, reader.value()
+        else:
+            yield ROOT, key, reader.value()
+
+    if reader.peek() != "":
+        raise reader._error("Extra data")
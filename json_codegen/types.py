@@ -1,6 +1,6 @@
-from typing import Dict, List, NewType
+from typing import AbstractSet, Dict, NewType, Sequence, Tuple
 
 DefinitionType = NewType("DefinitionType", Dict)
 PropertyType = NewType("PropertyType", Dict)
-PropertiesType = NewType("PropertiesType", List[PropertyType])
-RequiredType = NewType("RequiredType", List[str])
+PropertiesType = NewType("PropertiesType", Sequence[Tuple[str, PropertyType]])
+RequiredType = NewType("RequiredType", AbstractSet[str])
@@ -0,0 +1,233 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# Interval between two scans of the polling watcher
+POLL_INTERVAL = 0.1
+
+# Changes closer than this are regenerated together, editors often write a file more than once
+DEBOUNCE = 0.02
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_DELETE
+
+_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Detects the changes of a set of files comparing their modification time and size
+    """
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        self.interval = interval
+        self._stats: Dict[Path, Optional[Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def watch(self, paths: Iterable[Path]) -> None:
+        paths = set(paths)
+        self._stats = {p: self._stats[p] if p in self._stats else self._stat(p) for p in paths}
+
+    def _scan(self) -> Set[Path]:
+        changed = set()
+
+        for path, stat in self._stats.items():
+            new_stat = self._stat(path)
+
+            if new_stat != stat:
+                self._stats[path] = new_stat
+                changed.add(path)
+
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """
+        Returns the files changed since the last call, waiting up to `timeout` seconds for a
+        change, None waits forever
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            changed = self._scan()
+
+            if changed:
+                return changed
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    return changed
+
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self) -> None:
+        self._stats = {}
+
+
+class InotifyWatcher:
+    """
+    Detects the changes of a set of files with inotify, the directories of the files are watched
+    so files replaced by a rename are detected too
+    """
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is not available")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1() failed")
+
+        self._directories: Dict[int, Path] = {}
+        self._watched: Dict[Path, int] = {}
+        self._paths: Set[Path] = set()
+
+    def watch(self, paths: Iterable[Path]) -> None:
+        self._paths = {Path(p).resolve() for p in paths}
+
+        for directory in {p.parent for p in self._paths} - set(self._watched):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+
+            if wd < 0:
+                continue
+
+            self._watched[directory] = wd
+            self._directories[wd] = directory
+
+    def _read(self) -> Set[Path]:
+        changed: Set[Path] = set()
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+
+        while offset < len(data):
+            wd, _, _, length = _EVENT.unpack_from(data, offset)
+            start = offset + _EVENT.size
+            offset = start + length
+            name = data[start:offset].rstrip(b"\0")
+            directory = self._directories.get(wd)
+
+            if directory is not None and name:
+                path = directory / os.fsdecode(name)
+
+                if path in self._paths:
+                    changed.add(path)
+
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """
+        Returns the files changed since the last call, waiting up to `timeout` seconds for a
+        change, None waits forever
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+
+            if not ready:
+                return set()
+
+            changed = self._read()
+
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def get_watcher(polling: bool = False) -> Union[InotifyWatcher, PollingWatcher]:
+    """
+    Returns an inotify watcher when available, a polling watcher otherwise
+    """
+    if not polling:
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+
+    return PollingWatcher()
+
+
+def watch_schemas(
+    tasks: List[Tuple[str, str]],
+    generate: Callable[[str, str], Any],
+    report: Callable[[Any], Any],
+    watcher: Optional[Union[InotifyWatcher, PollingWatcher]] = None,
+    max_rounds: Optional[int] = None,
+) -> None:
+    """
+    Generates the `(schema, output)` pairs of `tasks` then regenerates the outputs affected by
+    every change of the schemas or of the files they reference.
+
+    `generate(schema, output)` returns a `SchemaResult` passed to `report(result)`. Runs until
+    interrupted or for `max_rounds` changes.
+    """
+    watcher = watcher or get_watcher()
+    dependencies: Dict[Tuple[str, str], Set[Path]] = {}
+
+    def run(round_tasks: List[Tuple[str, str]]) -> None:
+        for task in round_tasks:
+            result = generate(*task)
+            report(result)
+
+            # Keep watching the dependencies of a failed schema until it's fixed
+            if result.error is None or task not in dependencies:
+                dependencies[task] = {Path(task[0]).resolve()} | {
+                    Path(p).resolve() for p in result.dependencies
+                }
+
+        watcher.watch(set().union(*dependencies.values()))
+
+    run(tasks)
+    rounds = 0
+
+    try:
+        while max_rounds is None or rounds < max_rounds:
+            changed = watcher.wait()
+
+            if not changed:
+                continue
+
+            # Group the writes of the same save
+            changed |= watcher.wait(DEBOUNCE)
+
+            start = time.perf_counter()
+            affected = [t for t in tasks if dependencies[t] & changed]
+            run(affected)
+
+            elapsed = (time.perf_counter() - start) * 1000
+            sys.stderr.write(f"Regenerated {len(affected)} outputs in {elapsed:.0f}ms\n")
+            rounds += 1
+    finally:
+        watcher.close()
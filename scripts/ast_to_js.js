@@ -1,6 +1,7 @@
 // @flow
 
 import fs from "fs";
+import readline from "readline";
 
 import generate from "@babel/generator";
 
@@ -15,7 +16,36 @@ const generateCode = (s: string): string => {
   return code;
 };
 
-if (process.stdin.isTTY) {
+// Answers the requests read from stdin, one JSON object `{ id, ast }` per line, with one JSON
+// object `{ id, code }` or `{ id, error }` per line in the same order
+const serveRequests = () => {
+  const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+  lines.on("line", (line: string) => {
+    if (!line.trim()) {
+      return;
+    }
+
+    let id = null;
+    let response;
+
+    try {
+      const request = JSON.parse(line);
+
+      id = request.id === undefined ? null : request.id;
+      response = { id, code: generate(request.ast, generateOptions).code };
+    } catch (err) {
+      response = { id, error: String(err && err.message ? err.message : err) };
+    }
+
+    process.stdout.write(JSON.stringify(response) + "\n");
+  });
+};
+
+if (process.argv.includes("--ndjson")) {
+  // Executed as a persistent worker
+  serveRequests();
+} else if (process.stdin.isTTY) {
   // Executed as standalone
   if (process.argv.length < 4) {
     // eslint-disable-next-line no-console
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from json_codegen.astlib.javascript import (
+    ArrowFunctionExpression,
+    BinaryExpression,
+    CallExpression,
+    ConditionalExpression,
+    ExpressionStatement,
+    File,
+    GenericTypeAnnotation,
+    Identifier,
+    ImportDeclaration,
+    ImportSpecifier,
+    LogicalExpression,
+    MemberExpression,
+    NewExpression,
+    NullableTypeAnnotation,
+    NumericLiteral,
+    ObjectExpression,
+    ObjectProperty,
+    Program,
+    StringLiteral,
+    StringTypeAnnotation,
+    UnaryExpression,
+    UnionTypeAnnotation,
+)
+from json_codegen.astlib.javascript_printer import to_source
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+
+fixture_params = sorted(
+    pytest.param(f, id=f"{f.parent.name}/{f.name}")
+    for language in ("flow", "javascript_flow")
+    for f in (FIXTURES_DIR / language).glob("*.ast.json")
+)
+
+a, b, c = Identifier("a"), Identifier("b"), Identifier("c")
+
+
+@pytest.mark.parametrize("fixture_filename", fixture_params)
+def test_to_source_fixtures(fixture_filename):
+    template_filename = fixture_filename.with_name(
+        fixture_filename.name.replace(".ast.json", ".template.js")
+    )
+
+    assert to_source(json.loads(fixture_filename.read_text())) == template_filename.read_text()
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        [BinaryExpression(BinaryExpression(a, b, "+"), c, "*"), "(a + b) * c;"],
+        [BinaryExpression(a, BinaryExpression(b, c, "-"), "-"), "a - (b - c);"],
+        [BinaryExpression(BinaryExpression(a, b, "-"), c, "-"), "a - b - c;"],
+        [BinaryExpression(a, BinaryExpression(b, c, "**"), "**"), "a ** b ** c;"],
+        [LogicalExpression(LogicalExpression(a, b, "||"), c), "(a || b) && c;"],
+        [ConditionalExpression(ConditionalExpression(a, b, c), b, c), "(a ? b : c) ? b : c;"],
+        [ConditionalExpression(a, b, ConditionalExpression(a, b, c)), "a ? b : a ? b : c;"],
+        [MemberExpression(ConditionalExpression(a, b, c), Identifier("d")), "(a ? b : c).d;"],
+        [MemberExpression(NumericLiteral(1), Identifier("d")), "(1).d;"],
+        [MemberExpression(CallExpression(a, []), b, computed=True), "a()[b];"],
+        [NewExpression(CallExpression(a, []), [b]), "new (a())(b);"],
+        [UnaryExpression("typeof", argument=BinaryExpression(a, b)), "typeof (a === b);"],
+        [UnaryExpression("-", argument=UnaryExpression("-", argument=a)), "- -a;"],
+        [UnaryExpression("!", argument=a), "!a;"],
+        [
+            ArrowFunctionExpression([a], ObjectExpression([ObjectProperty(b, c)])),
+            "(a) => ({ b: c });",
+        ],
+        [ObjectExpression(), "({});"],
+        [StringLiteral('quote " and é'), '"quote \\" and é";'],
+    ],
+)
+def test_to_source_expressions(expression, expected):
+    program = Program(body=[ExpressionStatement(expression)])
+
+    assert to_source(File(program)) == expected + "\n"
+
+
+def test_to_source_imports():
+    declarations = [
+        ImportDeclaration([ImportSpecifier(a, a), ImportSpecifier(b, c)], StringLiteral("./x")),
+        ImportDeclaration([ImportSpecifier(a, a)], StringLiteral("./y"), import_kind="type"),
+    ]
+
+    assert to_source(File(Program(body=declarations))) == (
+        'import { a, b as c } from "./x";\n\nimport type { a } from "./y";\n'
+    )
+
+
+def test_to_source_types():
+    union = UnionTypeAnnotation([StringTypeAnnotation(), GenericTypeAnnotation(a)])
+    identifier = Identifier("x", type_annotation=NullableTypeAnnotation(union))
+
+    assert to_source(File(Program(body=[ExpressionStatement(identifier)]))) == (
+        "x: ?(string | a);\n"
+    )
+
+
+def test_to_source_unknown_node():
+    with pytest.raises(NotImplementedError):
+        to_source({"type": "WithStatement"})
@@ -1,11 +1,19 @@
+import io
+import json
+import pickle
+
 import pytest
 
+from json_codegen.astlib import javascript
 from json_codegen.astlib.javascript import (
     AnyTypeAnnotation,
     CommentLine,
+    File,
     Identifier,
+    Node,
     NumericLiteral,
     ObjectTypeProperty,
+    Program,
     StringLiteral,
     TypeCastExpression,
     UnaryExpression,
@@ -157,3 +165,51 @@ def test_StringLiteral(value, expected):
     result = StringLiteral(value)
 
     assert result == expected
+
+
+def test_Node_mapping():
+    node = Identifier("test")
+
+    assert not hasattr(node, "__dict__")
+    assert list(node) == ["type", "name"]
+    assert len(node) == 2
+    assert node.get("typeAnnotation") is None
+
+    node["leadingComments"] = [CommentLine("comment")]
+    node["typeAnnotation"] = AnyTypeAnnotation()
+
+    assert list(node) == ["type", "name", "typeAnnotation", "leadingComments"]
+    assert node.as_dict() == dict(node)
+
+    del node["typeAnnotation"], node["leadingComments"]
+
+    assert node == {"type": "Identifier", "name": "test"}
+
+    with pytest.raises(KeyError):
+        del node["typeAnnotation"]
+
+    with pytest.raises(KeyError):
+        node["type"] = "StringLiteral"
+
+
+def test_Node_serialization():
+    body = [Identifier("test", type_annotation=AnyTypeAnnotation())]
+    body[0]["leadingComments"] = [CommentLine("@flow")]
+    file_ = File(program=Program(body=body))
+
+    assert json.loads(json.dumps(file_, default=Node.as_dict)) == file_
+    assert pickle.loads(pickle.dumps(file_)) == file_
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_dump(monkeypatch, compact):
+    file_ = File(program=Program(body=[Identifier("test")]))
+    fp = io.StringIO()
+
+    monkeypatch.setattr(javascript, "DUMP_CHUNK_SIZE", 16)
+    javascript.dump(file_, fp, compact=compact)
+
+    if compact:
+        assert fp.getvalue() == json.dumps(file_, separators=(",", ":"), default=dict)
+    else:
+        assert fp.getvalue() == json.dumps(file_, indent=2, default=dict)
@@ -0,0 +1,83 @@
+import os
+import pickle  # nosec B403
+
+from json_codegen import load_schema
+from json_codegen.cache import SchemaCache
+from json_codegen.core import SchemaParser
+
+
+def test_key(tmp_path):
+    schema = tmp_path / "schema.json"
+    schema.write_text('{"title": "Test"}')
+
+    cache = SchemaCache(tmp_path / "cache")
+    key = cache.key(schema)
+
+    assert key == cache.key(schema, prefix="")
+    assert key != cache.key(schema, prefix="Prefix")
+
+    schema.write_text('{"title": "Other"}')
+
+    assert key != cache.key(schema)
+
+
+def test_get_put(tmp_path):
+    schema = load_schema('{"title": "Test", "definitions": {"A": {"type": "object"}}}')
+    parser = SchemaParser(schema)
+
+    cache = SchemaCache(tmp_path)
+
+    assert cache.get("key") is None
+
+    cache.put("key", parser.get_state())
+    result = SchemaParser.from_state(cache.get("key"))
+
+    assert result.schema == {"title": "Test"}
+    assert result.definitions == parser.definitions
+
+
+def test_get_corrupted(tmp_path):
+    (tmp_path / "key.pickle").write_bytes(b"not a pickle")
+
+    assert SchemaCache(tmp_path).get("key") is None
+    assert not (tmp_path / "key.pickle").exists()
+
+
+def test_get_stale(tmp_path):
+    # A class which no longer exists raises AttributeError when unpickled
+    (tmp_path / "key.pickle").write_bytes(b"cjson_codegen.core\nRemovedClass\n.")
+    (tmp_path / "truncated.pickle").write_bytes(pickle.dumps(["x" * 100])[:-20])
+
+    cache = SchemaCache(tmp_path)
+
+    assert cache.get("key") is None
+    assert cache.get("truncated") is None
+    assert list(tmp_path.glob("*.pickle")) == []
+
+
+def test_untrusted_directory(tmp_path):
+    directory = tmp_path / "cache"
+    cache = SchemaCache(directory)
+    cache.put("key", "state")
+
+    assert directory.stat().st_mode & 0o777 == 0o700
+    assert cache.get("key") == "state"
+
+    directory.chmod(0o777)
+
+    assert SchemaCache(directory).get("key") is None
+
+
+def test_evict(tmp_path):
+    size = len(pickle.dumps("x" * 100, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = SchemaCache(tmp_path, max_size=size * 2)
+
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, "x" * 100)
+        os.utime(tmp_path / f"{key}.pickle", (i, i))
+
+    # Reading `a` makes it the most recently used entry
+    cache.get("a")
+    cache.put("c", "x" * 100)
+
+    assert sorted(p.stem for p in tmp_path.glob("*.pickle")) == ["a", "c"]
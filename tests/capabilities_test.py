@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from json_codegen import UnsupportedSchemaException, load_schema
+from json_codegen.capabilities import Capabilities, compile_capabilities
+from json_codegen.generators import (
+    FlowGenerator,
+    JavaScriptFlowGenerator,
+    Python3Generator,
+    Python3MarshmallowGenerator,
+)
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
+
+test_params = sorted(pytest.param(f, id=f.name) for f in SCHEMAS_DIR.glob("*.schema.json"))
+
+generators = [
+    FlowGenerator,
+    JavaScriptFlowGenerator,
+    Python3Generator,
+    Python3MarshmallowGenerator,
+]
+
+UNSUPPORTED_SCHEMA = {
+    "title": "Root",
+    "type": "object",
+    "properties": {
+        "tuple": {"type": "array", "items": [{"type": "string"}]},
+        "nullable": {"type": ["string", "null"]},
+        "number": {"type": "number", "default": 1.5},
+        "map": {"type": "object", "additionalProperties": {"type": "string"}},
+    },
+}
+
+
+@pytest.mark.parametrize("generator", generators)
+@pytest.mark.parametrize("schema_filename", test_params)
+def test_fixtures_supported(monkeypatch, generator, schema_filename):
+    instance = generator(load_schema(schema_filename.read_text()))
+    problems = instance.check_schema()
+
+    if problems:
+        # The check only reports what generation can't handle
+        monkeypatch.setattr(instance, "ensure_supported", lambda: None)
+
+        with pytest.raises(NotImplementedError):
+            instance.generate()
+    else:
+        instance.generate()
+
+
+def test_report_all_problems():
+    with pytest.raises(UnsupportedSchemaException) as exc_info:
+        Python3Generator(UNSUPPORTED_SCHEMA).generate()
+
+    assert [str(p) for p in exc_info.value.problems] == [
+        "#/properties/map/additionalProperties: additionalProperties without $ref are not "
+        "supported",
+        "#/properties/nullable/type: type ['string', 'null'] is not supported",
+        "#/properties/number/default: default for type 'number' is not supported",
+        "#/properties/tuple/items: tuples are not supported",
+    ]
+
+
+def test_report_marshmallow_problems():
+    problems = Python3MarshmallowGenerator(UNSUPPORTED_SCHEMA).check_schema()
+
+    assert [p.pointer for p in problems] == [
+        "#/properties/map/additionalProperties",
+        "#/properties/nullable/type",
+        "#/properties/number/default",
+    ]
+
+
+def test_check_definitions():
+    schema = {
+        "definitions": {"a/b": {"type": "object", "properties": {"x": {"type": "null"}}}},
+    }
+
+    problems = FlowGenerator(schema).check_schema()
+
+    assert [p.pointer for p in problems] == ["#/definitions/a~1b/properties/x/type"]
+
+
+def test_compile_capabilities_cached():
+    capabilities = Capabilities(tuples=False)
+
+    assert compile_capabilities(capabilities) is compile_capabilities(Capabilities(tuples=False))
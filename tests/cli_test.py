@@ -1,7 +1,22 @@
+import json
+import os
+import pstats
+import re
+import shutil
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+
 import pytest
 
-from json_codegen import cli
+from json_codegen import cli, load_schema
+from json_codegen.cache import SchemaCache
 from json_codegen.core import BaseGenerator
+from json_codegen.generators.flow import FlowGenerator
+from json_codegen.nodes import SchemaNode
+from json_codegen.profiling import PHASES
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
 
 
 def test_langages():
@@ -16,3 +31,580 @@ def test_get_generator(language):
     generator = cli.get_generator(language)
 
     assert issubclass(generator, BaseGenerator)
+
+
+@pytest.mark.parametrize("streaming_threshold", [0, cli.STREAMING_THRESHOLD])
+def test_main_streaming(monkeypatch, tmp_path, streaming_threshold):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    output = tmp_path / "output.json"
+
+    monkeypatch.setattr(cli, "STREAMING_THRESHOLD", streaming_threshold)
+    monkeypatch.setattr(
+        sys, "argv", ["json_codegen", "-l", "flow", "-o", str(output), str(schema_filename)]
+    )
+
+    cli.main()
+
+    expected = FlowGenerator(load_schema(schema_filename.read_text())).generate().as_code()
+
+    assert output.read_text() == expected
+
+
+def test_main_cache(monkeypatch, tmp_path):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    output = tmp_path / "output.json"
+    cache_dir = tmp_path / "cache"
+    argv = ["json_codegen", "-l", "flow", "-o", str(output), str(schema_filename)]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--cache-dir", str(cache_dir)])
+    cli.main()
+
+    expected = output.read_text()
+
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # Warm run doesn't decode the schema
+    def load_schema_mock(*args, **kwds):
+        raise AssertionError("Schema should be loaded from the cache")
+
+    monkeypatch.setattr(cli, "load_schema", load_schema_mock)
+    output.unlink()
+    cli.main()
+
+    assert output.read_text() == expected
+
+    # Cache is bypassed
+    monkeypatch.setattr(sys, "argv", argv + ["--cache-dir", str(cache_dir), "--no-cache"])
+
+    with pytest.raises(AssertionError):
+        cli.main()
+
+
+def test_load_generator_cache_frozen(tmp_path):
+    schema_filename = str(SCHEMAS_DIR / "array_items_ref.schema.json")
+    cache = SchemaCache(tmp_path)
+
+    frozen = cli.load_generator(FlowGenerator, schema_filename, cache=cache, frozen=True)
+    instance = cli.load_generator(FlowGenerator, schema_filename, cache=cache)
+
+    assert all(isinstance(d, SchemaNode) for d in frozen.definitions.values())
+    assert not any(isinstance(d, SchemaNode) for d in instance.definitions.values())
+
+
+@pytest.mark.parametrize("backend", ["auto", "json"])
+def test_main_json_backend(monkeypatch, tmp_path, backend):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    output = tmp_path / "output.json"
+    argv = ["json_codegen", "-l", "flow", "-o", str(output), str(schema_filename)]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--json-backend", backend])
+    cli.main()
+
+    expected = FlowGenerator(load_schema(schema_filename.read_text())).generate().as_code()
+
+    assert output.read_text() == expected
+
+
+def test_main_unsupported_schema(monkeypatch, tmp_path, capsys):
+    schema_filename = tmp_path / "unsupported.schema.json"
+    schema_filename.write_text(
+        '{"title": "Root", "type": "object", "properties": {'
+        '"a": {"type": "null"}, "b": {"type": "array", "items": [{"type": "string"}]}}}'
+    )
+    output = tmp_path / "output.py"
+    argv = ["json_codegen", "-l", "python3", "-o", str(output), str(schema_filename)]
+
+    monkeypatch.setattr(sys, "argv", argv)
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    err = capsys.readouterr().err
+
+    assert f"{schema_filename}: #/properties/a/type" in err
+    assert f"{schema_filename}: #/properties/b/items" in err
+    assert not output.exists()
+
+
+def test_main_only_not_found(monkeypatch, capsys):
+    schema_filename = SCHEMAS_DIR / "array_items_ref.schema.json"
+
+    monkeypatch.setattr(
+        sys, "argv", ["json_codegen", "-l", "flow", "--only", "Missing", str(schema_filename)]
+    )
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert f"{schema_filename}: definition Missing not found" in capsys.readouterr().err
+
+
+def test_main_shared_module(monkeypatch, tmp_path):
+    schemas = [SCHEMAS_DIR / "with_nested_object.schema.json", SCHEMAS_DIR / "simple.schema.json"]
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["json_codegen", "-l", "flow", "-d", str(tmp_path), "--shared-module", "common"]
+        + [str(s) for s in schemas],
+    )
+
+    cli.main()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "common.json",
+        "simple.json",
+        "with_nested_object.json",
+    ]
+
+
+@pytest.mark.parametrize(
+    "options,expected",
+    [
+        (["--prune"], {"Money", "Currency", "Root"}),
+        (["--only", "Money"], {"Money", "Currency"}),
+    ],
+)
+def test_main_shared_module_parser_options(monkeypatch, tmp_path, options, expected):
+    money = {"type": "object", "properties": {"currency": {"$ref": "#/definitions/Currency"}}}
+    currency = {"type": "object", "properties": {"code": {"type": "string"}}}
+    unused = {"type": "object", "properties": {"unused": {"type": "string"}}}
+    filenames = []
+
+    for name in ("a", "b"):
+        schema = {
+            "title": "Root",
+            "type": "object",
+            "properties": {"price": {"$ref": "#/definitions/Money"}},
+            "definitions": {"Money": money, "Currency": currency, "Unused": unused},
+        }
+        filename = tmp_path / f"{name}.schema.json"
+        filename.write_text(json.dumps(schema))
+        filenames.append(str(filename))
+
+    output_dir = tmp_path / "output"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["json_codegen", "-l", "flow", "--emit", "js", "-d", str(output_dir)]
+        + ["--shared-module", "common"]
+        + options
+        + filenames,
+    )
+
+    cli.main()
+
+    common = (output_dir / "common.js").read_text()
+    outputs = [(output_dir / f"{name}.js").read_text() for name in ("a", "b")]
+    generated = set(re.findall(r"^(?:export )?(?:declare )?type (\w+) =", common, re.MULTILINE))
+
+    for output in outputs:
+        generated.update(re.findall(r"^declare type (\w+) =", output, re.MULTILINE))
+
+        assert 'import type { Money, Currency } from "./common";' in output
+
+    assert generated == expected
+
+
+def test_main_shared_module_with_manifest(monkeypatch, tmp_path, capsys):
+    schema = str(SCHEMAS_DIR / "simple.schema.json")
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["json_codegen", "-l", "flow", "-d", str(tmp_path), "--shared-module", "common"]
+        + ["--manifest", str(tmp_path / "manifest.json"), schema],
+    )
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert "--manifest requires" in capsys.readouterr().err
+    assert not list(tmp_path.iterdir())
+
+
+def test_main_many_schemas_without_output_dir(monkeypatch):
+    schema = str(SCHEMAS_DIR / "simple.schema.json")
+
+    monkeypatch.setattr(sys, "argv", ["json_codegen", "-l", "flow", schema, schema])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_main_batch(monkeypatch, tmp_path, capsys, jobs):
+    schemas_dir = tmp_path / "schemas"
+    shutil.copytree(SCHEMAS_DIR, schemas_dir)
+    (schemas_dir / "broken.schema.json").write_text("{")
+    output_dir = tmp_path / "output"
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["json_codegen", "-l", "flow", "-d", str(output_dir), "-j", str(jobs)]
+        + ["--output-template", "flow/{name}.flow{ext}", str(schemas_dir)],
+    )
+
+    # The broken schema doesn't stop the others
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    err = capsys.readouterr().err
+    schemas = sorted(SCHEMAS_DIR.glob("*.json"))
+
+    assert f"{schemas_dir / 'broken.schema.json'}: JSONDecodeError" in err
+    assert "1 of {} schemas failed".format(len(schemas) + 1) in err
+
+    for schema_filename in schemas:
+        name = schema_filename.name.split(".")[0]
+        output = output_dir / "flow" / f"{name}.flow.json"
+        expected = FlowGenerator(load_schema(schema_filename.read_text())).generate().as_code()
+
+        assert output.read_text() == expected
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_main_many_languages(monkeypatch, tmp_path, capsys, jobs):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    languages = {"flow": "types.js", "javascript+flow": "models.js"}
+    argv = ["json_codegen", "-d", str(tmp_path), "-j", str(jobs), str(schema_filename)]
+
+    for language, output in languages.items():
+        argv += ["-l", f"{language}:{output}"]
+
+    # The schema is decoded once for all the languages
+    calls = []
+    monkeypatch.setattr(cli, "load_schema", lambda *a, **k: calls.append(a) or load_schema(*a))
+    monkeypatch.setattr(sys, "argv", argv)
+
+    cli.main()
+
+    err = capsys.readouterr().err
+
+    assert len(calls) == 1
+
+    for language, output in languages.items():
+        generator = cli.get_generator(language)
+        expected = generator(load_schema(schema_filename.read_text())).generate().as_code()
+
+        assert f"{schema_filename} -> {tmp_path / output}" in err
+        assert (tmp_path / output).read_text() == expected
+
+
+def test_main_many_languages_without_output(monkeypatch, capsys):
+    schema = str(SCHEMAS_DIR / "simple.schema.json")
+
+    monkeypatch.setattr(sys, "argv", ["json_codegen", "-l", "flow:a.js", "-l", "flow", schema])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert "needs an output" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        (["-l", "flow:a.json", "-l", "flow:a.json"], "a.json is generated more than once"),
+        (["-l", "flow:a.json", "-l", "python3:a.py", "-o", "b.py"], "can't be used with --output"),
+    ],
+)
+def test_main_many_languages_invalid_outputs(monkeypatch, tmp_path, capsys, options, error):
+    schema = str(SCHEMAS_DIR / "simple.schema.json")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["json_codegen", *options, schema])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert error in capsys.readouterr().err
+    assert not list(tmp_path.iterdir())
+
+
+def test_argument_parser_language():
+    parser = cli.get_argument_parser()
+    args = parser.parse_args(["-l", "flow:a.json", "-l", "python3:a.py", "schema.json"])
+
+    assert args.language == "flow"
+    assert args.targets == [cli.Target("flow", "a.json"), cli.Target("python3", "a.py")]
+
+
+@pytest.mark.parametrize(
+    "output_dir, error",
+    [("out", "out/user.json is generated more than once"), ("a", "a/user.json would overwrite")],
+)
+def test_main_batch_output_conflicts(monkeypatch, tmp_path, capsys, output_dir, error):
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        shutil.copy(SCHEMAS_DIR / "simple.schema.json", tmp_path / directory / "user.json")
+
+    # Flow outputs have the extension of the schemas
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["json_codegen", "-l", "flow", "-d", output_dir, "a", "b"])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert error in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
+    assert (tmp_path / "a" / "user.json").read_text() == (
+        SCHEMAS_DIR / "simple.schema.json"
+    ).read_text()
+
+
+def test_write_output(tmp_path):
+    output = tmp_path / "output.py"
+
+    assert cli.write_output(output, "code")
+    output.chmod(0o640)
+    os.utime(output, ns=(0, 0))
+
+    # Unchanged outputs are not written
+    assert not cli.write_output(output, "code")
+    assert output.stat().st_mtime_ns == 0
+
+    assert cli.write_output(output, "new code", check=True)
+    assert output.read_text() == "code"
+
+    assert cli.write_output(output, "new code")
+    assert output.read_text() == "new code"
+    assert output.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["output.py"]
+
+
+def test_stream_output(tmp_path):
+    output = tmp_path / "output.json"
+
+    def write(fp):
+        fp.write("[")
+        fp.write("1]")
+
+    assert cli.stream_output(output, write)
+    assert output.read_text() == "[1]"
+    os.utime(output, ns=(0, 0))
+
+    # Unchanged outputs are not replaced
+    assert not cli.stream_output(output, write)
+    assert output.stat().st_mtime_ns == 0
+
+    assert cli.stream_output(output, lambda fp: fp.write("[2]"), check=True)
+    assert output.read_text() == "[1]"
+
+    with pytest.raises(ValueError):
+        cli.stream_output(output, lambda fp: int("x"))
+
+    assert output.read_text() == "[1]"
+    assert [p.name for p in tmp_path.iterdir()] == ["output.json"]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_main_compact(tmp_path, batch):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    output = tmp_path / "output.json"
+    argv = ["-l", "flow", "--compact", "-o", str(output), str(schema_filename)]
+
+    cli.main(argv + (["--manifest", str(tmp_path / "manifest.json")] if batch else []))
+
+    expected = FlowGenerator(load_schema(schema_filename.read_text())).generate()
+
+    assert output.read_text() == expected.as_code(compact=True)
+    assert "\n" not in output.read_text()
+    assert json.loads(output.read_text()) == json.loads(expected.as_code())
+
+
+def test_main_compact_emit_js(capsys):
+    schema_filename = str(SCHEMAS_DIR / "simple.schema.json")
+
+    with pytest.raises(SystemExit):
+        cli.main(["-l", "flow", "--compact", "--emit", "js", schema_filename])
+
+    assert "--compact requires --emit ast" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_main_check(monkeypatch, tmp_path, capsys, batch):
+    schema_filename = str(SCHEMAS_DIR / "simple.schema.json")
+    output = tmp_path / "simple.json"
+    argv = ["json_codegen", "-l", "flow", "--check", schema_filename]
+    argv += ["-d", str(tmp_path)] if batch else ["-o", str(output)]
+
+    monkeypatch.setattr(sys, "argv", argv)
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert f"{output} is out of date" in capsys.readouterr().err
+    assert not output.exists()
+
+    schema = load_schema(Path(schema_filename).read_text())
+    output.write_text(FlowGenerator(schema).generate().as_code())
+    os.utime(output, ns=(0, 0))
+
+    cli.main()
+
+    assert output.stat().st_mtime_ns == 0
+
+
+def test_main_stream():
+    schema_filename = SCHEMAS_DIR / "simple.schema.json"
+    process = subprocess.Popen(  # nosec B603
+        [sys.executable, "-m", "json_codegen.cli", "--stream", "-l", "flow"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        cwd=str(Path(__file__).parent.parent),
+    )
+
+    try:
+        # Every result is written before the next request is read
+        for _ in range(2):
+            process.stdin.write(json.dumps({"schema": str(schema_filename)}).encode() + b"\n")
+            process.stdin.flush()
+
+            expected = FlowGenerator(load_schema(schema_filename.read_text())).generate()
+
+            assert json.loads(process.stdout.readline()) == {
+                "status": 0,
+                "code": expected.as_code(),
+            }
+    finally:
+        process.stdin.close()
+        process.wait(timeout=10)
+        process.stdout.close()
+
+    assert process.returncode == 0
+
+
+@pytest.mark.parametrize("option", [["--emit", "js"], ["--check"], ["--compact"]])
+def test_main_stream_with_output_options(monkeypatch, capsys, option):
+    monkeypatch.setattr(sys, "argv", ["json_codegen", "--stream"] + option)
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert "can't be used with --stream" in capsys.readouterr().err
+
+
+def test_main_stream_with_schema(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["json_codegen", "--stream", "schema.json"])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert "--stream reads the schemas from stdin" in capsys.readouterr().err
+
+
+def test_expand_schemas(tmp_path):
+    for name in ("b.json", "a.json", "c.txt", "sub/d.json"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("{}")
+
+    assert cli.expand_schemas([str(tmp_path)]) == [
+        str(tmp_path / "a.json"),
+        str(tmp_path / "b.json"),
+        str(tmp_path / "sub" / "d.json"),
+    ]
+    assert cli.expand_schemas([str(tmp_path / "*.json"), str(tmp_path / "[ab].json")]) == [
+        str(tmp_path / "a.json"),
+        str(tmp_path / "b.json"),
+    ]
+
+
+def test_main_external_generator(monkeypatch, tmp_path, capsys):
+    generator = tmp_path / "my_generator.py"
+    generator.write_text(
+        "from json_codegen.generators.flow import FlowGenerator\n\n\n"
+        "class MyGenerator(FlowGenerator):\n"
+        "    pass\n"
+    )
+    schema_filename = SCHEMAS_DIR / "simple.schema.json"
+
+    monkeypatch.setattr(sys, "argv", ["json_codegen", "-g", str(generator), str(schema_filename)])
+    cli.main()
+
+    expected = FlowGenerator(load_schema(schema_filename.read_text())).generate().as_code()
+
+    assert capsys.readouterr().out == expected + "\n"
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_main_profile(monkeypatch, tmp_path, capsys, batch):
+    schema_filename = str(SCHEMAS_DIR / "simple.schema.json")
+    output = tmp_path / "simple.json"
+    profile_json = tmp_path / "profile.json"
+    profile_stats = tmp_path / "profile.stats"
+    argv = ["json_codegen", "-l", "flow", "--profile", schema_filename]
+    argv += ["--profile-json", str(profile_json), "--profile-stats", str(profile_stats)]
+    argv += ["-d", str(tmp_path)] if batch else ["-o", str(output)]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    cli.main()
+
+    err = capsys.readouterr().err
+    start = err.index("schema ")
+    table = err[start:].splitlines()
+
+    assert table[0].split() == ["schema", *PHASES, "total"]
+    assert table[1].startswith(schema_filename)
+    assert table[2].startswith("total")
+
+    summary = json.loads(profile_json.read_text())
+
+    assert [(o["schema"], o["output"]) for o in summary["outputs"]] == [
+        (schema_filename, str(output))
+    ]
+    assert set(summary["outputs"][0]["timings"]) == set(PHASES)
+    assert summary["totals"]["generate"] > 0
+    assert pstats.Stats(str(profile_stats)).total_calls > 0
+
+
+def test_main_profile_stats_jobs(monkeypatch, tmp_path, capsys):
+    schema_filename = str(SCHEMAS_DIR / "simple.schema.json")
+    argv = ["json_codegen", "-l", "flow", "-d", str(tmp_path), "-j", "2", schema_filename]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--profile-stats", str(tmp_path / "stats")])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert "--profile-stats requires --jobs 1" in capsys.readouterr().err
+
+
+def test_main_profile_failure(monkeypatch, tmp_path):
+    profile_json = tmp_path / "profile.json"
+    schema_filename = tmp_path / "invalid.json"
+    schema_filename.write_text("{")
+    argv = ["json_codegen", "-l", "flow", "-d", str(tmp_path / "out"), str(schema_filename)]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--profile-json", str(profile_json)])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    # The phases run before the failure are still reported
+    summary = json.loads(profile_json.read_text())
+
+    assert [o["schema"] for o in summary["outputs"]] == [str(schema_filename)]
+    assert set(summary["outputs"][0]["timings"]) == {"load_schema"}
+
+
+def test_main_emit_js(monkeypatch, tmp_path):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    template_filename = SCHEMAS_DIR.parent / "javascript_flow" / "with_nested_object.template.js"
+    argv = ["json_codegen", "-l", "javascript+flow", "--emit", "js", "-d", str(tmp_path)]
+
+    monkeypatch.setattr(sys, "argv", argv + [str(schema_filename)])
+    cli.main()
+
+    assert (tmp_path / "with_nested_object.js").read_text() == template_filename.read_text()
+
+
+def test_main_emit_js_stdout(capsys):
+    schema_filename = SCHEMAS_DIR / "with_nested_object.schema.json"
+    template_filename = SCHEMAS_DIR.parent / "javascript_flow" / "with_nested_object.template.js"
+
+    cli.main(["-l", "javascript+flow", "--emit", "js", str(schema_filename)])
+
+    # The code written to stdout is always followed by a newline
+    assert capsys.readouterr().out == template_filename.read_text() + "\n"
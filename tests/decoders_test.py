@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from json_codegen import load_schema
+from json_codegen.decoders import AUTO_BACKEND, BACKENDS, get_decoder, is_available
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
+
+test_params = sorted(pytest.param(f, id=f.name) for f in SCHEMAS_DIR.glob("*.schema.json"))
+
+installed_backends = [b for b in BACKENDS if is_available(b)]
+
+
+def test_default_backend():
+    assert get_decoder() is json.loads
+
+
+def test_auto_backend():
+    assert get_decoder(AUTO_BACKEND) is get_decoder(installed_backends[0])
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_decoder("unknown")
+
+
+@pytest.mark.parametrize("backend", installed_backends)
+@pytest.mark.parametrize("schema_filename", test_params)
+def test_load_schema(backend, schema_filename):
+    text = schema_filename.read_text()
+    schema = load_schema(text, backend=backend)
+
+    assert json.dumps(schema) == json.dumps(load_schema(text))
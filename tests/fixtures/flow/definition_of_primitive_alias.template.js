@@ -1,7 +1,7 @@
 // @flow
 
-declare type MyString = string;
-
 declare type MyNumber = number;
 
+declare type MyString = string;
+
 declare type MyUnion = string | boolean;
@@ -34,3 +34,30 @@ def test_generate(schema_filename):
     expected = json.loads(fixture_filename.read_text())
 
     assert result == expected
+
+
+@pytest.mark.parametrize("schema_filename", (test_params))
+def test_as_js(schema_filename):
+    template_filename = FIXTURES_DIR / (schema_filename.name.split(".")[0] + ".template.js")
+
+    schema = load_schema(schema_filename.read_text())
+
+    generator = FlowGenerator(schema).generate()
+
+    assert generator.as_js() == template_filename.read_text()
+
+
+def test_as_code_to(tmp_path):
+    schema = load_schema((SCHEMAS_DIR / "with_nested_object.schema.json").read_text())
+    generator = FlowGenerator(schema).generate()
+    output = tmp_path / "output.json"
+
+    generator.write_to(output)
+
+    assert output.read_text() == json.dumps(generator.as_ast(), indent=2, default=dict)
+
+    generator.write_to(output, compact=True)
+
+    assert output.read_text() == json.dumps(
+        generator.as_ast(), separators=(",", ":"), default=dict
+    )
@@ -31,3 +31,14 @@ def test_generate(schema_filename):
     expected = json.loads(fixture_filename.read_text())
 
     assert result == expected
+
+
+@pytest.mark.parametrize("schema_filename", (test_params))
+def test_as_js(schema_filename):
+    template_filename = FIXTURES_DIR / (schema_filename.name.split(".")[0] + ".template.js")
+
+    schema = load_schema(schema_filename.read_text())
+
+    generator = JavaScriptFlowGenerator(schema).generate()
+
+    assert generator.as_js() == template_filename.read_text()
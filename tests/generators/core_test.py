@@ -2,9 +2,13 @@ from pathlib import Path
 
 import pytest
 
+from json_codegen import core
 from json_codegen.core import (
+    ALIAS,
+    CLASS,
     BaseGenerator,
     GeneratorNotFoundException,
+    SchemaParser,
     load_external_generator,
 )
 
@@ -31,3 +35,111 @@ def test_load_external_generator_file_not_found():
 
     with pytest.raises(FileNotFoundError):
         load_external_generator(filename)
+
+
+def test_load_external_generator_cached(tmp_path):
+    filename = tmp_path / "cached_generator.py"
+    filename.write_text(
+        "from json_codegen.core import BaseGenerator\n\n\n"
+        "class CachedGenerator(BaseGenerator):\n"
+        "    version = 1\n"
+    )
+
+    generator = load_external_generator(str(filename))
+
+    assert load_external_generator(filename) is generator
+
+    # Changed files are loaded again
+    filename.write_text(filename.read_text().replace("version = 1", "version = 2"))
+
+    assert load_external_generator(filename).version == 2
+
+
+def test_load_external_generator_bytecode_cache(monkeypatch, tmp_path):
+    cache_dir = tmp_path / "cache"
+    filename = tmp_path / "bytecode_generator.py"
+    filename.write_text(
+        "from json_codegen.core import BaseGenerator\n\n\n"
+        "class BytecodeGenerator(BaseGenerator):\n"
+        "    pass\n"
+    )
+
+    load_external_generator(filename, cache_dir=cache_dir)
+
+    assert len(list(cache_dir.glob("*.pyc"))) == 1
+
+    # Another process would reuse the bytecode
+    def source_to_code_mock(*args, **kwds):
+        raise AssertionError("Bytecode should be cached")
+
+    monkeypatch.setattr(core, "_external_generators", {})
+    monkeypatch.setattr(core._SourceLoader, "source_to_code", source_to_code_mock)
+
+    assert issubclass(load_external_generator(filename, cache_dir=cache_dir), BaseGenerator)
+
+
+PRUNING_SCHEMA = {
+    "title": "Root",
+    "type": "object",
+    "properties": {"a": {"type": "object", "oneOf": [{"$ref": "#/definitions/A"}]}},
+    "definitions": {
+        "A": {
+            "type": "object",
+            "properties": {"b": {"type": "array", "items": {"$ref": "#/definitions/B"}}},
+        },
+        "B": {"type": "string"},
+        "C": {"type": "object", "properties": {"d": {"$ref": "#/definitions/D"}}},
+        "D": {"type": "integer"},
+        "Unused": {"type": "object", "properties": {"x": {"type": "string"}}},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "kwds, expected",
+    [
+        [{}, {"A", "B", "C", "D", "Unused"}],
+        [{"prune": True}, {"A", "B"}],
+        [{"only": ["C"]}, {"C", "D"}],
+        [{"only": ["A", "D"]}, {"A", "B", "D"}],
+    ],
+)
+def test_reachable_definitions(kwds, expected):
+    parser = SchemaParser(PRUNING_SCHEMA, **kwds)
+
+    klasses = {d["title"] for d in parser.get_klass_definitions()}
+    aliases = {d["title"] for d in parser.get_type_aliases()}
+
+    assert klasses | aliases == expected
+
+
+def test_only_skips_root():
+    parser = SchemaParser(PRUNING_SCHEMA, only=["C"])
+
+    assert "title" not in parser.get_root_definition()
+
+
+def test_only_definition_not_found():
+    parser = SchemaParser(PRUNING_SCHEMA, only=["Missing"])
+
+    with pytest.raises(ValueError):
+        list(parser.get_klass_definitions())
+
+
+def test_index():
+    parser = SchemaParser(PRUNING_SCHEMA, prefix="P")
+    record = parser.index["#/definitions/A"]
+
+    assert record.title == "A"
+    assert record.name == "PA"
+    assert record.kind == CLASS
+    assert [k for k, _ in record.properties] == ["b"]
+    assert record.required == frozenset()
+
+    assert parser.get_record("#/definitions/B").kind == ALIAS
+    assert parser.get_record("#/definitions/A/properties/b").title == "b"
+
+    root_record = parser.get_root_record()
+
+    assert root_record.name == "PRoot"
+    assert SchemaParser(PRUNING_SCHEMA, only=["A"]).get_root_record() is None
@@ -0,0 +1,99 @@
+import json
+import subprocess  # nosec B404
+import sys
+import types
+
+import pytest
+
+from benchmarks.startup import LAZY_MODULES, measure_imports, parse_importtime
+from json_codegen import languages
+from json_codegen.languages import BUILTIN_LANGUAGES, LanguageRegistry
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   json\n"
+        "import time:        50 |        150 | json_codegen\n"
+    )
+
+    assert parse_importtime(output) == [("json", 100, 100), ("json_codegen", 50, 150)]
+
+
+def test_cli_imports_are_lazy():
+    modules = measure_imports("json_codegen.cli")
+
+    assert "json_codegen.cli" in modules
+    assert [m for m in LAZY_MODULES if m in modules] == []
+
+
+@pytest.mark.parametrize(
+    "language, module",
+    [("flow", "json_codegen.generators.flow"), ("python3", "json_codegen.generators.python3")],
+)
+def test_only_selected_generator_imported(language, module):
+    code = (
+        "import json, sys\n"
+        "from json_codegen.cli import get_generator\n"
+        f"get_generator({language!r})\n"
+        "prefix = 'json_codegen.generators.'\n"
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith(prefix))))\n"
+    )
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert json.loads(result.stdout) == [module]
+
+
+def test_language_registry():
+    registry = LanguageRegistry(BUILTIN_LANGUAGES)
+
+    assert "flow" in registry
+    assert "unknown" not in registry
+    assert set(BUILTIN_LANGUAGES) <= set(registry)
+
+    registry.register("custom", "json_codegen.generators.flow:FlowGenerator")
+
+    assert registry["custom"] is registry["flow"]
+
+    with pytest.raises(KeyError):
+        registry["unknown"]
+
+
+def test_language_registry_entry_points(monkeypatch):
+    class EntryPoint:
+        name = "external"
+
+        def load(self):
+            return LanguageRegistry
+
+    monkeypatch.setattr(languages, "_iter_entry_points", lambda: [EntryPoint()])
+    registry = LanguageRegistry(BUILTIN_LANGUAGES)
+
+    assert "external" in registry
+    assert registry["external"] is LanguageRegistry
+    assert len(registry) == len(BUILTIN_LANGUAGES) + 1
+
+
+def test_language_registry_pkg_resources(monkeypatch):
+    class EntryPoint:
+        name = "external"
+
+        def load(self):
+            return LanguageRegistry
+
+    def iter_entry_points(group):
+        return [EntryPoint()] if group == languages.ENTRY_POINT_GROUP else []
+
+    pkg_resources = types.ModuleType("pkg_resources")
+    setattr(pkg_resources, "iter_entry_points", iter_entry_points)
+
+    # Python 3.7 without the importlib_metadata backport
+    monkeypatch.setitem(sys.modules, "importlib.metadata", None)
+    monkeypatch.setitem(sys.modules, "importlib_metadata", None)
+    monkeypatch.setitem(sys.modules, "pkg_resources", pkg_resources)
+
+    registry = LanguageRegistry(BUILTIN_LANGUAGES)
+
+    assert registry["external"] is LanguageRegistry
@@ -0,0 +1,124 @@
+import json
+import shutil
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+
+import pytest
+
+from json_codegen import cli
+from json_codegen.js_renderer import AST_TO_JS, JsRenderer, JsRenderError
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SCHEMAS_DIR = FIXTURES_DIR / "schemas"
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="Node is not installed")
+
+# Answers like ast_to_js with the AST itself as code, exits on the "crash" AST
+FAKE_WORKER = """
+import json, sys, time
+
+for line in sys.stdin:
+    request = json.loads(line)
+
+    if request["ast"] == "crash":
+        sys.exit(1)
+    elif request["ast"] == "hang":
+        time.sleep(60)
+    elif request["ast"] == "log":
+        print("not JSON", flush=True)
+    elif request["ast"] == "id":
+        print(json.dumps({"id": -1, "code": ""}), flush=True)
+    else:
+        print(json.dumps({"id": request["id"], "code": request["ast"]}), flush=True)
+"""
+
+
+@requires_node
+def test_render_many():
+    filenames = sorted((FIXTURES_DIR / "javascript_flow").glob("*.ast.json"))[:4]
+    expected = [
+        subprocess.run(  # nosec B603
+            ["node", str(AST_TO_JS)], input=f.read_bytes(), stdout=subprocess.PIPE, check=True
+        ).stdout.decode()
+        for f in filenames
+    ]
+
+    with JsRenderer(workers=2) as renderer:
+        asts = [json.loads(f.read_text()) for f in filenames]
+
+        assert renderer.render_many(asts) == expected
+
+        # Workers are kept between batches
+        processes = [w.process for w in renderer._workers]
+
+        assert renderer.render(asts[0]) == expected[0]
+        assert renderer._workers[0].process is processes[0]
+
+
+@requires_node
+def test_render_many_errors():
+    ast = json.loads((FIXTURES_DIR / "flow" / "simple.ast.json").read_text())
+
+    with JsRenderer(workers=1) as renderer:
+        codes = renderer.render_many([{"type": "Unknown"}, ast], return_exceptions=True)
+
+        assert isinstance(codes[0], JsRenderError)
+        assert codes[1].startswith("// @flow")
+
+        with pytest.raises(JsRenderError):
+            renderer.render_many([ast, {"type": "Unknown"}])
+
+
+def test_render_many_crash():
+    with JsRenderer(workers=2, command=[sys.executable, "-c", FAKE_WORKER]) as renderer:
+        codes = renderer.render_many(["a", "b", "crash", "c", "d", "e"], return_exceptions=True)
+
+        assert codes[:2] + codes[3:] == ["a", "b", "c", "d", "e"]
+        assert str(codes[2]) == "ast_to_js exited while rendering"
+
+        # The crashed worker was replaced
+        assert renderer.render_many(["f", "g"]) == ["f", "g"]
+        assert all(w.process.poll() is None for w in renderer._workers)
+
+
+@pytest.mark.parametrize(
+    "ast, error",
+    [
+        ["hang", "ast_to_js didn't answer in 0.5s"],
+        ["log", "Invalid response from ast_to_js: b'not JSON\\n'"],
+        ["id", "Unexpected response from ast_to_js: {'id': -1, 'code': ''}"],
+    ],
+)
+def test_render_many_invalid_worker(ast, error):
+    command = [sys.executable, "-c", FAKE_WORKER]
+
+    with JsRenderer(workers=1, command=command, max_retries=0, timeout=0.5) as renderer:
+        codes = renderer.render_many(["a", ast, "b"], return_exceptions=True)
+
+        assert codes[0] == "a" and codes[2] == "b"
+        assert isinstance(codes[1], JsRenderError) and str(codes[1]) == error
+
+        with pytest.raises(JsRenderError):
+            renderer.render(ast)
+
+
+def test_render_missing_command(tmp_path):
+    with JsRenderer(command=[str(tmp_path / "missing")]) as renderer:
+        with pytest.raises(JsRenderError):
+            renderer.render({})
+
+
+@requires_node
+def test_main_emit_babel(monkeypatch, tmp_path):
+    schemas = [
+        str(SCHEMAS_DIR / "simple.schema.json"),
+        str(SCHEMAS_DIR / "with_property.schema.json"),
+    ]
+    argv = ["json_codegen", "-l", "flow", "--emit", "babel", "-d", str(tmp_path), *schemas]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    cli.main()
+
+    assert (tmp_path / "simple.js").read_text() == "// @flow\ndeclare type Test = {};"
+    assert "id: ?number" in (tmp_path / "with_property.js").read_text()
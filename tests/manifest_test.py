@@ -0,0 +1,173 @@
+import sys
+
+import pytest
+
+from json_codegen import cli
+from json_codegen.manifest import (
+    BuildManifest,
+    format_depfile,
+    get_fingerprint,
+    hash_file,
+)
+
+ROOT_SCHEMA = """{
+  "title": "Root",
+  "type": "object",
+  "properties": {"address": {"type": "object", "oneOf": [{"$ref": "address.json#"}]}}
+}"""
+
+ADDRESS_SCHEMA = '{"type": "object", "properties": {"street": {"type": "string"}}}'
+
+
+def test_hash_file(tmp_path):
+    filename = tmp_path / "file"
+    filename.write_text("content")
+
+    assert hash_file(filename) == hash_file(str(filename))
+    assert hash_file(tmp_path / "missing") is None
+
+
+def test_fingerprint(tmp_path):
+    generator = tmp_path / "generator.py"
+    generator.write_text("")
+
+    assert get_fingerprint(prefix="A") == get_fingerprint(prefix="A")
+    assert get_fingerprint(prefix="A") != get_fingerprint(prefix="B")
+
+    fingerprint = get_fingerprint([generator])
+    generator.write_text("# changed")
+
+    assert get_fingerprint([generator]) != fingerprint
+
+
+def test_manifest(tmp_path):
+    schema = tmp_path / "schema.json"
+    dependency = tmp_path / "dependency.json"
+    output = tmp_path / "output.py"
+
+    for filename in (schema, dependency, output):
+        filename.write_text("{}")
+
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    manifest.record(str(output), str(schema), "fingerprint", [str(dependency)])
+    manifest.save()
+
+    manifest = BuildManifest(tmp_path / "manifest.json")
+
+    assert manifest.is_up_to_date(str(output), str(schema), "fingerprint")
+    assert not manifest.is_up_to_date(str(output), str(schema), "other")
+
+    dependency.write_text("[]")
+
+    assert not manifest.is_up_to_date(str(output), str(schema), "fingerprint")
+
+
+def test_manifest_corrupted(tmp_path):
+    (tmp_path / "manifest.json").write_text("{")
+
+    assert BuildManifest(tmp_path / "manifest.json").outputs == {}
+
+
+def test_main_manifest(monkeypatch, tmp_path, capsys):
+    schema = tmp_path / "root.schema.json"
+    schema.write_text(ROOT_SCHEMA)
+    (tmp_path / "address.json").write_text(ADDRESS_SCHEMA)
+    output_dir = tmp_path / "output"
+    argv = ["json_codegen", "-l", "flow", "-d", str(output_dir), str(schema)]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--manifest", str(tmp_path / "manifest.json")])
+    cli.main()
+
+    assert (output_dir / "root.json").exists()
+
+    # Nothing changed, the schema isn't even decoded
+    def load_schema_mock(*args, **kwds):
+        raise AssertionError("Schema should not be loaded")
+
+    with monkeypatch.context() as m:
+        m.setattr(cli, "load_schema", load_schema_mock)
+        cli.main()
+
+    assert "1 of 1 outputs up to date" in capsys.readouterr().err
+
+    # A referenced file changed
+    (tmp_path / "address.json").write_text(ADDRESS_SCHEMA.replace("string", "integer"))
+    cli.main()
+
+    assert f"{schema} -> " in capsys.readouterr().err
+
+    # The options changed
+    monkeypatch.setattr(sys, "argv", sys.argv + ["--prefix", "P"])
+    cli.main()
+
+    assert "PRoot" in (output_dir / "root.json").read_text()
+
+
+def test_format_depfile():
+    rules = [("out/a.py", ["a.json", "common.json"]), ("out/b c.py", ["$b#.json", "b.json"])]
+
+    assert format_depfile(rules).splitlines() == [
+        "out/a.py: a.json common.json",
+        "out/b\\ c.py: $$b\\#.json b.json",
+    ]
+    assert format_depfile([("out.py", ["a.json", "a.json"])]) == "out.py: a.json\n"
+
+
+@pytest.mark.parametrize("manifest", [False, True])
+def test_main_depfile(monkeypatch, tmp_path, manifest):
+    schema = tmp_path / "root.schema.json"
+    schema.write_text(ROOT_SCHEMA)
+    (tmp_path / "address.json").write_text(ADDRESS_SCHEMA)
+    generator = tmp_path / "my_generator.py"
+    generator.write_text(
+        "from json_codegen.generators.flow import FlowGenerator\n\n\n"
+        "class MyGenerator(FlowGenerator):\n"
+        "    pass\n"
+    )
+    output = tmp_path / "root.js"
+    depfile = tmp_path / "root.d"
+    argv = ["json_codegen", "-g", str(generator), "-o", str(output), str(schema)]
+    argv += ["--depfile", str(depfile)]
+    argv += ["--manifest", str(tmp_path / "manifest.json")] if manifest else []
+
+    monkeypatch.setattr(sys, "argv", argv)
+    expected = f"{output}: {schema} {tmp_path / 'address.json'} {generator}\n"
+
+    # Skipped outputs keep the inputs recorded in the manifest
+    for _ in range(2):
+        if depfile.exists():
+            depfile.unlink()
+
+        cli.main()
+
+        assert depfile.read_text() == expected
+
+
+def test_main_depfile_many_languages(monkeypatch, tmp_path):
+    schema = tmp_path / "root.schema.json"
+    schema.write_text(ROOT_SCHEMA)
+    (tmp_path / "address.json").write_text(ADDRESS_SCHEMA)
+    depfile = tmp_path / "root.d"
+    argv = ["json_codegen", "-d", str(tmp_path), "-l", "flow:{name}.js", str(schema)]
+    argv += ["-l", "javascript+flow:{name}.mjs", "--depfile", str(depfile)]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    cli.main()
+
+    assert depfile.read_text() == "".join(
+        f"{tmp_path / ('root' + extension)}: {schema} {tmp_path / 'address.json'}\n"
+        for extension in (".js", ".mjs")
+    )
+
+
+def test_main_depfile_shared_module(monkeypatch, tmp_path, capsys):
+    schema = tmp_path / "root.schema.json"
+    schema.write_text(ROOT_SCHEMA)
+    argv = ["json_codegen", "-d", str(tmp_path), "--shared-module", "common", str(schema)]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--depfile", str(tmp_path / "root.d")])
+
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    assert "--depfile requires" in capsys.readouterr().err
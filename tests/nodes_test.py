@@ -0,0 +1,91 @@
+import json
+import pickle  # nosec B403
+from pathlib import Path
+
+import pytest
+
+from json_codegen import load_schema
+from json_codegen.core import SchemaParser
+from json_codegen.generators.flow import FlowGenerator
+from json_codegen.nodes import INDEX_THRESHOLD, SchemaNode, SchemaNodeFactory, with_item
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
+
+test_params = sorted(pytest.param(f, id=f.name) for f in SCHEMAS_DIR.glob("*.schema.json"))
+
+
+@pytest.mark.parametrize("size", [2, INDEX_THRESHOLD + 1])
+def test_schema_node(size):
+    pairs = [(f"key{i}", i) for i in range(size)]
+    node = SchemaNode.from_pairs(pairs)
+
+    assert node == dict(pairs)
+    assert list(node) == [k for k, _ in pairs]
+    assert node["key1"] == 1
+    assert node.get("missing", "default") == "default"
+    assert "key0" in node
+    assert "missing" not in node
+
+    with pytest.raises(KeyError):
+        node["missing"]
+
+
+def test_schema_node_duplicated_keys():
+    node = SchemaNode.from_pairs([("a", 1), ("b", 2), ("a", 3)])
+
+    assert list(node.items()) == [("a", 3), ("b", 2)]
+
+
+def test_schema_node_factory():
+    factory = SchemaNodeFactory()
+    document = json.loads(
+        '[{"type": "string"}, {"type": "string"}, {"type": "integer", "default": 1}, '
+        '{"type": "integer", "default": true}, {"a": 1, "a": 2}]',
+        object_pairs_hook=factory,
+    )
+
+    # Identical nodes of strings are shared, the others only their keys
+    assert document[0] is document[1]
+    assert document[2] is not document[3]
+    assert document[2].keys() is document[3].keys()
+    assert document[3]["default"] is True
+    assert document[4] == {"a": 2}
+
+
+def test_with_item():
+    nested = {"type": "string"}
+    node = SchemaNode.from_pairs([("a", nested)])
+
+    new_node = with_item(node, "title", "Test")
+
+    assert isinstance(new_node, SchemaNode)
+    assert new_node == {"a": nested, "title": "Test"}
+    assert new_node["a"] is nested
+    assert node == {"a": nested}
+
+    assert with_item(new_node, "title", "Other")["title"] == "Other"
+    assert with_item({"a": 1}, "a", 2) == {"a": 2}
+
+
+def test_pickle():
+    node = load_schema(json.dumps({"a": {"b": [1, 2]}}), frozen=True)
+
+    assert pickle.loads(pickle.dumps(node)) == node  # nosec B301
+
+
+def test_frozen_definitions_are_shared():
+    schema = load_schema(json.dumps({"definitions": {"A": {"title": "A"}}}), frozen=True)
+
+    parser = SchemaParser(schema)
+
+    assert parser.definitions["#/definitions/A"] is schema["definitions"]["A"]
+
+
+@pytest.mark.parametrize("schema_filename", (test_params))
+def test_generate_frozen(schema_filename):
+    text = schema_filename.read_text()
+
+    expected = FlowGenerator(load_schema(text)).generate().as_ast()
+    result = FlowGenerator(load_schema(text, frozen=True)).generate().as_ast()
+
+    assert result == expected
@@ -0,0 +1,144 @@
+import copy
+import re
+
+from json_codegen.core import SchemaParser
+from json_codegen.generators.flow import FlowGenerator
+from json_codegen.generators.javascript_flow import JavaScriptFlowGenerator
+from json_codegen.generators.python3 import Python3Generator
+from json_codegen.registry import SharedTypeRegistry, generate_with_shared_types
+
+MONEY = {
+    "type": "object",
+    "properties": {
+        "amount": {"type": "integer"},
+        "currency": {"type": "object", "oneOf": [{"$ref": "#/definitions/Currency"}]},
+    },
+}
+CURRENCY = {"type": "object", "properties": {"code": {"type": "string"}}}
+
+
+def make_schema(title, **definitions):
+    return {
+        "title": title,
+        "type": "object",
+        "properties": {"price": {"type": "object", "oneOf": [{"$ref": "#/definitions/Money"}]}},
+        "definitions": definitions,
+    }
+
+
+def test_shared_keys():
+    a = SchemaParser(make_schema("A", Money=MONEY, Currency=CURRENCY, OnlyA=CURRENCY))
+    b = SchemaParser(make_schema("B", Money=MONEY, Currency=CURRENCY))
+
+    registry = SharedTypeRegistry()
+    registry.add(a)
+    registry.add(b)
+
+    expected = {"#/definitions/Money", "#/definitions/Currency"}
+
+    assert registry.get_shared_keys(a) == expected
+    assert registry.get_shared_keys(b) == expected
+    assert list(registry.get_common_schema()["definitions"]) == ["Money", "Currency"]
+
+
+def test_shared_keys_with_different_dependencies():
+    other_currency = copy.deepcopy(CURRENCY)
+    other_currency["properties"]["symbol"] = {"type": "string"}
+
+    a = SchemaParser(make_schema("A", Money=MONEY, Currency=CURRENCY))
+    b = SchemaParser(make_schema("B", Money=MONEY, Currency=other_currency))
+
+    registry = SharedTypeRegistry()
+    registry.add(a)
+    registry.add(b)
+
+    # Money is the same but references different Currency definitions
+    assert registry.get_shared_keys(a) == frozenset()
+
+
+def test_shared_keys_with_conflicting_keys():
+    other_currency = copy.deepcopy(CURRENCY)
+    other_currency["properties"]["symbol"] = {"type": "string"}
+
+    parsers = [
+        SchemaParser(make_schema("A", Currency=CURRENCY)),
+        SchemaParser(make_schema("B", Currency=CURRENCY)),
+        SchemaParser(make_schema("C", Currency=other_currency)),
+        SchemaParser(make_schema("D", Currency=other_currency)),
+    ]
+
+    registry = SharedTypeRegistry()
+
+    for parser in parsers:
+        registry.add(parser)
+
+    assert registry.get_shared_hashes() == frozenset()
+
+
+def test_generate_with_shared_types_python3():
+    parsers = [
+        Python3Generator(make_schema("A", Money=MONEY, Currency=CURRENCY, OnlyA=CURRENCY)),
+        Python3Generator(make_schema("B", Money=MONEY, Currency=CURRENCY)),
+    ]
+
+    common, (a, b) = generate_with_shared_types(Python3Generator, parsers, "models.common")
+
+    assert [n.name for n in common.as_ast().body[1:]] == ["Money", "Currency"]
+
+    a_body = a.as_ast().body
+
+    assert a_body[1].module == "models.common"
+    assert [n.name for n in a_body[1].names] == ["Money", "Currency"]
+    assert [n.name for n in a_body[2:]] == ["OnlyA", "A"]
+    assert [n.name for n in b.as_ast().body[2:]] == ["B"]
+
+
+def test_generate_with_shared_types_javascript_flow():
+    parsers = [
+        JavaScriptFlowGenerator(make_schema("A", Money=MONEY, Currency=CURRENCY)),
+        JavaScriptFlowGenerator(make_schema("B", Money=MONEY, Currency=CURRENCY)),
+    ]
+
+    _, (a, _) = generate_with_shared_types(JavaScriptFlowGenerator, parsers, "common")
+    import_declaration = a.as_ast()["program"]["body"][0]
+
+    assert import_declaration["type"] == "ImportDeclaration"
+    assert import_declaration["source"]["value"] == "./common"
+    assert [s["local"]["name"] for s in import_declaration["specifiers"]] == [
+        "Money",
+        "Currency",
+    ]
+
+
+def test_generate_with_shared_types_flow():
+    parsers = [
+        FlowGenerator(make_schema("A", Money=MONEY, Currency=CURRENCY)),
+        FlowGenerator(make_schema("B", Money=MONEY, Currency=CURRENCY)),
+    ]
+
+    _, (a, _) = generate_with_shared_types(FlowGenerator, parsers, "types.common")
+    import_declaration = a.as_ast()["program"]["body"][0]
+
+    assert import_declaration["importKind"] == "type"
+    assert import_declaration["source"]["value"] == "./common"
+    assert [s["local"]["name"] for s in import_declaration["specifiers"]] == [
+        "Money",
+        "Currency",
+    ]
+
+
+def test_generate_with_shared_types_flow_exports():
+    parsers = [
+        FlowGenerator(make_schema("A", Money=MONEY, Currency=CURRENCY)),
+        FlowGenerator(make_schema("B", Money=MONEY, Currency=CURRENCY)),
+    ]
+
+    common, modules = generate_with_shared_types(FlowGenerator, parsers, "common")
+    exported = re.findall(r"^export type (\w+) =", common.as_js(), re.MULTILINE)
+
+    assert "declare type" not in common.as_js()
+
+    for module in modules:
+        (specifiers,) = re.findall(r"^import type \{ (.*) \} from", module.as_js(), re.MULTILINE)
+
+        assert sorted(specifiers.split(", ")) == sorted(exported)
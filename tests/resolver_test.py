@@ -0,0 +1,151 @@
+import json
+
+import pytest
+
+from json_codegen import load_schema
+from json_codegen.core import SchemaParser
+from json_codegen.generators.flow import FlowGenerator
+from json_codegen.resolver import RefResolver, build_pointer_index
+
+
+def test_build_pointer_index():
+    document = {"a": {"b/c": [{"d~e": {}}]}}
+
+    index = build_pointer_index(document)
+
+    assert set(index) == {"", "/a", "/a/b~1c", "/a/b~1c/0", "/a/b~1c/0/d~0e"}
+    assert index["/a/b~1c/0/d~0e"] is document["a"]["b/c"][0]["d~e"]
+
+
+@pytest.mark.parametrize(
+    "ref, expected",
+    [
+        ["#/definitions/A", {"type": "integer", "title": "A"}],
+        ["#/definitions/a~1b", {"type": "string", "title": "a/b"}],
+        ["#/definitions/a%7E0b", {"type": "boolean", "title": "a~b"}],
+        ["#/$defs/C", {"type": "number", "title": "C"}],
+        ["#/properties/x", {"type": "string", "title": "x"}],
+        ["#/definitions/D/properties/y", {"type": "integer", "title": "y"}],
+    ],
+)
+def test_resolve(ref, expected):
+    schema = load_schema(
+        json.dumps(
+            {
+                "definitions": {
+                    "A": {"type": "integer"},
+                    "a/b": {"type": "string"},
+                    "a~b": {"type": "boolean"},
+                    "D": {"type": "object", "properties": {"y": {"type": "integer"}}},
+                },
+                "$defs": {"C": {"type": "number"}},
+                "properties": {"x": {"type": "string"}},
+            }
+        )
+    )
+
+    parser = SchemaParser(schema)
+
+    assert parser.resolve_ref(ref) == expected
+
+
+def test_resolve_not_found():
+    parser = SchemaParser({"definitions": {}})
+
+    with pytest.raises(KeyError):
+        parser.resolve_ref("#/definitions/A")
+
+
+def test_resolve_external(tmp_path):
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common" / "money.json").write_text(
+        json.dumps({"definitions": {"Money": {"type": "object", "title": "Money"}}})
+    )
+    (tmp_path / "common" / "address.json").write_text(json.dumps({"type": "object"}))
+
+    resolver = RefResolver({}, filename=tmp_path / "schema.json", cache_size=1)
+
+    assert resolver["common/money.json#/definitions/Money"]["title"] == "Money"
+    assert resolver["common/address.json"]["title"] == "address"
+    assert "common/missing.json#/definitions/Money" not in resolver
+
+    # Only the most recently used document is kept
+    assert list(resolver._documents) == [(tmp_path / "common" / "address.json").resolve()]
+
+
+def test_resolve_nested_external(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.json").write_text(
+        json.dumps(
+            {
+                "type": "object",
+                "properties": {"b": {"$ref": "b.json#"}, "c": {"$ref": "#/definitions/C"}},
+                "definitions": {"C": {"type": "object", "title": "C"}},
+            }
+        )
+    )
+    (tmp_path / "sub" / "b.json").write_text(json.dumps({"type": "object", "title": "B"}))
+
+    resolver = RefResolver({}, filename=tmp_path / "root.json")
+    a = resolver["sub/a.json#"]
+
+    assert resolver[a["properties"]["b"]["$ref"]]["title"] == "B"
+    assert resolver[a["properties"]["c"]["$ref"]]["title"] == "C"
+    assert resolver.dependencies == {
+        (tmp_path / "sub" / "a.json").resolve(),
+        (tmp_path / "sub" / "b.json").resolve(),
+    }
+
+
+def test_generate_with_external_ref(tmp_path):
+    money = {
+        "definitions": {
+            "Money": {"type": "object", "properties": {"currency": {"$ref": "#/definitions/C"}}},
+            "C": {"type": "string"},
+        }
+    }
+    (tmp_path / "money.json").write_text(json.dumps(money))
+    schema = {
+        "title": "Test",
+        "type": "object",
+        "properties": {
+            "price": {"$ref": "money.json#/definitions/Money"},
+            "total": {"$ref": "./money.json#/definitions/Money"},
+        },
+    }
+
+    generator = FlowGenerator(schema, filename=tmp_path / "schema.json").generate()
+
+    # The definitions of the other document are generated once with the schema
+    assert generator.as_js() == (
+        "// @flow\n\n"
+        "declare type C = string;\n\n"
+        "declare type Money = {\n"
+        "  currency: ?C,\n\n"
+        "  constructor(data: ?Object): void,\n"
+        "};\n\n"
+        "declare type Test = {\n"
+        "  price: ?Money,\n"
+        "  total: ?Money,\n\n"
+        "  constructor(data: ?Object): void,\n"
+        "};\n"
+    )
+
+
+def test_external_ref_name_clash(tmp_path):
+    (tmp_path / "money.json").write_text(
+        json.dumps({"definitions": {"Money": {"type": "object", "properties": {}}}})
+    )
+    schema = {
+        "title": "Test",
+        "type": "object",
+        "properties": {"price": {"$ref": "money.json#/definitions/Money"}},
+        "definitions": {"Money": {"type": "string"}},
+    }
+
+    problems = FlowGenerator(schema, filename=tmp_path / "schema.json").check_schema()
+
+    assert [str(p) for p in problems] == [
+        f"{(tmp_path / 'money.json').resolve().as_posix()}#/definitions/Money: "
+        "definition Money clashes with a definition of the schema"
+    ]
@@ -0,0 +1,198 @@
+import io
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from json_codegen import cli, client, load_schema
+from json_codegen.generators.flow import FlowGenerator
+from json_codegen.server import (
+    CodegenServer,
+    CodegenService,
+    remove_stale_socket,
+    serve_stream,
+)
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
+
+SCHEMA_FILENAME = SCHEMAS_DIR / "with_nested_object.schema.json"
+
+
+def expected_code():
+    return FlowGenerator(load_schema(SCHEMA_FILENAME.read_text())).generate().as_code()
+
+
+@pytest.fixture
+def server(tmp_path):
+    socket_path = str(tmp_path / "server.sock")
+    server = CodegenServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_generate():
+    service = CodegenService()
+    response = service.handle({"schema": str(SCHEMA_FILENAME), "language": "flow"})
+
+    assert response == {"status": 0, "code": expected_code()}
+
+
+def test_generate_inline():
+    service = CodegenService()
+    request = {"schema_text": SCHEMA_FILENAME.read_text(), "language": "flow"}
+
+    assert service.handle(request) == {"status": 0, "code": expected_code()}
+
+
+def test_generate_output(tmp_path):
+    service = CodegenService()
+    request = {
+        "schema": SCHEMA_FILENAME.name,
+        "cwd": str(SCHEMAS_DIR),
+        "language": "flow",
+        "output": str(tmp_path / "output.json"),
+    }
+
+    assert service.handle(request) == {"status": 0, "output": request["output"]}
+    assert (tmp_path / "output.json").read_text() == expected_code()
+
+
+def test_generate_cached(monkeypatch):
+    service = CodegenService()
+    request = {"schema": str(SCHEMA_FILENAME), "language": "flow"}
+    service.handle(request)
+
+    def load_schema_mock(*args, **kwds):
+        raise AssertionError("Schema should be cached")
+
+    monkeypatch.setattr(cli, "load_schema", load_schema_mock)
+
+    assert service.handle(request) == {"status": 0, "code": expected_code()}
+
+
+def test_errors():
+    service = CodegenService()
+
+    assert service.handle([]) == {"status": 1, "error": "Requests must be JSON objects"}
+    assert service.handle({"schema": "missing.json"})["error"].startswith("FileNotFoundError")
+    assert service.handle({"argv": ["serve"]})["status"] == 2
+    assert service.handle({"argv": ["--wat", "-o", "a.py", "schema.json"]})["status"] == 2
+
+
+def test_run():
+    service = CodegenService()
+    response = service.handle({"argv": ["-l", "flow", str(SCHEMA_FILENAME)]})
+
+    assert response == {"status": 0, "stdout": expected_code() + "\n", "stderr": ""}
+
+    response = service.handle({"argv": ["--unknown"]})
+
+    assert response["status"] == 2
+    assert "error:" in response["stderr"]
+
+
+def test_server(server):
+    request = {"schema": str(SCHEMA_FILENAME), "language": "flow"}
+
+    assert client.request(request, server.server_address) == {"status": 0, "code": expected_code()}
+
+    with pytest.raises(OSError):
+        remove_stale_socket(server.server_address)
+
+
+def test_client(monkeypatch, tmp_path, capsys, server):
+    monkeypatch.setenv(client.SOCKET_ENV, server.server_address)
+    monkeypatch.chdir(SCHEMAS_DIR)
+
+    client.main(["-l", "flow", SCHEMA_FILENAME.name])
+
+    assert capsys.readouterr().out == expected_code() + "\n"
+
+
+def test_client_without_server(monkeypatch, tmp_path):
+    output = tmp_path / "output.json"
+
+    monkeypatch.setenv(client.SOCKET_ENV, str(tmp_path / "missing.sock"))
+    monkeypatch.setattr(sys, "argv", ["json_codegen"])
+
+    client.main(["-l", "flow", "-o", str(output), str(SCHEMA_FILENAME)])
+
+    assert output.read_text() == expected_code()
+
+
+def test_client_watch(monkeypatch):
+    calls = []
+
+    def request_mock(*args, **kwds):
+        raise AssertionError("--watch should run in process")
+
+    monkeypatch.setattr(client, "request", request_mock)
+    monkeypatch.setattr(cli, "main", calls.append)
+
+    client.main(["--watch", "-o", "output.json", str(SCHEMA_FILENAME)])
+
+    assert calls == [["--watch", "-o", "output.json", str(SCHEMA_FILENAME)]]
+
+
+def test_serve_stream():
+    requests = [{"schema": str(SCHEMA_FILENAME)}, {"schema": str(SCHEMA_FILENAME), "prefix": "X"}]
+    rfile = io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in requests) + b"{\n")
+    wfile = io.BytesIO()
+
+    serve_stream(CodegenService(), rfile, wfile, defaults={"language": "flow"})
+
+    responses = [json.loads(line) for line in wfile.getvalue().splitlines()]
+
+    assert responses[0] == {"status": 0, "code": expected_code()}
+    assert responses[1]["status"] == 0 and responses[1]["code"] != expected_code()
+    assert responses[2]["error"].startswith("Invalid request")
+
+
+def test_server_socket_permissions(server):
+    assert Path(server.server_address).stat().st_mode & 0o777 == 0o600
+
+
+def test_client_foreign_socket(monkeypatch, server):
+    uid = client.os.getuid()
+    monkeypatch.setattr(client.os, "getuid", lambda: uid + 1)
+
+    # The socket of another user is never used
+    with pytest.raises(PermissionError):
+        client.request({"argv": []}, server.server_address)
+
+    with pytest.raises(PermissionError):
+        remove_stale_socket(server.server_address)
+
+
+def test_default_socket_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv(client.SOCKET_ENV, raising=False)
+    monkeypatch.setattr(client.tempfile, "gettempdir", lambda: str(tmp_path))
+
+    socket_path = client.get_socket_path()
+    directory = Path(client.get_socket_directory())
+
+    with CodegenServer(socket_path):
+        assert Path(socket_path).parent == directory
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    directory.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        CodegenServer(socket_path)
+
+
+def test_remove_stale_socket(tmp_path):
+    socket_path = tmp_path / "stale.sock"
+    socket_path.write_text("")
+
+    remove_stale_socket(str(socket_path))
+
+    assert not socket_path.exists()
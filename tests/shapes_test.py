@@ -0,0 +1,107 @@
+import ast
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+from json_codegen import load_schema
+from json_codegen.core import SchemaParser
+from json_codegen.generators.python3 import Python3Generator
+from json_codegen.shapes import ShapeIndex, hoist_shared_shapes
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
+
+test_params = sorted(pytest.param(f, id=f.name) for f in SCHEMAS_DIR.glob("*.schema.json"))
+
+ADDRESS = {
+    "type": "object",
+    "properties": {"street": {"type": "string"}, "zip": {"type": "integer"}},
+    "required": ["street"],
+}
+
+SCHEMA = {
+    "title": "Root",
+    "type": "object",
+    "properties": {
+        "home": dict(ADDRESS),
+        "work": dict(ADDRESS),
+        "others": {"type": "array", "items": dict(ADDRESS)},
+        "unique": {"type": "object", "properties": {"a": {"type": "string"}}},
+    },
+}
+
+
+def test_shape_of():
+    shapes = ShapeIndex()
+
+    assert shapes.shape_of({"a": [1, "b"]}) == shapes.shape_of({"a": [1, "b"]})
+    assert shapes.shape_of({"a": 1, "b": 2}) != shapes.shape_of({"b": 2, "a": 1})
+    assert shapes.shape_of({"a": 1}) != shapes.shape_of({"a": "1"})
+    assert shapes.shape_of({"a": []}) != shapes.shape_of({"a": {}})
+
+
+def test_memoize():
+    shapes = ShapeIndex()
+    calls = []
+
+    def factory():
+        calls.append(None)
+        return object()
+
+    first = shapes.memoize("test", dict(ADDRESS), factory)
+
+    assert shapes.memoize("test", dict(ADDRESS), factory) is first
+    assert shapes.memoize("other", dict(ADDRESS), factory) is not first
+    assert len(calls) == 2
+
+
+def test_hoist_shared_shapes():
+    schema, definitions = hoist_shared_shapes(SCHEMA, OrderedDict(), ShapeIndex())
+
+    assert list(definitions.keys()) == ["#/definitions/Home"]
+    assert definitions["#/definitions/Home"] == dict(ADDRESS, title="Home")
+
+    properties = schema["properties"]
+    ref = {"type": "object", "oneOf": [{"$ref": "#/definitions/Home"}]}
+
+    assert properties["home"] == ref
+    assert properties["work"] == ref
+    assert properties["others"]["items"] == ref
+    assert properties["unique"] is SCHEMA["properties"]["unique"]
+
+
+def test_hoist_shared_shapes_unique_names():
+    definitions = OrderedDict([("#/definitions/Home", {"type": "string", "title": "Home"})])
+    _, new_definitions = hoist_shared_shapes(SCHEMA, definitions, ShapeIndex())
+
+    assert list(new_definitions.keys()) == ["#/definitions/Home", "#/definitions/Home2"]
+
+
+def test_hoist_shared_shapes_nothing_shared():
+    schema = {"type": "object", "properties": {"unique": SCHEMA["properties"]["unique"]}}
+    definitions: OrderedDict = OrderedDict()
+
+    assert hoist_shared_shapes(schema, definitions, ShapeIndex()) == (schema, definitions)
+
+
+def test_hoisted_generation():
+    generator = Python3Generator(SCHEMA, hoist_shapes=True)
+
+    assert [r.title for r in generator.get_klass_records()] == ["Home"]
+
+    tree = ast.dump(generator.generate().as_ast())
+
+    assert tree.count("ClassDef(name='Home'") == 1
+    assert tree.count("Name(id='Home'") >= 3
+
+
+@pytest.mark.parametrize("schema_filename", test_params)
+def test_hoist_fixtures(schema_filename):
+    # Hoisting keeps the existing definitions untouched
+    schema = load_schema(schema_filename.read_text())
+    parser = SchemaParser(schema)
+    hoisted = SchemaParser(schema, hoist_shapes=True)
+
+    assert list(hoisted.definitions.keys())[: len(parser.definitions)] == list(
+        parser.definitions.keys()
+    )
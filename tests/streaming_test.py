@@ -0,0 +1,70 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from json_codegen import load_schema
+from json_codegen.core import SchemaParser
+from json_codegen.generators.flow import FlowGenerator
+from json_codegen.streaming import DEFINITIONS, DEFS, ROOT, iter_schema
+
+SCHEMAS_DIR = Path(__file__).parent / "fixtures" / "schemas"
+
+test_params = sorted(pytest.param(f, id=f.name) for f in SCHEMAS_DIR.glob("*.schema.json"))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_schema(chunk_size):
+    text = json.dumps(
+        {
+            "title": "Test",
+            "definitions": {"A": {"type": "integer", "default": 12345}, "B": {"type": "string"}},
+            "$defs": {"C": {"type": "boolean"}},
+            "properties": {"a": {"$ref": "#/definitions/A"}},
+            "count": 1234567890,
+        },
+        indent=2,
+    )
+
+    result = list(iter_schema(io.StringIO(text), chunk_size=chunk_size))
+
+    assert result == [
+        (ROOT, "title", "Test"),
+        (DEFINITIONS, "A", {"type": "integer", "default": 12345}),
+        (DEFINITIONS, "B", {"type": "string"}),
+        (DEFS, "C", {"type": "boolean"}),
+        (ROOT, "properties", {"a": {"$ref": "#/definitions/A"}}),
+        (ROOT, "count", 1234567890),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text", ["", "[]", '{"a": 1', '{"a" 1}', '{"a": 1} {}', '{"a": 1 "b": 2}']
+)
+def test_iter_schema_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_schema(io.StringIO(text), chunk_size=2))
+
+
+@pytest.mark.parametrize("schema_filename", (test_params))
+def test_from_stream(schema_filename):
+    text = schema_filename.read_text()
+
+    expected = SchemaParser(load_schema(text))
+
+    with schema_filename.open() as f:
+        result = SchemaParser.from_stream(f, chunk_size=16)
+
+    assert result.definitions == expected.definitions
+    assert result.get_root_definition().get("title") == expected.get_root_definition().get("title")
+
+
+@pytest.mark.parametrize("schema_filename", (test_params))
+def test_from_stream_generate(schema_filename):
+    expected = FlowGenerator(load_schema(schema_filename.read_text())).generate().as_ast()
+
+    with schema_filename.open() as f:
+        result = FlowGenerator.from_stream(f, chunk_size=16).generate().as_ast()
+
+    assert result == expected
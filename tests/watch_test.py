@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from json_codegen import batch, cli
+from json_codegen.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    get_watcher,
+    watch_schemas,
+)
+
+ROOT_SCHEMA = """{
+  "title": "Root",
+  "type": "object",
+  "properties": {"address": {"type": "object", "oneOf": [{"$ref": "address.json#"}]}}
+}"""
+
+ADDRESS_SCHEMA = '{"type": "object", "properties": {"street": {"type": "string"}}}'
+
+
+def make_watcher(kind):
+    if kind == "polling":
+        return PollingWatcher(interval=0.01)
+
+    try:
+        return InotifyWatcher()
+    except OSError:
+        pytest.skip("inotify not available")
+
+
+def touch_later(path, content, delay=0.05):
+    def touch():
+        time.sleep(delay)
+        path.write_text(content)
+
+    thread = threading.Thread(target=touch)
+    thread.start()
+
+    return thread
+
+
+@pytest.mark.parametrize("kind", ["polling", "inotify"])
+def test_watcher(tmp_path, kind):
+    watched = tmp_path / "watched.json"
+    other = tmp_path / "other.json"
+    watched.write_text("{}")
+    other.write_text("{}")
+
+    watcher = make_watcher(kind)
+    watcher.watch([watched.resolve()])
+
+    assert watcher.wait(0.05) == set()
+
+    other.write_text("[]")
+
+    assert watcher.wait(0.05) == set()
+
+    thread = touch_later(watched, "[]")
+
+    assert watcher.wait(5) == {watched.resolve()}
+
+    thread.join()
+    watcher.close()
+
+
+def test_get_watcher():
+    assert isinstance(get_watcher(polling=True), PollingWatcher)
+
+
+@pytest.mark.parametrize("kind", ["polling", "inotify"])
+def test_watch_schemas(tmp_path, kind):
+    schema = tmp_path / "root.schema.json"
+    schema.write_text(ROOT_SCHEMA)
+    address = tmp_path / "address.json"
+    address.write_text(ADDRESS_SCHEMA)
+    output = tmp_path / "root.json"
+
+    args = cli.get_argument_parser().parse_args(["-l", "flow", "-o", str(output), str(schema)])
+    results = []
+
+    def generate(schema, output):
+        return batch.generate_schema(args, schema, output)
+
+    # The first round generates every output, the second one follows the referenced file
+    thread = touch_later(address, ADDRESS_SCHEMA.replace("string", "integer"), delay=0.2)
+    watch_schemas(
+        [(str(schema), str(output))], generate, results.append, make_watcher(kind), max_rounds=1
+    )
+    thread.join()
+
+    assert [r.schema for r in results] == [str(schema), str(schema)]
+    assert all(r.error is None for r in results)
+    assert results[1].dependencies == (str(address.resolve()),)